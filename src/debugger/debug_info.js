@@ -48,6 +48,10 @@ class DebugInfo {
         // (whereas hashing might be a problem)
         this._addressMap = new Array(0x1000);
 
+        // optional address ranges sorted by address,
+        // used instead of the address map if set
+        this._addressIndex = null;
+
         this.#load(filename, project);
     }
 
@@ -223,12 +227,40 @@ class DebugInfo {
     }
 
     getAddressInfo(addr) {
+        if (this._addressIndex) {
+            return this.#findAddressInfo(addr);
+        }
         if (addr < 0 || addr >= this._addressMap.length) {
             return null;
         }
         return this._addressMap[addr];
     }
 
+    setAddressIndex(addressIndex) {
+        this._addressIndex = addressIndex;
+    }
+
+    #findAddressInfo(addr) {
+        const addressIndex = this._addressIndex;
+
+        let low = 0;
+        let high = addressIndex.length - 1;
+
+        while (low <= high) {
+            const mid = (low + high) >> 1;
+            const addressInfo = addressIndex[mid];
+            if (addr < addressInfo.address) {
+                high = mid - 1;
+            } else if (addr > addressInfo.address_end) {
+                low = mid + 1;
+            } else {
+                return addressInfo;
+            }
+        }
+
+        return null;
+    }
+
     setSpans(spans) {
         this._spans = spans;
     }
@@ -30,7 +30,10 @@ class BasicDebugInfo {
             }
         }
 
-        const parser = new BasicMapParser(project, src);
+        const parser = BasicIndexedMapParser.isIndexedMap(src) ?
+            new BasicIndexedMapParser(project, src) :
+            new BasicMapParser(project, src);
+
         const dbg = parser.parse();
 
         if (!dbg || !dbg.sources) throw("unable to read basic source map file");
@@ -41,6 +44,9 @@ class BasicDebugInfo {
         }
 
         if (dbg.addr) {
+            // indexed maps are looked up by binary search
+            const addressIndex = dbg.indexed ? [] : null;
+
             for (const entry of dbg.addr) {
 
                 const filename = dbg.sources[entry.fileIndex];
@@ -55,8 +61,12 @@ class BasicDebugInfo {
                 addressInfo.globalRef = debug_info._addresses.length;
                 debug_info._addresses.push(addressInfo);
 
-                for (let addr = addressInfo.address; addr <= addressInfo.address_end; addr++) {
-                    debug_info._addressMap[addr] = addressInfo;
+                if (addressIndex) {
+                    addressIndex.push(addressInfo);
+                } else {
+                    for (let addr = addressInfo.address; addr <= addressInfo.address_end; addr++) {
+                        debug_info._addressMap[addr] = addressInfo;
+                    }
                 }
 
                 const normalizedPath = debug_info.getRefName(filename);
@@ -68,6 +78,10 @@ class BasicDebugInfo {
                 }
 
             }
+
+            if (addressIndex) {
+                debug_info.setAddressIndex(addressIndex);
+            }
         }
 
         if (dbg.labels) {
@@ -167,6 +181,56 @@ class BasicMapParser {
     }
 }
 
+class BasicIndexedMapParser {
+
+    constructor(project, src) {
+        this.project = project;
+        this.src = src;
+    }
+
+    static isIndexedMap(src) {
+        return src.trimStart().startsWith("{");
+    }
+
+    parse() {
+
+        let data = null;
+
+        try {
+            data = JSON.parse(this.src);
+        } catch (_err) {
+            return null;
+        }
+
+        if (!data || data.version != 1 || !data.files || !data.ranges) return null;
+
+        // ranges are sorted by address: [startAddr, endAddr, fileIndex, sourceLine, basicLine, lineLen]
+        const addr = new Array(data.ranges.length);
+
+        for (let i = 0; i < data.ranges.length; i++) {
+            const range = data.ranges[i];
+            const sourceLine = range[3];
+
+            addr[i] = {
+                startAddr: range[0],
+                endAddr: range[1],
+                fileIndex: range[2],
+                startLine: sourceLine,
+                startPosition: 0,
+                endLine: sourceLine,
+                endPosition: range[5]
+            };
+        }
+
+        return {
+            sources: data.files,
+            labels: [],
+            addr: addr,
+            indexed: true
+        };
+    }
+}
+
 //-----------------------------------------------------------------------------------------------//
 // Module Exports
 //-----------------------------------------------------------------------------------------------//
@@ -370,16 +370,16 @@ class Project {
 
             this._resourceOutputType = "asm"; // default
 
-            if (toolkit.isAssembler && (rcFormat == "cc" || rcFormat == "cpp" || rcFormat == "basic")) {
+            if (toolkit.isAssembler && (rcFormat == "cc" || rcFormat == "cpp" || rcFormat == "basic" || rcFormat == "basic-compact")) {
                 rcArguments.setOption("format", toolkit.name); // format name = toolkit name
                 logger.warn("specified resource compiler output format '" + rcFormat + "' is not supported by assembler toolkits - using assembler output format instead");
-            } else if (toolkit.isBasic && rcFormat != "basic") {
+            } else if (toolkit.isBasic && rcFormat != "basic" && rcFormat != "basic-compact") {
                 rcArguments.setOption("format", "basic");
                 logger.warn("specified resource compiler output format '" + rcFormat + "' is not supported by the basic toolkit - using basic output format instead");
             } else {
                 if (rcFormat == "cc") this._resourceOutputType = "c";
                 else if (rcFormat == "cpp") this._resourceOutputType = "cpp";
-                else if (rcFormat == "basic") this._resourceOutputType = "bas";
+                else if (rcFormat == "basic" || rcFormat == "basic-compact") this._resourceOutputType = "bas";
             }
         }
 
@@ -974,6 +974,11 @@ class Project {
                 bc_flags.add("--lower");
             }
 
+            if (!bc_flags.hasArg("--map-format")) {
+                // indexed source map, loaded by the debugger without per-address expansion
+                bc_flags.add("--map-format", "json");
+            }
+
             bc_flags.add("--map", "\"$dbg_out\"");
 
             script.push(Ninja.keyValue("bc_exe", settings.basicCompiler));
@@ -986,7 +991,9 @@ class Project {
             script.push("");
 
             script.push("rule bas");
-            script.push("    command = $python_exe $bc_exe $bc_flags $includes -o $out $in");
+            script.push("    depfile = $out.d");
+            script.push("    deps = gcc");
+            script.push("    command = $python_exe $bc_exe $bc_flags $includes --depfile $out.d -o $out $in");
             script.push("");
 
             buildTree.gen.forEach((to, from) => {
@@ -4,7 +4,7 @@
 
 const fs = require("fs");
 const path = require("path");
-const { spawnSync } = require("child_process");
+const { spawn, spawnSync } = require("child_process");
 
 //-----------------------------------------------------------------------------------------------//
 // Init module and lookup path
@@ -84,6 +84,8 @@ describe("basic_compiler", () => {
     }
 
     const bcScript = __context.resolve("tools/bc.py");
+    const rcScript = __context.resolve("tools/rc.py");
+    const csScript = __context.resolve("tools/cs.py");
     const suiteTemp = __context.resolve("temp:/basic_compiler");
 
     beforeEach(() => {
@@ -264,4 +266,738 @@ describe("basic_compiler", () => {
         const stdout = result.stdout || "";
         expect(stdout.includes("aliases mapped: 1")).toBeTruthy();
     });
+
+    test("incremental compile with line cache matches full compile", () => {
+        const projectDir = path.join(suiteTemp, "line_cache");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const cachedPrg = path.join(buildDir, "cached.prg");
+        const fullPrg = path.join(buildDir, "full.prg");
+        const cacheFile = path.join(buildDir, "main.cache");
+
+        writeFile(
+            mainBas,
+            [
+                "print \"start\"",
+                "loop:",
+                "gosub sub",
+                "goto loop",
+                "sub:",
+                "return",
+            ].join("\n") + "\n",
+        );
+
+        runBc(pyExe, [bcScript, "--cache", cacheFile, "-o", cachedPrg, mainBas], projectDir);
+        expect(fs.existsSync(cacheFile)).toBeTruthy();
+
+        // moves all labels, cached jump lines need to be re-tokenized
+        writeFile(
+            mainBas,
+            [
+                "print \"start\"",
+                "print \"inserted\"",
+                "loop:",
+                "gosub sub",
+                "goto loop",
+                "sub:",
+                "return",
+            ].join("\n") + "\n",
+        );
+
+        runBc(pyExe, [bcScript, "--cache", cacheFile, "-o", cachedPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "-o", fullPrg, mainBas], projectDir);
+
+        expect(fs.readFileSync(cachedPrg).equals(fs.readFileSync(fullPrg))).toBeTruthy();
+    });
+
+    test("parallel tokenization matches sequential compile", () => {
+        const projectDir = path.join(suiteTemp, "parallel");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const sequentialPrg = path.join(buildDir, "sequential.prg");
+        const parallelPrg = path.join(buildDir, "parallel.prg");
+
+        const lines = [];
+        for (let i = 0; i < 3000; i++) {
+            if (i % 100 == 0) lines.push(`lbl${i}:`);
+            if (i == 1500) lines.push("#lower");
+            lines.push(`print "Line ${i}";a$:if x>${i} then lbl${i - (i % 100)}`);
+        }
+        writeFile(mainBas, lines.join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "-o", sequentialPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--jobs", "4", "-o", parallelPrg, mainBas], projectDir);
+
+        expect(fs.readFileSync(parallelPrg).equals(fs.readFileSync(sequentialPrg))).toBeTruthy();
+    });
+
+    test("merges crunched lines that are not jump targets", () => {
+        const projectDir = path.join(suiteTemp, "merge");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const crunchedPrg = path.join(buildDir, "crunched.prg");
+        const mergedPrg = path.join(buildDir, "merged.prg");
+        const mergedBas = path.join(buildDir, "merged.bas");
+
+        writeFile(mainBas, [
+            "10 print \"hello\":a=1",
+            "20 b=2",
+            "30 if a=1 then print \"x\"",
+            "40 c=3",
+            "50 gosub 100",
+            "60 rem only comment",
+            "70 data 1,2,\"a:b\"",
+            "80 print a;b;c",
+            "90 end",
+            "100 print \"sub\"",
+            "110 return"
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "--crunch", "-o", crunchedPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--crunch", "--optimize", "merge", "-o", mergedPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", mergedBas, mergedPrg], projectDir);
+
+        expect(fs.statSync(mergedPrg).size).toBeLessThan(fs.statSync(crunchedPrg).size);
+
+        const listing = fs.readFileSync(mergedBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "1 print\"hello\":a=1:b=2:ifa=1thenprint\"x\"",
+            "4 c=3:gosub10:data1,2,\"a:b\":printa;b;c:end",
+            "10 print\"sub\":return"
+        ]);
+    });
+
+    test("moves hot subroutines to the program start using a line profile", () => {
+        const projectDir = path.join(suiteTemp, "layout");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const profileFile = path.join(buildDir, "profile.json");
+        const layoutPrg = path.join(buildDir, "layout.prg");
+        const layoutBas = path.join(buildDir, "layout.bas");
+
+        writeFile(mainBas, [
+            "10 for i=1 to 100:gosub 1000:next i",
+            "20 end",
+            "100 print \"cold\":return",
+            "1000 a=a+1:if a>50 then gosub 100",
+            "1010 return"
+        ].join("\n") + "\n");
+
+        writeFile(profileFile, JSON.stringify({
+            version: 1,
+            lines: [ { file: mainBas, index: 3, count: 100 } ]
+        }));
+
+        runBc(pyExe, [bcScript, "--crunch", "--optimize", "layout", "--line-profile", profileFile, "-o", layoutPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", layoutBas, layoutPrg], projectDir);
+
+        const listing = fs.readFileSync(layoutBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "1 fori=1to100:gosub3:nexti",
+            "2 end",
+            "3 a=a+1:ifa>50thengosub5",
+            "4 return",
+            "5 print\"cold\":return"
+        ]);
+    });
+
+    test("creates loop variables first with a DIM line", () => {
+        const projectDir = path.join(suiteTemp, "varorder");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const orderedPrg = path.join(buildDir, "ordered.prg");
+        const orderedBas = path.join(buildDir, "ordered.bas");
+
+        writeFile(mainBas, [
+            "10 a=1",
+            "20 for i=1 to 10:b=b+i:next i",
+            "30 print a;b"
+        ].join("\n") + "\n");
+
+        const output = runBc(pyExe, [bcScript, "--crunch", "--optimize", "varorder", "-o", orderedPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", orderedBas, orderedPrg], projectDir);
+
+        expect(output.stdout).toContain("variable order: I (21), B (21), A (2)");
+
+        const listing = fs.readFileSync(orderedBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "0 dimi,b,a",
+            "1 a=1",
+            "2 fori=1to10:b=b+i:nexti",
+            "3 printa;b"
+        ]);
+    });
+
+    test("warns about optimizations without effect", () => {
+        const projectDir = path.join(suiteTemp, "optimize-warning");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const outputPrg = path.join(buildDir, "output.prg");
+
+        writeFile(mainBas, "10 goto 10\n");
+
+        let output = runBc(pyExe, [bcScript, "--optimize", "all", "-o", outputPrg, mainBas], projectDir);
+        expect(output.stdout).toContain("warning: optimizations are ignored as --crunch is not set");
+
+        output = runBc(pyExe, [bcScript, "--tsb", "--crunch", "--optimize", "all", "-o", outputPrg, mainBas], projectDir);
+        expect(output.stdout).toContain("warning: optimizations are ignored as TSB is enabled");
+
+        output = runBc(pyExe, [bcScript, "--crunch", "--optimize", "all", "-o", outputPrg, mainBas], projectDir);
+        expect(output.stdout).not.toContain("warning");
+    });
+
+    test("converts hex and binary literals and shortens numbers when crunching", () => {
+        const projectDir = path.join(suiteTemp, "literals");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const literalsPrg = path.join(buildDir, "literals.prg");
+        const literalsBas = path.join(buildDir, "literals.bas");
+
+        writeFile(mainBas, [
+            "10 poke $d020,%1010:a%=$ffand3:b$=a$+\"$ff\"",
+            "20 x=0:y=0.50:z=1000000:goto 10",
+            "30 a=1000E-5:b=0E+3:c=2.50E+10:d=-1E-3",
+            "40 data $c000,%1010:read a$:rem $ff"
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "--crunch", "--optimize", "literals", "-o", literalsPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", literalsBas, literalsPrg], projectDir);
+
+        const listing = fs.readFileSync(literalsBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "1 poke53280,10:a%=255and3:b$=a$+\"$ff\"",
+            "2 x=.:y=.5:z=1e6:goto1",
+            "3 a=.01:b=.:c=25e9:d=-1e-3",
+            "4 data$c000,%1010:reada$"
+        ]);
+    });
+
+    test("substitutes constants and folds constant expressions", () => {
+        const projectDir = path.join(suiteTemp, "const");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const constPrg = path.join(buildDir, "const.prg");
+        const constBas = path.join(buildDir, "const.bas");
+
+        writeFile(mainBas, [
+            "#const VIC = $d000",
+            "#const BORDER = VIC + $20",
+            "10 poke VIC+21,255:poke BORDER,0",
+            "#const V = 53248",
+            "20 a=x-VIC+1:print \"VIC\"",
+            "30 pokeV+21,0:av=V"
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "-o", constPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", constBas, constPrg], projectDir);
+
+        const listing = fs.readFileSync(constBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "10 poke 53269,255:poke 53280,0",
+            "20 a=x-53248+1:print \"vic\"",
+            "30 poke53269,0:av=53248"
+        ]);
+    });
+
+    test("removes unreachable lines and placeholders when crunching", () => {
+        const projectDir = path.join(suiteTemp, "deadcode");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const libBas = path.join(srcDir, "lib.bas");
+        const deadcodePrg = path.join(buildDir, "deadcode.prg");
+        const deadcodeBas = path.join(buildDir, "deadcode.bas");
+
+        writeFile(libBas, [
+            "goto skiplib",
+            "used:",
+            "  print \"used\":return",
+            "unused:",
+            "  print \"unused\":return",
+            "skiplib:",
+            "  rem"
+        ].join("\n") + "\n");
+
+        writeFile(mainBas, [
+            "#include \"lib.bas\"",
+            "10 gosub used",
+            "20 end",
+            "30 data 1,2"
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "--crunch", "--optimize", "deadcode", "-o", deadcodePrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", deadcodeBas, deadcodePrg], projectDir);
+
+        const listing = fs.readFileSync(deadcodeBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "1 goto3",
+            "2 print\"used\":return",
+            "3 gosub2",
+            "4 end",
+            "5 data1,2"
+        ]);
+    });
+
+    test("removes placeholders in front of unreachable lines when crunching", () => {
+        const projectDir = path.join(suiteTemp, "deadcode_unreachable");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const deadcodePrg = path.join(buildDir, "deadcode.prg");
+        const deadcodeBas = path.join(buildDir, "deadcode.bas");
+
+        writeFile(mainBas, [
+            "10 goto 10",
+            "20 rem hello",
+            "30 print \"x\""
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "--crunch", "--optimize", "deadcode", "-o", deadcodePrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", deadcodeBas, deadcodePrg], projectDir);
+
+        const listing = fs.readFileSync(deadcodeBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "1 goto1"
+        ]);
+    });
+
+    test("inlines small subroutines called by GOSUB", () => {
+        const projectDir = path.join(suiteTemp, "inline");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const inlinePrg = path.join(buildDir, "inline.prg");
+        const inlineBas = path.join(buildDir, "inline.bas");
+
+        writeFile(mainBas, [
+            "10 for i=1 to 100:gosub 100:next",
+            "20 gosub 200:end",
+            "100 a=a+i:return",
+            "200 for j=1 to 2:next:return"
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "--crunch", "--optimize", "inline,deadcode", "-o", inlinePrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", inlineBas, inlinePrg], projectDir);
+
+        const listing = fs.readFileSync(inlineBas, "utf8").trim().split("\n");
+        expect(listing).toEqual([
+            "1 fori=1to100:a=a+i:next",
+            "2 gosub3:end",
+            "3 forj=1to2:next:return"
+        ]);
+    });
+
+    test("writes program statistics as json", () => {
+        const projectDir = path.join(suiteTemp, "stats");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const statsPrg = path.join(buildDir, "stats.prg");
+        const statsJson = path.join(buildDir, "stats.json");
+
+        writeFile(mainBas, [
+            "10 gosub 40:gosub 40",
+            "20 goto 10",
+            "30 print \"goto\"",
+            "40 return"
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "--stats", statsJson, "--stats-format", "json", "-o", statsPrg, mainBas], projectDir);
+
+        const stats = JSON.parse(fs.readFileSync(statsJson, "utf8"));
+        expect(stats.lines).toBe(4);
+        expect(stats.bytes).toBe(fs.statSync(statsPrg).size - 4);
+        expect(stats.tokens).toEqual({ GOSUB: 2, GOTO: 1, PRINT: 1, RETURN: 1 });
+        expect(stats.jumps.count).toBe(3);
+        expect(stats.jumps.searched).toBe(7);
+        expect(stats.jumps.longest_forward).toEqual({ line: 10, target: 40, distance: 3, searched: 3 });
+        expect(stats.jumps.longest_backward).toEqual({ line: 20, target: 10, distance: -1, searched: 1 });
+        expect(stats.targets[0]).toEqual({ line: 40, refs: 2 });
+    });
+
+    test("appends binary payloads behind the program", () => {
+        const projectDir = path.join(suiteTemp, "payload");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const dataBin = path.join(srcDir, "data.bin");
+        const payloadPrg = path.join(buildDir, "payload.prg");
+        const payloadBas = path.join(buildDir, "payload.bas");
+
+        writeFile(mainBas, "10 print tiles_addr;tiles_size\n");
+        fs.writeFileSync(dataBin, Buffer.from([1, 2, 3]));
+
+        runBc(pyExe, [bcScript, "--payload", "tiles=" + dataBin, "-o", payloadPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", payloadBas, payloadPrg], projectDir);
+
+        const prg = fs.readFileSync(payloadPrg);
+        const dataAddr = 0x0801 + prg.length - 2 - 3;
+        expect([...prg.subarray(prg.length - 3)]).toEqual([1, 2, 3]);
+        expect([...prg.subarray(prg.length - 5, prg.length - 3)]).toEqual([0, 0]);
+        expect(fs.readFileSync(payloadBas, "utf8").trim()).toBe(`10 print ${dataAddr};3`);
+    });
+
+    test("compiles compact resource data strings with loader", () => {
+        const projectDir = path.join(suiteTemp, "rccompact");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const dataRaw = path.join(srcDir, "data.raw");
+        const dataBas = path.join(buildDir, "data.bas");
+        const compactPrg = path.join(buildDir, "compact.prg");
+        const compactBas = path.join(buildDir, "compact.bas");
+
+        // 40 bytes are stored in two DATA strings, the loader reads 36 of them
+        const data = Buffer.from(Array.from({ length: 40 }, (_, i) => (i * 37 + 0x7f) & 0xff));
+        data[0] = 0x00; data[1] = 0x01; data[2] = 0x7f; data[3] = 0xff;
+
+        fs.mkdirSync(srcDir, { recursive: true });
+        fs.writeFileSync(dataRaw, data);
+
+        runBc(pyExe, [rcScript, "--format", "basic-compact", "-o", dataBas, dataRaw], projectDir);
+        expect(fs.readFileSync(dataBas, "utf8")).toContain("DATA \"00017???");
+
+        writeFile(mainBas, [
+            "ad=49152:nb=36:gosub rc_load_data:end",
+            `#include "${dataBas.replace(/\\/g, "/")}"`
+        ].join("\n") + "\n");
+
+        runBc(pyExe, [bcScript, "-o", compactPrg, mainBas], projectDir);
+        runBc(pyExe, [bcScript, "--unpack", "-o", compactBas, compactPrg], projectDir);
+
+        const listing = fs.readFileSync(compactBas, "utf8");
+        expect(listing).toContain("gosub 5:end");
+        expect(listing).toContain("if nb<1 then return");
+        expect(listing).toContain("read d$:l=len(d$):if l>2*nb then l=2*nb");
+        expect(listing).toContain("for i=1 to l step 2:poke ad,asc(mid$(d$,i,1))*16+asc(mid$(d$,i+1,1))-816:ad=ad+1:next");
+        expect(listing).toContain("nb=nb-l/2:goto 5");
+
+        // run the loader on the compiled DATA strings
+        const strings = [...listing.matchAll(/data "([^"]*)"/g)].map((match) => match[1]);
+        expect(strings.length).toBe(2);
+
+        const poked = [];
+        let nb = 36;
+        for (const d of strings) {
+            if (nb < 1) break;
+            const l = Math.min(d.length, 2 * nb);
+            for (let i = 0; i < l; i += 2) {
+                poked.push(d.charCodeAt(i) * 16 + d.charCodeAt(i + 1) - 816);
+            }
+            nb -= l / 2;
+        }
+
+        expect(poked).toEqual(Array.from(data.subarray(0, 36)));
+    });
+
+    test("writes depfile with resolved include files", () => {
+        const projectDir = path.join(suiteTemp, "depfile");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const incBas = path.join(srcDir, "lib", "inc.bas");
+        const outPrg = path.join(buildDir, "out.prg");
+        const depFile = path.join(buildDir, "out.prg.d");
+
+        writeFile(incBas, ["sub:", "return"].join("\n") + "\n");
+
+        writeFile(
+            mainBas,
+            [
+                '#include "inc.bas"',
+                "10 gosub sub",
+            ].join("\n") + "\n",
+        );
+
+        runBc(
+            pyExe,
+            [
+                bcScript,
+                "-I",
+                path.join(srcDir, "lib"),
+                "--depfile",
+                depFile,
+                "-o",
+                outPrg,
+                mainBas,
+            ],
+            projectDir,
+        );
+
+        const depText = fs.readFileSync(depFile, "utf8");
+        expect(depText.startsWith(outPrg + ":")).toBeTruthy();
+        expect(depText.includes(mainBas)).toBeTruthy();
+        expect(depText.includes(incBas)).toBeTruthy();
+    });
+
+    test("writes indexed json source map matching the text map", () => {
+        const projectDir = path.join(suiteTemp, "jsonmap");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const outPrg = path.join(buildDir, "out.prg");
+        const mapFile = path.join(buildDir, "out.bmap");
+
+        writeFile(
+            mainBas,
+            [
+                "10 print \"hello\"",
+                "start:",
+                "20 for i=1 to 10:next",
+                "goto start",
+            ].join("\n") + "\n",
+        );
+
+        runBc(
+            pyExe,
+            [bcScript, "--map-format", "both", "-m", mapFile, "-o", outPrg, mainBas],
+            projectDir,
+        );
+
+        const textEntries = fs.readFileSync(mapFile, "utf8")
+            .split("\n")
+            .filter((line) => line.length > 0 && line[0] >= "0" && line[0] <= "9")
+            .map((line) => line.substring(0, line.indexOf("#")).trim());
+
+        const indexedMap = JSON.parse(fs.readFileSync(mapFile + ".json", "utf8"));
+        expect(indexedMap.files).toEqual([mainBas]);
+
+        const jsonEntries = indexedMap.ranges.map(
+            (r) => `${r[0]},${r[1]},${r[4]},${r[3]},${r[5]}`,
+        );
+        expect(jsonEntries).toEqual(textEntries);
+    });
+
+    test("compiles source text in memory like bc.py", () => {
+        const projectDir = path.join(suiteTemp, "memory");
+        const srcDir = path.join(projectDir, "src");
+        const buildDir = path.join(projectDir, "build");
+        const mainBas = path.join(srcDir, "main.bas");
+        const incBas = path.join(srcDir, "lib", "inc.bas");
+        const outPrg = path.join(buildDir, "out.prg");
+        const mapFile = path.join(buildDir, "out.bmap");
+
+        const mainText = [
+            "#include \"lib/inc.bas\"",
+            "10 print \"hello\"",
+            "20 gosub sub:goto 10"
+        ].join("\n") + "\n";
+
+        writeFile(incBas, ["sub:", "  poke $d020,1:return"].join("\n") + "\n");
+        writeFile(mainBas, mainText);
+
+        runBc(pyExe, [bcScript, "-m", mapFile, "-o", outPrg, mainBas], projectDir);
+
+        // main.bas is compiled from text, the include file is read from disk
+        const script = [
+            "import sys, json",
+            "sys.path.insert(0, sys.argv[1])",
+            "from bclib import BasicCompiler, CompileOptions",
+            "compiler = BasicCompiler(CompileOptions())",
+            "result, err = compiler.compile_text(sys.stdin.read(), sys.argv[2])",
+            "assert err is None, err and err.to_string()",
+            "print(json.dumps({ 'prg': result.prg.hex(), 'lines': result.line_map }))"
+        ].join("\n");
+
+        const result = spawnSync(pyExe, ["-c", script, path.dirname(bcScript), mainBas], {
+            cwd: projectDir,
+            encoding: "utf8",
+            input: mainText
+        });
+        expect(result.stderr).toBe("");
+
+        const compiled = JSON.parse(result.stdout);
+        expect(compiled.prg).toBe(fs.readFileSync(outPrg).toString("hex"));
+
+        const textEntries = fs.readFileSync(mapFile, "utf8")
+            .split("\n")
+            .filter((line) => line.length > 0 && line[0] >= "0" && line[0] <= "9")
+            .map((line) => line.substring(0, line.indexOf("#")).trim());
+
+        const memoryEntries = compiled.lines.map(
+            (entry) => `${entry.start},${entry.end},${entry.line},${entry.index},${entry.length}`,
+        );
+        expect(memoryEntries).toEqual(textEntries);
+        expect(compiled.lines.map((entry) => entry.file)).toEqual([incBas, mainBas, mainBas]);
+    });
+
+    test("memoizes include lookups until the directory changes", () => {
+        const projectDir = path.join(suiteTemp, "include_graph");
+        const srcDir = path.join(projectDir, "src");
+        const libDir = path.join(projectDir, "lib");
+
+        writeFile(path.join(libDir, "inc.bas"), "rem lib\n");
+        fs.mkdirSync(srcDir, { recursive: true });
+
+        const script = [
+            "import os, sys",
+            "sys.path.insert(0, sys.argv[1])",
+            "from bclib import IncludeGraph",
+            "src, lib = sys.argv[2], sys.argv[3]",
+            "graph = IncludeGraph()",
+            "print(graph.resolve('inc.bas', src, [lib]) == os.path.join(lib, 'inc.bas'))",
+            "stat_count = graph.stat_count",
+            "graph.validate()",
+            "print(graph.resolve('inc.bas', src, [lib]) == os.path.join(lib, 'inc.bas'))",
+            "print(graph.stat_count - stat_count == len(graph.dir_mtimes))",
+            "with open(os.path.join(src, 'inc.bas'), 'w') as f: f.write('rem src')",
+            "mtime = graph.dir_mtimes[src]",
+            "os.utime(src, ns=(mtime + 10**9, mtime + 10**9))",
+            "print(graph.resolve('inc.bas', src, [lib]) == os.path.join(lib, 'inc.bas'))",
+            "graph.validate()",
+            "print(graph.resolve('inc.bas', src, [lib]) == os.path.join(src, 'inc.bas'))",
+            "os.remove(os.path.join(src, 'inc.bas'))",
+            "os.utime(src, ns=(mtime + 2 * 10**9, mtime + 2 * 10**9))",
+            "graph.validate()",
+            "print(graph.resolve('inc.bas', src, [lib]) == os.path.join(lib, 'inc.bas'))"
+        ].join("\n");
+
+        const result = spawnSync(pyExe, ["-c", script, path.dirname(bcScript), srcDir, libDir], {
+            cwd: projectDir,
+            encoding: "utf8"
+        });
+        expect(result.stderr).toBe("");
+
+        // lookups are memoized, validate() needs a single stat per directory, a new
+        // file is only seen after validate() and its removal is detected the same way
+        expect(result.stdout.trim().split("\n")).toEqual(["True", "True", "True", "True", "True", "True"]);
+    });
+
+    test("compile server picks up new include files between requests", () => {
+        const projectDir = path.join(suiteTemp, "cs_include");
+        const srcDir = path.join(projectDir, "src");
+        const libDir = path.join(projectDir, "lib");
+        const mainBas = path.join(srcDir, "main.bas");
+        const outBas = path.join(projectDir, "build", "out.bas");
+        const firstPrg = path.join(projectDir, "build", "first.prg");
+        const secondPrg = path.join(projectDir, "build", "second.prg");
+
+        writeFile(mainBas, ["#include \"inc.bas\"", "10 gosub sub"].join("\n") + "\n");
+        writeFile(path.join(libDir, "inc.bas"), ["sub:", "print \"lib\":return"].join("\n") + "\n");
+
+        const request = (id, outPrg) => JSON.stringify({
+            jsonrpc: "2.0", id: id, method: "run",
+            params: { tool: "bc", args: ["-I", libDir, "-o", outPrg, mainBas], cwd: projectDir }
+        });
+
+        // the include file next to main.bas is created while the server is running
+        const script = [
+            "import os, sys, subprocess",
+            "server = subprocess.Popen([sys.executable, sys.argv[1], '--stdio'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)",
+            "server.stdin.write(sys.argv[2] + '\\n'); server.stdin.flush()",
+            "print(server.stdout.readline().strip())",
+            "with open(sys.argv[4], 'w') as f: f.write('sub:\\nprint \"src\":return\\n')",
+            "mtime = os.stat(os.path.dirname(sys.argv[4])).st_mtime_ns + 10**9",
+            "os.utime(os.path.dirname(sys.argv[4]), ns=(mtime, mtime))",
+            "server.stdin.write(sys.argv[3] + '\\n'); server.stdin.close()",
+            "print(server.stdout.readline().strip())",
+            "server.wait()"
+        ].join("\n");
+
+        const result = spawnSync(pyExe, ["-c", script, csScript, request(1, firstPrg), request(2, secondPrg), path.join(srcDir, "inc.bas")], {
+            cwd: projectDir,
+            encoding: "utf8"
+        });
+        expect(result.stderr).toBe("");
+
+        const responses = result.stdout.trim().split("\n").map((line) => JSON.parse(line));
+        expect(responses.map((response) => response.result.exit_code)).toEqual([0, 0]);
+
+        runBc(pyExe, [bcScript, "--unpack", "-o", outBas, firstPrg], projectDir);
+        expect(fs.readFileSync(outBas, "utf8")).toContain("print \"lib\"");
+
+        runBc(pyExe, [bcScript, "--unpack", "-o", outBas, secondPrg], projectDir);
+        expect(fs.readFileSync(outBas, "utf8")).toContain("print \"src\"");
+    });
+
+    test("runs tools with JSON-RPC requests on stdio", () => {
+        const projectDir = path.join(suiteTemp, "cs_stdio");
+        const mainBas = path.join(projectDir, "src", "main.bas");
+        const outPrg = path.join(projectDir, "build", "out.prg");
+
+        writeFile(mainBas, "10 print \"hello\"\n");
+
+        const requests = [
+            { jsonrpc: "2.0", id: 1, method: "run", params: { tool: "bc", args: ["-o", outPrg, mainBas], cwd: projectDir } },
+            { jsonrpc: "2.0", id: 2, method: "run", params: { tool: "bc", args: ["-o", outPrg, "missing.bas"], cwd: projectDir } },
+            { jsonrpc: "2.0", id: 3, method: "stop" }
+        ];
+
+        const result = spawnSync(pyExe, [csScript, "--stdio"], {
+            cwd: projectDir,
+            encoding: "utf8",
+            input: requests.map((request) => JSON.stringify(request)).join("\n") + "\n"
+        });
+
+        expect(result.status).toBe(0);
+
+        const responses = result.stdout.trim().split("\n").map((line) => JSON.parse(line));
+        expect(responses.length).toBe(3);
+
+        expect(responses[0].id).toBe(1);
+        expect(responses[0].result).toEqual({ exit_code: 0, output: "", errors: "" });
+        expect(fs.existsSync(outPrg)).toBeTruthy();
+
+        expect(responses[1].id).toBe(2);
+        expect(responses[1].result.exit_code).toBe(1);
+        expect(responses[1].result.output).toContain("could not read file");
+
+        expect(responses[2].id).toBe(3);
+        expect(responses[2].error.code).toBe(-32601);
+    });
+
+    test("forwards bc.py and rc.py to the compile server", async () => {
+        if (process.platform === "win32") return;
+
+        const projectDir = path.join(suiteTemp, "cs_socket");
+        const mainBas = path.join(projectDir, "src", "main.bas");
+        const dataRaw = path.join(projectDir, "src", "data.raw");
+        const dataBas = path.join(projectDir, "build", "data.bas");
+        const outPrg = path.join(projectDir, "build", "out.prg");
+        const socketPath = path.join(projectDir, "cs.sock");
+
+        writeFile(mainBas, "10 print \"hello\"\n");
+        fs.writeFileSync(dataRaw, Buffer.from([1, 2, 3]));
+
+        const server = spawn(pyExe, [csScript, "--verbose", "--socket", socketPath], { cwd: projectDir });
+        let serverLog = "";
+        server.stderr.on("data", (data) => { serverLog += data; });
+        const serverExit = new Promise((resolve) => server.on("exit", resolve));
+
+        try {
+            for (let i = 0; i < 200 && !serverLog.includes("listening on"); i++) {
+                await new Promise((resolve) => setTimeout(resolve, 50));
+            }
+            expect(serverLog).toContain("listening on");
+
+            const env = { ...process.env, VS64_COMPILE_SERVER: socketPath };
+
+            const bc = spawnSync(pyExe, [bcScript, "-o", outPrg, mainBas], { cwd: projectDir, encoding: "utf8", env });
+            expect(bc.status).toBe(0);
+            expect(fs.existsSync(outPrg)).toBeTruthy();
+
+            const rc = spawnSync(pyExe, [rcScript, "--format", "basic", "-o", dataBas, dataRaw], { cwd: projectDir, encoding: "utf8", env });
+            expect(rc.status).toBe(0);
+            expect(fs.readFileSync(dataBas, "utf8")).toContain("DATA 1,2,3");
+
+            const failed = spawnSync(pyExe, [bcScript, "-o", outPrg, "missing.bas"], { cwd: projectDir, encoding: "utf8", env });
+            expect(failed.status).toBe(1);
+            expect(failed.stdout).toContain("could not read file");
+        } finally {
+            server.kill("SIGTERM");
+            await serverExit;
+        }
+
+        expect(serverLog).toContain(`cs: bc -o ${outPrg} ${mainBas}`);
+        expect(serverLog).toContain(`cs: rc --format basic -o ${dataBas} ${dataRaw}`);
+        expect(fs.existsSync(socketPath)).toBeFalsy();
+    }, 20000);
 });
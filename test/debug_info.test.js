@@ -87,3 +87,45 @@ test("test debug info cc65", async () => {
 });
 
 }); // describe
+
+describe('debug_info_basic', () => {
+test("test debug info basic indexed map", async () => {
+
+    Logger.setGlobalLevel(LogLevel.Trace);
+    Logger.setSink(loggerSink);
+
+    const settings = new Settings(null);
+    const project = new Project(settings);
+
+    const projectConfig = {
+        name: "test",
+        toolkit: "basic",
+        sources: [ "src/main.bas" ],
+        build: "debug"
+    };
+
+    project.fromJson(JSON.stringify(projectConfig));
+
+    const textInfo = new DebugInfo(__context.resolve("data:/basicdebug.bmap"), project);
+    const indexedInfo = new DebugInfo(__context.resolve("data:/basicdebug.bmap.json"), project);
+
+    for (let addr = 2040; addr < 2120; addr++) {
+        const textAddressInfo = textInfo.getAddressInfo(addr);
+        const indexedAddressInfo = indexedInfo.getAddressInfo(addr);
+        if (!textAddressInfo) {
+            expect(indexedAddressInfo).toBeFalsy();
+            continue;
+        }
+        expect(indexedAddressInfo.address).toBe(textAddressInfo.address);
+        expect(indexedAddressInfo.address_end).toBe(textAddressInfo.address_end);
+        expect(indexedAddressInfo.line).toBe(textAddressInfo.line);
+    }
+
+    expect(indexedInfo.getAddressInfo(2049).line).toBe(1);
+    expect(indexedInfo.getAddressInfo(2088).line).toBe(4);
+    expect(indexedInfo.getAddressInfo(2111).line).toBe(7);
+    expect(indexedInfo.getAddressInfo(2112)).toBeFalsy();
+
+});
+
+}); // describe
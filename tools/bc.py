@@ -9,7 +9,7 @@ from typing import Optional
 SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
 sys.path.append(SCRIPT_DIR)
 
-from bclib import CompileOptions, BasicCompiler, BasicDecompiler
+from cslib import CompileClient
 
 #############################################################################
 # Main Entry
@@ -24,21 +24,48 @@ def usage():
     print("-n, --noext        : Disable BASIC extensions")
     print("-l, --lower        : Enable lower-case mode")
     print("-m, --map          : Name of source map file to be generated")
+    print("--map-format       : Source map format: text (default), json or both")
+    print("-C, --cache        : Line cache file for incremental compilation")
+    print("--depfile          : Name of Makefile-style dependency file to be generated")
+    print("--stats            : Write program statistics (sizes, tokens, jumps) to file, '-' for console")
+    print("--stats-format     : Statistics format: text (default) or json")
     print("-a, --aliases      : Enable @alias preprocessing")
     print("-I, --include      : Add include directory (multiple usage possible")
     print("-o, --output       : Name of file to be generated")
     print("-u, --unpack       : Unpack a .prg into BASIC source code")
     print("-c, --crunch       : Crunch BASIC source code")
+    print("-O, --optimize     : Comma separated crunch optimizations (inline, deadcode, varorder, literals, merge, layout, all)")
+    print("--inline-size      : Maximum code size in bytes of inlined subroutines, default: 24")
+    print("--line-profile     : Line execution profile (JSON) for the layout and varorder optimizations")
+    print("--payload          : Append binary file as NAME=FILE[@ADDR] behind the program (multiple usage possible)")
+    print("                     defines NAME_addr and NAME_size, with @ADDR relocate_payloads copies the data")
+    print("-j, --jobs         : Number of parallel tokenizer processes (0: one per CPU)")
     print("-p, --pretty       : Make BASIC source code pretty")
+    print("--profile          : Write phase timings to file")
+    print("--profile-format   : Profile format: json (default) or trace (Chrome trace events)")
+    print("--cprofile         : Write cProfile statistics to file")
     print("-v, --verbose      : Verbose output")
     print("-d, --debug        : Show extended debug output")
     print("input              : Source files")
 
 def main():
-    """Main entry."""
+    """Main entry, forwards to a running compile server if available."""
+
+    exit_code = CompileClient.forward("bc", sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    run()
+
+def run(include_graph=None):
+    """Run compiler in-process, include_graph is kept by the caller across runs."""
+
+    # libraries are imported on demand to keep forwarding to the server fast
+    from bclib import CompileOptions, BasicCompiler, BasicDecompiler, OPTIMIZATIONS # pylint: disable=import-outside-toplevel
+    from proflib import Profiler, ProfilerOptions # pylint: disable=import-outside-toplevel
 
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "hvdtlum:cpaI:o:", ["help", "verbose", "debug", "tsb", "aliases", "lower", "unpack", "crunch", "pretty", "map=", "include=", "output="])
+        opts, args = getopt.getopt(sys.argv[1:], "hvdtlum:C:cpaI:o:j:O:", ["help", "verbose", "debug", "tsb", "aliases", "lower", "unpack", "crunch", "pretty", "optimize=", "line-profile=", "inline-size=", "payload=", "jobs=", "map=", "map-format=", "cache=", "depfile=", "stats=", "stats-format=", "include=", "output=", "profile=", "profile-format=", "cprofile="])
     except getopt.GetoptError as err:
         print(err.msg)
         usage()
@@ -51,6 +78,7 @@ def main():
     unpack: bool = False
     output: Optional[str] = None
     options = CompileOptions()
+    profiler_options = ProfilerOptions()
 
     for option, arg in opts:
         if option in ("-h", "--help"):
@@ -60,6 +88,24 @@ def main():
             output = arg
         elif option in ("-m", "--map"):
             options.set_map_file(arg)
+        elif option == "--map-format":
+            if arg not in ("text", "json", "both"):
+                print(f"invalid map format: {arg}")
+                usage()
+                sys.exit(2)
+            options.set_map_format(arg)
+        elif option in ("-C", "--cache"):
+            options.set_cache_file(arg)
+        elif option == "--depfile":
+            options.set_dep_file(arg)
+        elif option == "--stats":
+            options.set_stats_file(arg)
+        elif option == "--stats-format":
+            if arg not in ("text", "json"):
+                print(f"invalid stats format: {arg}")
+                usage()
+                sys.exit(2)
+            options.set_stats_format(arg)
         elif option in ("-I", "--include"):
             options.append_include_path(arg)
         elif option in ("-t", "--tsb"):
@@ -72,23 +118,97 @@ def main():
             options.set_verbosity_level(2)
         elif option in ("-c", "--crunch"):
             options.set_crunch()
+        elif option in ("-O", "--optimize"):
+            optimizations = [name.strip() for name in arg.split(",") if name.strip()]
+            if "all" in optimizations:
+                optimizations = list(OPTIMIZATIONS)
+            invalid = [name for name in optimizations if name not in OPTIMIZATIONS]
+            if invalid:
+                print(f"invalid optimization: {invalid[0]}")
+                usage()
+                sys.exit(2)
+            options.set_optimizations(optimizations)
+        elif option == "--inline-size":
+            try:
+                inline_size = int(arg)
+            except ValueError:
+                inline_size = -1
+            if inline_size < 0:
+                print(f"invalid inline size: {arg}")
+                usage()
+                sys.exit(2)
+            options.set_inline_size(inline_size)
+        elif option == "--line-profile":
+            options.set_line_profile(arg)
+        elif option == "--payload":
+            name, _, filename = arg.partition("=")
+            filename, _, target_str = filename.partition("@")
+            target = None
+            if target_str:
+                try:
+                    if target_str.startswith("$"):
+                        target = int(target_str[1:], 16)
+                    else:
+                        target = int(target_str, 0)
+                except ValueError:
+                    target = -1
+            if not name or not filename or (target is not None and not 0 <= target <= 0xFFFF):
+                print(f"invalid payload: {arg}")
+                usage()
+                sys.exit(2)
+            options.append_payload(name.strip(), filename, target)
+        elif option in ("-j", "--jobs"):
+            try:
+                jobs = int(arg)
+            except ValueError:
+                jobs = -1
+            if jobs < 0:
+                print(f"invalid number of jobs: {arg}")
+                usage()
+                sys.exit(2)
+            options.set_jobs(jobs)
         elif option in ("-p", "--pretty"):
             options.set_pretty()
         elif option in ("-l", "--lower"):
             options.set_lower_case()
         elif option in ("-u", "--unpack"):
             unpack = True
+        elif option == "--profile":
+            profiler_options.set_profile_file(arg)
+        elif option == "--profile-format":
+            if arg not in ("json", "trace"):
+                print(f"invalid profile format: {arg}")
+                usage()
+                sys.exit(2)
+            profiler_options.set_profile_format(arg)
+        elif option == "--cprofile":
+            profiler_options.set_cprofile_file(arg)
+
+    if options.optimizations and not unpack and not options.is_optimizing():
+        reason = "TSB is enabled" if options.feature_tsb else "--crunch is not set"
+        print(f"warning: optimizations are ignored as {reason}")
 
     err = None
 
+    profiler = Profiler("bc", profiler_options)
+    profiler.start()
+
     if unpack:
         basic_decompiler = BasicDecompiler(options)
-        err = basic_decompiler.unpack(args, output)
+        with profiler.phase("unpack"):
+            err = basic_decompiler.unpack(args, output)
     else:
-        basic_compiler = BasicCompiler(options)
+        basic_compiler = BasicCompiler(options, include_graph, profiler)
         err = basic_compiler.compile(args, output)
         if not err and options.feature_aliases:
             print(f"aliases mapped: {basic_compiler.alias_count}")
+        if not err and basic_compiler.optimizer:
+            for report_line in basic_compiler.optimizer.get_report():
+                print(report_line)
+
+    profiler_err = profiler.stop()
+    if profiler_err:
+        print(f"error: {profiler_err}")
 
     if err:
         print(err.to_string())
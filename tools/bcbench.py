@@ -0,0 +1,384 @@
+"""VS64 Basic Compiler Benchmark."""
+
+import sys
+import os
+import gc
+import json
+import time
+import random
+import getopt
+import platform
+import tempfile
+import tracemalloc
+
+from typing import Optional
+
+SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(SCRIPT_DIR)
+
+from bclib import CompileOptions, BasicCompiler, BasicDecompiler
+
+DEFAULT_SIZES = [1000, 10000, 60000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.15
+
+BASELINE_VERSION = 1
+
+#############################################################################
+# Program Generator
+#############################################################################
+
+INCLUDE_FILENAME = "bench_lib.bas"
+
+CONTROL_CODES = ["{23 down}", "{red}", "{clr}", "{rvs on}", "{$1d}", "{home}"]
+
+def generate_include() -> "list[str]":
+    """Generate include file with subroutines used by the main program."""
+
+    return [
+        "; benchmark library",
+        "clear_screen:",
+        "  print \"{clr}\";:return",
+        "set_colors:",
+        "  poke 53280,@border:poke 53281,@background:return",
+        "wait_key:",
+        "  get k$:if k$=\"\" then wait_key",
+        "  return",
+    ]
+
+def generate_program(num_lines: int, seed: int = 64) -> "list[str]":
+    """Generate synthetic BASIC program with about num_lines source lines."""
+
+    rnd = random.Random(seed)
+
+    lines = [
+        f"#include \"{INCLUDE_FILENAME}\"",
+        "  @border = 0:@background = 6",
+        "  gosub clear_screen:gosub set_colors",
+    ]
+
+    labels = ["clear_screen"]
+    aliases = [f"@value{i}" for i in range(48)] + [f"@text{i}$" for i in range(16)] + [f"@count{i}%" for i in range(16)]
+
+    while len(lines) < num_lines:
+        i = len(lines)
+        kind = rnd.randint(0, 11)
+
+        if i % 20 == 0:
+            label = f"block{i}"
+            labels.append(label)
+            lines.append(f"{label}:")
+        elif kind == 0:
+            lines.append(f"  print \"{rnd.choice(CONTROL_CODES)}hello world {i}{rnd.choice(CONTROL_CODES)}\";a$")
+        elif kind == 1:
+            lines.append("  data " + ",".join(str(rnd.randint(-255, 255)) for _ in range(12)))
+        elif kind == 2:
+            lines.append(f"  data \"name {i}\",\"{{23 down}}text\",{rnd.random() * 100:.2f}")
+        elif kind == 3:
+            lines.append(f"  if {rnd.choice(aliases[:48])}>{i} then {rnd.choice(labels)}")
+        elif kind == 4:
+            lines.append(f"  gosub {rnd.choice(labels)}:on x goto {rnd.choice(labels)},{rnd.choice(labels)}")
+        elif kind == 5:
+            lines.append(f"  rem comment {i} with \"quotes\" and @nothing")
+        elif kind == 6:
+            lines.append(f"  for i=1 to {i % 50 + 1} step 2:a(i)=i*{i}:{rnd.choice(aliases[:48])}=i:next i")
+        elif kind == 7:
+            lines.append(f"  {rnd.choice(aliases[48:64])}=mid$(b$,{i % 5 + 1},1)+left$(c$,2)+chr$({i % 256})")
+        elif kind == 8:
+            lines.append(f"  hires 0,1:line {i % 320},0,319,199,1:plot {i % 320},{i % 200},1")
+        elif kind == 9:
+            lines.append(f"  {rnd.choice(aliases[64:])}={i % 32000}:poke 53280+{i % 16},peek({i})and 15")
+        elif kind == 10:
+            lines.append(f"  b$='{{yellow}}Raw Text {i}':print b$;tab(10);spc(2)")
+        else:
+            lines.append(f"  x={rnd.random() * 1000:.3f}:y=-{i}:z=1e3:? x;y;z ' comment")
+
+    lines.append("  end")
+
+    return lines
+
+#############################################################################
+# Benchmark
+#############################################################################
+
+class BenchmarkOptions:
+    """Benchmark options."""
+
+    def __init__(self):
+        self.sizes = DEFAULT_SIZES
+        self.repeat = DEFAULT_REPEAT
+        self.measure_memory = True
+        self.verbosity_level = 0
+
+class Benchmark:
+    """Times compiler and decompiler on generated programs."""
+
+    def __init__(self, options: BenchmarkOptions, work_dir: str):
+        self.options = options
+        self.work_dir = work_dir
+
+    def log(self, s: str):
+        """Print progress information."""
+        if self.options.verbosity_level > 0:
+            print(s, file=sys.stderr)
+
+    def run(self) -> dict:
+        """Run all benchmark cases."""
+
+        results = {}
+
+        include_file = os.path.join(self.work_dir, INCLUDE_FILENAME)
+        with open(include_file, "w", encoding="utf-8") as out_file:
+            out_file.write("\n".join(generate_include()) + "\n")
+
+        for size in self.options.sizes:
+            source_file = os.path.join(self.work_dir, f"bench_{size}.bas")
+            prg_file = os.path.join(self.work_dir, f"bench_{size}.prg")
+            crunched_file = os.path.join(self.work_dir, f"bench_{size}_crunched.prg")
+            unpacked_file = os.path.join(self.work_dir, f"bench_{size}.txt")
+
+            lines = generate_program(size)
+            with open(source_file, "w", encoding="utf-8") as out_file:
+                out_file.write("\n".join(lines) + "\n")
+
+            num_lines = len(lines)
+
+            cases = [
+                ("compile", lambda s=source_file, p=prg_file: self.compile(s, p, False)),
+                ("compile_crunch", lambda s=source_file, p=crunched_file: self.compile(s, p, True)),
+                ("unpack", lambda p=prg_file, u=unpacked_file: self.unpack(p, u))
+            ]
+
+            for name, fn in cases:
+                key = f"{name}_{size}"
+                self.log(f"running {key}")
+                results[key] = self.measure(fn, num_lines)
+
+        return results
+
+    def create_options(self, crunch: bool) -> CompileOptions:
+        """Create compile options for benchmark run."""
+
+        options = CompileOptions()
+        options.set_enable_tsb()
+        options.set_enable_aliases()
+        if crunch:
+            options.set_crunch()
+
+        return options
+
+    def compile(self, source_file: str, prg_file: str, crunch: bool):
+        """Compile source file."""
+
+        compiler = BasicCompiler(self.create_options(crunch))
+        err = compiler.compile([source_file], prg_file)
+        if err:
+            raise RuntimeError(err.to_string())
+
+    def unpack(self, prg_file: str, output_file: str):
+        """Decompile program file."""
+
+        decompiler = BasicDecompiler(self.create_options(False))
+        err = decompiler.unpack([prg_file], output_file)
+        if err:
+            raise RuntimeError(err.to_string())
+
+    def measure(self, fn, num_lines: int) -> dict:
+        """Get best wall time of several runs and peak memory of one traced run."""
+
+        best_time = None
+
+        for _ in range(max(1, self.options.repeat)):
+            gc.collect()
+            start_time = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start_time
+            if best_time is None or elapsed < best_time:
+                best_time = elapsed
+
+        result = {
+            "lines": num_lines,
+            "seconds": round(best_time, 6),
+            "lines_per_second": round(num_lines / best_time, 1) if best_time > 0 else 0.0
+        }
+
+        if self.options.measure_memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                fn()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            result["peak_memory"] = peak
+
+        return result
+
+#############################################################################
+# Baseline
+#############################################################################
+
+def load_baseline(filename: str) -> Optional[dict]:
+    """Load stored benchmark results."""
+
+    try:
+        with open(filename, "r", encoding="utf-8") as in_file:
+            data = json.load(in_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != BASELINE_VERSION:
+        return None
+
+    return data.get("results")
+
+def save_baseline(filename: str, results: dict):
+    """Store benchmark results as baseline."""
+
+    data = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    with open(filename, "w", encoding="utf-8") as out_file:
+        json.dump(data, out_file, indent=2)
+        out_file.write("\n")
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float) -> "list[str]":
+    """Get list of regressions against baseline."""
+
+    regressions = []
+
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+
+        if result["seconds"] > base["seconds"] * (1.0 + tolerance):
+            regressions.append(
+                f"{key}: {result['seconds']:.3f}s vs. {base['seconds']:.3f}s baseline"
+            )
+
+        peak, base_peak = result.get("peak_memory"), base.get("peak_memory")
+        if peak and base_peak and peak > base_peak * (1.0 + tolerance):
+            regressions.append(
+                f"{key}: peak memory {peak // 1024} KiB vs. {base_peak // 1024} KiB baseline"
+            )
+
+    return regressions
+
+#############################################################################
+# Main Entry
+#############################################################################
+
+def usage():
+    """Print tool usage information."""
+
+    print("Usage: bcbench [options]")
+    print("")
+    print("-h, --help         : show this help")
+    print("-s, --sizes        : Comma separated program sizes in lines, default: 1000,10000,60000")
+    print("-r, --repeat       : Number of timed runs per case, best run is reported, default: 3")
+    print("-b, --baseline     : Compare results against baseline file")
+    print("-w, --write        : Write results to baseline file")
+    print("-t, --tolerance    : Allowed slowdown against baseline, default: 0.15")
+    print("-j, --json         : Print results as JSON")
+    print("--no-memory        : Skip peak memory measurement")
+    print("-v, --verbose      : Verbose output")
+
+def print_results(results: dict, baseline: Optional[dict]):
+    """Print results table."""
+
+    print(f"{'case':<24}{'lines':>8}{'seconds':>10}{'lines/s':>12}{'peak KiB':>10}{'change':>9}")
+
+    for key, result in results.items():
+        peak = result.get("peak_memory")
+        peak_text = str(peak // 1024) if peak is not None else "-"
+
+        change_text = "-"
+        base = baseline.get(key) if baseline else None
+        if base and base["seconds"] > 0:
+            change_text = f"{(result['seconds'] / base['seconds'] - 1.0) * 100.0:+.1f}%"
+
+        print(
+            f"{key:<24}{result['lines']:>8}{result['seconds']:>10.3f}"
+            f"{result['lines_per_second']:>12.0f}{peak_text:>10}{change_text:>9}"
+        )
+
+def main():
+    """Main entry."""
+
+    try:
+        opts, _args = getopt.getopt(sys.argv[1:], "hvjs:r:b:w:t:", ["help", "verbose", "json", "no-memory", "sizes=", "repeat=", "baseline=", "write=", "tolerance="])
+    except getopt.GetoptError as err:
+        print(err.msg)
+        usage()
+        sys.exit(2)
+
+    options = BenchmarkOptions()
+    baseline_file = None
+    write_file = None
+    tolerance = DEFAULT_TOLERANCE
+    json_output = False
+
+    try:
+        for option, arg in opts:
+            if option in ("-h", "--help"):
+                usage()
+                sys.exit()
+            elif option in ("-s", "--sizes"):
+                options.sizes = [int(size) for size in arg.split(",") if size]
+            elif option in ("-r", "--repeat"):
+                options.repeat = int(arg)
+            elif option in ("-b", "--baseline"):
+                baseline_file = arg
+            elif option in ("-w", "--write"):
+                write_file = arg
+            elif option in ("-t", "--tolerance"):
+                tolerance = float(arg)
+            elif option in ("-j", "--json"):
+                json_output = True
+            elif option == "--no-memory":
+                options.measure_memory = False
+            elif option in ("-v", "--verbose"):
+                options.verbosity_level = 1
+    except ValueError:
+        print("invalid numeric argument")
+        usage()
+        sys.exit(2)
+
+    baseline = None
+    if baseline_file:
+        baseline = load_baseline(baseline_file)
+        if baseline is None:
+            print(f"could not read baseline file '{baseline_file}'")
+            sys.exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="bcbench") as work_dir:
+        results = Benchmark(options, work_dir).run()
+
+    if json_output:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results, baseline)
+
+    if write_file:
+        save_baseline(write_file, results)
+
+    if baseline:
+        regressions = compare_baseline(results, baseline, tolerance)
+        if regressions:
+            print("")
+            print("performance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
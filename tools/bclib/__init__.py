@@ -2,4 +2,9 @@
 
 from .common import CompileOptions
 from .compiler import BasicCompiler
+from .program import CompileResult
+from .sourcemap import SourceMap
+from .includes import IncludeGraph
+from .optimizer import Optimizer, OPTIMIZATIONS
+from .stats import ProgramStats
 from .decompiler import BasicDecompiler
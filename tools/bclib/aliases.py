@@ -0,0 +1,171 @@
+"""Alias preprocessing."""
+
+from typing import Optional
+
+BASIC_V2_RESERVED_ROOTS = {
+    "TI",
+    "ST",
+    "IF",
+    "TO",
+    "FN",
+    "ON",
+    "OR",
+    "GO",
+    "PI",
+}
+
+TSB_RESERVED_ROOTS = {
+    "AT",
+    "DO",
+    "HI",
+    "UP",
+    "ON",
+    "NO",
+    "RC",
+    "EL",
+    "TR",
+    "DI",
+    "PA",
+    "IN",
+    "TE",
+    "DE",
+    "KE",
+    "ME",
+    "ER",
+    "OU",
+}
+
+LETTERS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+ALPHANUMERICS = LETTERS | frozenset("0123456789")
+
+BASE36_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+#############################################################################
+# Alias Lexer
+#############################################################################
+
+class AliasLexer:
+    """Single pass lexer for @alias tokens outside strings and comments."""
+
+    def __init__(self):
+        # lexed lines, None for lines without aliases
+        self.parts = {}
+
+    def split(self, line: str) -> Optional["list[str]"]:
+        """Split line into literal text (even indices) and alias names (odd indices)."""
+
+        if "@" not in line:
+            return None
+
+        parts = self.parts.get(line, False)
+        if parts is False:
+            parts = AliasLexer.scan(line)
+            self.parts[line] = parts
+
+        return parts
+
+    def get_aliases(self, line: str) -> "list[str]":
+        """Get alias names used in line."""
+
+        parts = self.split(line)
+        if parts is None:
+            return []
+
+        return parts[1::2]
+
+    def replace(self, line: str, alias_map: dict) -> str:
+        """Replace @alias identifiers using map of lower-case alias names."""
+
+        parts = self.split(line)
+        if parts is None:
+            return line
+
+        out = parts[:]
+        for i in range(1, len(out), 2):
+            alias = out[i]
+            out[i] = alias_map.get(alias.lower()) or ("@" + alias)
+
+        return "".join(out)
+
+    @staticmethod
+    def scan(line: str) -> Optional["list[str]"]:
+        """Lex line, returns None if there are no aliases."""
+
+        if "@" not in line:
+            return None
+
+        trimmed = line.strip()
+        if trimmed.startswith("#") or trimmed.startswith(";"):
+            return None
+
+        parts = None
+        last = 0
+        i = 0
+        n = len(line)
+
+        while i < n:
+            ch = line[i]
+
+            if ch == '"':
+                # skip string literal
+                i = line.find('"', i + 1)
+                if i < 0:
+                    break
+                i += 1
+                continue
+
+            if ch == "'":
+                break
+
+            if ch in LETTERS or (ch == "@" and i + 1 < n and line[i + 1] in LETTERS):
+                j = i + 1 if ch != "@" else i + 2
+                while j < n and line[j] in ALPHANUMERICS:
+                    j += 1
+                if j < n and line[j] in "$%":
+                    j += 1
+
+                if ch == "@":
+                    if parts is None:
+                        parts = []
+                    parts.append(line[last:i])
+                    parts.append(line[i + 1:j])
+                    last = j
+                elif j - i == 3 and line[i:j].upper() == "REM":
+                    break
+
+                i = j
+                continue
+
+            i += 1
+
+        if parts is None:
+            return None
+
+        parts.append(line[last:])
+
+        return parts
+
+#############################################################################
+# Alias Root Allocator
+#############################################################################
+
+class AliasRootAllocator:
+    """Hands out 2-character variable roots A0..ZZ, skipping reserved names."""
+
+    def __init__(self, feature_tsb: bool):
+        self.reserved = (BASIC_V2_RESERVED_ROOTS | TSB_RESERVED_ROOTS) if feature_tsb else BASIC_V2_RESERVED_ROOTS
+        self.next_value = int("A0", 36)
+        self.end_value = int("ZZ", 36)
+
+    def allocate(self) -> Optional[str]:
+        """Get next free root, None if all roots are used."""
+
+        while self.next_value <= self.end_value:
+            high, low = divmod(self.next_value, 36)
+            self.next_value += 1
+
+            root = BASE36_DIGITS[high] + BASE36_DIGITS[low]
+            if root not in self.reserved:
+                return root
+
+        return None
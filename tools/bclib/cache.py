@@ -0,0 +1,100 @@
+"""Line cache."""
+
+import json
+
+from typing import Optional
+
+from .common import CompileError, CompileHelper
+
+#############################################################################
+# Line Cache
+#############################################################################
+
+class LineCache:
+    """Persistent cache of tokenized BASIC lines for incremental compilation."""
+
+    VERSION = 2
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.entries = {}
+        self.used_entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(line: str, lower_case: bool, crunch: bool, tsb: bool, verbose_mode: int) -> str:
+        """Build cache key from line text and encoding relevant options."""
+        flags = ("l" if lower_case else "-") + \
+                ("c" if crunch else "-") + \
+                ("t" if tsb else "-") + \
+                str(verbose_mode)
+        return flags + "|" + line
+
+    def load(self):
+        """Load cache file, a missing or outdated cache is silently ignored."""
+
+        self.entries = {}
+        self.used_entries = {}
+
+        try:
+            with open(self.filename, "r", encoding="utf-8") as in_file:
+                data = json.load(in_file)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get("version") != LineCache.VERSION:
+            return
+
+        entries = data.get("lines")
+        if isinstance(entries, dict):
+            self.entries = entries
+
+    def save(self) -> Optional[CompileError]:
+        """Write cache file, only entries used by the last compile are kept."""
+
+        data = {
+            "version": LineCache.VERSION,
+            "lines": self.used_entries
+        }
+
+        CompileHelper.makedirs(self.filename)
+
+        try:
+            with open(self.filename, "w", encoding="utf-8") as out_file:
+                json.dump(data, out_file, separators=(",", ":"))
+        except OSError:
+            return CompileError(self.filename, "could not write file")
+
+        return None
+
+    def lookup(self, key: str, resolve_dependency) -> "Optional[tuple[bytes, Optional[str]]]":
+        """Get cached code and verbose text if all dependencies are unchanged."""
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            for kind, name, value in entry["deps"]:
+                if resolve_dependency(kind, name) != value:
+                    entry = None
+                    break
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.used_entries[key] = entry
+
+        return bytes.fromhex(entry["code"]), entry["verbose"]
+
+    def store(self, key: str, code: bytes, verbose: Optional[str], dependencies: list):
+        """Add tokenized line to cache."""
+
+        entry = {
+            "code": code.hex(),
+            "verbose": verbose,
+            "deps": dependencies
+        }
+
+        self.entries[key] = entry
+        self.used_entries[key] = entry
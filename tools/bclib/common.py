@@ -85,8 +85,11 @@ class CompileHelper:
     @staticmethod
     def makedirs(filename):
         """Ensure output folder exists."""
+        dirname = os.path.dirname(filename)
+        if not dirname:
+            return
         try:
-            os.makedirs(os.path.dirname(filename))
+            os.makedirs(dirname)
         except FileExistsError:
             pass
 
@@ -108,6 +111,20 @@ class CompileHelper:
 
         return None
 
+    @staticmethod
+    def write_binaryfile(filename: str, data: bytes) -> Optional[CompileError]:
+        """Write binary data to file with a single write."""
+
+        CompileHelper.makedirs(filename)
+
+        try:
+            with open(filename, "wb") as binary_file:
+                binary_file.write(data)
+        except OSError:
+            return CompileError(filename, "could not write file")
+
+        return None
+
     @staticmethod
     def get_next_word(s: str, offset: int = 0) -> str:
         """Fetch next word from string."""
@@ -140,6 +157,42 @@ class CompileHelper:
         return word
 
 
+#############################################################################
+# PETSCII Table
+#############################################################################
+
+class PetsciiTable(dict):
+    """Text to PETSCII translation table for use with str.translate()."""
+
+    _instances = {}
+
+    def __init__(self, lower_case: bool, raw_string: bool):
+        super().__init__()
+        for p in range(256):
+            self[p] = CompileHelper.get_petscii(chr(p), lower_case, raw_string)
+        self[8593] = CompileHelper.get_petscii(chr(8593), lower_case, raw_string) # up-arrow
+
+    def __missing__(self, key):
+        # any other char above 0xFF
+        return 0
+
+    @classmethod
+    def get(cls, lower_case: bool, raw_string: bool) -> "PetsciiTable":
+        """Get shared table for upper case, lower case or raw string mode."""
+
+        # raw strings are not case converted
+        key = (bool(lower_case) and not raw_string, bool(raw_string))
+        table = cls._instances.get(key)
+        if table is None:
+            table = PetsciiTable(key[0], key[1])
+            cls._instances[key] = table
+        return table
+
+    def encode(self, s: str) -> bytes:
+        """Convert text to PETSCII bytes."""
+        return s.translate(self).encode("latin-1")
+
+
 #############################################################################
 # Compile Options
 #############################################################################
@@ -154,14 +207,48 @@ class CompileOptions:
         self.feature_aliases = False
         self.include_path = []
         self.map_file = None
+        self.map_format = "text"
+        self.cache_file = None
+        self.dep_file = None
+        self.stats_file = None
+        self.stats_format = "text"
         self.crunch = False
         self.pretty = False
         self.lower_case = False
+        self.jobs = 1
+        self.optimizations = set()
+        self.line_profile = None
+        self.inline_size = 24
+        self.payloads = []
 
     def set_map_file(self, map_file):
         """Set map filename."""
         self.map_file = map_file
 
+    def set_map_format(self, map_format):
+        """Set map file format (text, json or both)."""
+        self.map_format = map_format
+
+    def needs_text_map(self) -> bool:
+        """Check if the text map file with rendered lines is written."""
+        return bool(self.map_file) and self.map_format != "json"
+
+    def set_cache_file(self, cache_file):
+        """Set line cache filename for incremental compilation."""
+        self.cache_file = cache_file
+
+    def set_dep_file(self, dep_file):
+        """Set dependency filename."""
+        self.dep_file = dep_file
+
+    def set_stats_file(self, stats_file):
+        """Set program statistics filename ('-' for console)."""
+        self.stats_file = stats_file
+
+    def set_stats_format(self, stats_format):
+        """Set program statistics format (text or json)."""
+        self.stats_format = stats_format
+
     def append_include_path(self, include_path):
         """Add include path."""
         self.include_path.append(include_path)
@@ -190,6 +277,30 @@ class CompileOptions:
         """Enable formatting of de-compiled BASIC code."""
         self.pretty = True
 
+    def set_jobs(self, jobs):
+        """Set number of tokenizer processes (0: one per CPU)."""
+        self.jobs = jobs
+
+    def set_optimizations(self, optimizations):
+        """Set enabled crunch optimizations."""
+        self.optimizations = set(optimizations)
+
+    def set_line_profile(self, line_profile):
+        """Set line execution profile used by profile-guided optimizations."""
+        self.line_profile = line_profile
+
+    def set_inline_size(self, inline_size):
+        """Set maximum code size in bytes of inlined subroutines."""
+        self.inline_size = inline_size
+
+    def append_payload(self, name, filename, target=None):
+        """Add binary file stored behind the program, optionally copied to target address."""
+        self.payloads.append((name, filename, target))
+
+    def is_optimizing(self) -> bool:
+        """Check if optimization passes run (crunch builds without extensions)."""
+        return self.crunch and not self.feature_tsb and len(self.optimizations) > 0
+
 
 #############################################################################
 # Compile Buffer
@@ -199,6 +310,8 @@ class CompileOptions:
 class CompileBuffer:
     """Compiler buffer."""
 
+    __slots__ = ("buffer", "offset")
+
     def __init__(self):
         self.buffer = bytearray()
         self.offset = 0
@@ -231,14 +344,20 @@ class CompileBuffer:
 
     def store_char(self, c, lower_case: bool = False):
         """Store char to buffer."""
-        self.buffer.append(CompileHelper.get_petscii(c, lower_case))
+        self.buffer.append(PetsciiTable.get(lower_case, False)[ord(c)])
         self.offset += 1
 
     def store_char_raw(self, c, lower_case: bool = False):
         """Store char to buffer."""
-        self.buffer.append(CompileHelper.get_petscii(c, lower_case, True))
+        self.buffer.append(PetsciiTable.get(lower_case, True)[ord(c)])
         self.offset += 1
 
+    def store_text(self, s, lower_case: bool = False, raw_string: bool = False):
+        """Store text converted to PETSCII in one step."""
+        data = PetsciiTable.get(lower_case, raw_string).encode(s)
+        self.buffer.extend(data)
+        self.offset += len(data)
+
     def store_word(self, value):
         """Store word to buffer."""
         self.buffer.append(value & 0xFF)
@@ -251,6 +370,11 @@ class CompileBuffer:
         self.buffer.append(value & 0xFF)
         self.offset += 2
 
+    def store_bytes(self, data):
+        """Append bytes to buffer."""
+        self.buffer.extend(data)
+        self.offset += len(data)
+
     def store_buffer(self, buffer):
         """Append buffer to buffer."""
         buffer_bytes = buffer.get_buffer()
@@ -259,8 +383,7 @@ class CompileBuffer:
 
     def store_string(self, s, lower_case: bool = False):
         """Store string bytes to buffer."""
-        for c in s:
-            self.store_char(c, lower_case)
+        self.store_text(s, lower_case)
 
     def peek_last_byte(self):
         """Look at last byte."""
@@ -6,427 +6,270 @@ import re
 from typing import Optional
 
 from .constants import Constants
-from .common import CompileError, CompileOptions, CompileBuffer, CompileHelper
-
-BASIC_V2_RESERVED_ROOTS = {
-    "TI",
-    "ST",
-    "IF",
-    "TO",
-    "FN",
-    "ON",
-    "OR",
-    "GO",
-    "PI",
-}
-
-TSB_RESERVED_ROOTS = {
-    "AT",
-    "DO",
-    "HI",
-    "UP",
-    "ON",
-    "NO",
-    "RC",
-    "EL",
-    "TR",
-    "DI",
-    "PA",
-    "IN",
-    "TE",
-    "DE",
-    "KE",
-    "ME",
-    "ER",
-    "OU",
-}
+from .common import CompileError, CompileOptions, CompileHelper
+from .tokens import TokenTable
+from .program import BasicModule, BasicLine, BasicProgram, CompileResult
+from .cache import LineCache
+from .aliases import AliasLexer, AliasRootAllocator
+from .includes import IncludeGraph
+from .optimizer import Optimizer
+from .stats import ProgramStats
+from .sources import SourceCache
+from .sourcemap import SourceMap
+from .parallel import tokenize_parallel
+from .payloads import Payload, compile_with_payloads
+from .expressions import ConstantExpression, NAME_PATTERN, format_value
+
+try:
+    from proflib import Profiler
+except ImportError:
+    from proflib.null import NullProfiler as Profiler
+
+HEX_DIGITS = "0123456789abcdefABCDEF"
+BINARY_DIGITS = "01"
 
 #############################################################################
-# Basic Module
-#############################################################################
-
-class BasicModule:
-    """Basic module."""
-
-    def __init__(self, filename: str, options: CompileOptions):
-        self.filename = filename
-        self.options = options
-
-    def read(self) -> (Optional[str], Optional[CompileError]):
-        """Read module source code from file."""
-        data = None
-        try:
-            with open(self.filename, "r", encoding="utf-8") as in_file:
-                data = in_file.readlines()
-        except OSError:
-            return None, CompileError(self.filename, "could not read file")
-
-        return data, None
-
-
-#############################################################################
-# Basic Line
-#############################################################################
-
-class BasicLine:
-    """Basic line."""
-
-    def __init__(self, module: BasicModule, line_number: Optional[int] = None):
-        self.buffer = CompileBuffer()
-        self.module = module
-        self.line_number = line_number
-        self.addr = 0x0
-        self.next_addr = 0x0
-        self.meta = False
-        self.verbose = None
-        self.source_line = None
-        self.index = None
-
-    def get_bytes(self) -> CompileBuffer:
-        """Get buffer object."""
-        return self.buffer.get_buffer()
-
-    def set_source_line(self, source_line: str):
-        """Set raw text."""
-        self.source_line = source_line
-
-    def set_index(self, index: int):
-        """Set line index."""
-        self.index = index
-
-    def set_meta(self):
-        """Mark line as nop/meta information."""
-        self.meta = True
-
-    def set_addr(self, addr: int):
-        """Set BASIC line memory address."""
-        self.addr = addr
-
-    def set_next_addr(self, next_addr: int):
-        """Set next BASIC line memory address."""
-        self.next_addr = next_addr
-
-    def get_code_size(self) -> int:
-        """Get code size in bytes."""
-        return self.buffer.length()
-
-    def get_total_size(self) -> int:
-        """Get line header and code size in bytes."""
-        return (
-            self.get_code_size() + 5
-        )  # 2 (next addr) + 2 (line number) + CODE + 1 (null byte for end)
-
-    def add_verbose(self, s):
-        """Add verbose info."""
-        if self.verbose is None:
-            self.verbose = ""
-        self.verbose += s
-
-    def is_empty(self) -> bool:
-        """Check if buffer is empty."""
-        return self.buffer.length() < 1
-
-    def set_line_number(self, line_number: int):
-        """Set line number."""
-        self.line_number = line_number
-
-    def store_byte(self, value, verbose: Optional[str] = None):
-        """Store byte to buffer."""
-        self.buffer.store_byte(value)
-        if verbose:
-            self.add_verbose(verbose)
-
-    def peek_last_char(self):
-        """Get last char from buffer."""
-        return self.buffer.peek_last_char()
-
-    def drop_last_char(self):
-        """Drop last char from buffer."""
-        self.buffer.drop_last_char()
-        if len(self.verbose) > 0 and self.verbose[-1] == ":":
-            self.verbose = self.verbose[:-1]
-
-    def store_char(self, c, verbose: Optional[str] = None):
-        """Store char to buffer."""
-        self.buffer.store_char(c, self.module.options.lower_case)
-        self.add_verbose(verbose if verbose else c)
-
-    def store_char_raw(self, c, verbose: Optional[str] = None):
-        """Store char to buffer."""
-        self.buffer.store_char_raw(c)
-        self.add_verbose(verbose if verbose else c)
-
-    def store_string(self, s: str, verbose: Optional[str] = None):
-        """Store string bytes to buffer."""
-        self.buffer.store_string(s, self.module.options.lower_case)
-        self.add_verbose(verbose if verbose else s)
-
-    def store_word_be(self, value, verbose: Optional[str] = None):
-        """Store word to buffer."""
-        self.buffer.store_word_be(value)
-        if verbose:
-            self.add_verbose(verbose)
-
-    def to_string(self) -> str:
-        """Generate string representation."""
-
-        if self.meta:
-            return self.verbose
-
-        if not self.verbose:
-            return f"{self.line_number}"
-
-        return f"{self.line_number} {self.verbose}"
-
-
-#############################################################################
-# SourceMap
+# Basic Compiler State
 #############################################################################
-
-class SourceMap:
-    """Debug information."""
+class BasicCompilerState:
+    """Basic compiler state."""
 
     def __init__(self):
-        self.buffer = []
-
-    def add_file(self, filename):
-        """Add file to source map."""
-        self.buffer.append(os.path.normpath(filename))
-
-    def add(self, start_addr, end_addr, idx, line, line_len):
-        """Add entry to source map."""
-        self.buffer.append(f"{start_addr},{end_addr},{idx},{line},{line_len}")
+        """Constructor."""
+        self.reset()
 
-    def get_string(self):
-        """Join all entries to string."""
-        s = "\n".join(self.buffer)
-        return s
+    def reset(self):
+        """Reset state."""
+        self.line_step_size = 1
+        self.next_line = -1
 
 
 #############################################################################
-# Basic Program
+# Basic Compiler
 #############################################################################
 
-class BasicProgram:
-    """Basic program."""
+class BasicCompiler:
+    """Basic compiler."""
 
-    def __init__(self, start_addr):
-        self.start_addr = start_addr
-        self.lines: list[BasicLine] = []
+    def __init__(
+        self,
+        options: CompileOptions,
+        include_graph: Optional[IncludeGraph] = None,
+        profiler: Optional[Profiler] = None
+    ):
+        """Constructor."""
 
-    def get_lines(self) -> "list[BasicLine]":
-        """Get BASIC lines."""
-        return self.lines
+        self.options = options
+        self.include_graph = include_graph if include_graph else IncludeGraph()
+        self.profiler = profiler if profiler else Profiler()
+        self.program = BasicProgram(Constants.BASIC_START_ADDR)
+        self.line_number_map = None
+        self.last_line = 0
+        self.max_line_number = 0
+        self.new_labels = []
+        self.labels = {}
+        self.constants = {}
+        self.modules = None
+        self.sources = SourceCache()
+        self.dependencies = {}
+        self.alias_map = {}
+        self.alias_count = 0
+        self.alias_lexer = AliasLexer()
+        self.repeat_pattern = re.compile("(\\d+)\\s(\\w+)")
+        self.state = BasicCompilerState()
+        self.line_cache = None
+        self.line_dependencies = None
+        self.collect_line_dependencies = False
+        self.pending_lines = None
+        self.optimizer = None
+        self.track_verbose = True
+        self.token_table = TokenTable.get(self.options.feature_tsb)
+        self.sorted_token_list = self.token_table.sorted_token_list
+        self.token_map = self.token_table.token_map
 
-    def add_line(self, line: BasicLine):
-        """Add BASIC line."""
-        self.lines.append(line)
+    def reset(self):
+        """Reset per-compile state."""
 
-    def add_meta(self, module: BasicModule, s: str):
-        """Add meta information."""
-        line = BasicLine(module)
-        line.set_meta()
-        line.add_verbose(s)
-        self.add_line(line)
+        self.reset_passes()
+        self.dependencies = {}
+        self.line_cache = None
+        self.include_graph.validate()
 
-    def resolve(self):
-        """Resolve all addresses."""
+    def reset_passes(self):
+        """Reset state of the compile passes."""
 
-        addr = self.start_addr
+        self.program = BasicProgram(Constants.BASIC_START_ADDR)
+        self.line_number_map = None
+        self.last_line = 0
+        self.max_line_number = 0
+        self.new_labels = []
+        self.labels = {}
+        self.constants = {}
+        self.modules = None
+        self.line_dependencies = None
+        self.pending_lines = None
+        self.optimizer = None
+        self.state.reset()
 
-        for basic_line in self.get_lines():
-            if basic_line.meta:
-                continue
-            if basic_line.is_empty():
-                print(f"skip empty line {basic_line.line_number}")
-                continue
+    def compile(
+        self, inputs: "list[str]", output: Optional[str]
+    ) -> Optional[CompileError]:
+        """Compile basic source and generate encoded output."""
 
-            next_addr = addr + basic_line.get_total_size()
-            basic_line.set_addr(addr)
-            basic_line.set_next_addr(next_addr)
-            addr = next_addr
+        options = self.options
+        profiler = self.profiler
 
-    def write_map(self, filename: Optional[str]) -> Optional[CompileError]:
-        """Write map file."""
+        result, err = self.compile_to_memory(inputs)
+        if err:
+            return err
+
+        # dump generated code to stdout
+        if options.verbosity_level > 0:
+            for basic_line in result.program.get_lines():
+                print(basic_line.to_string())
 
-        s = []
+        # write PRG file
+        if output:
+            with profiler.phase("write_prg") as phase:
+                phase.bytes_out = len(result.prg)
+                err = result.write_prg(output)
+            if err:
+                return err
 
-        source_file = ""
+        # write map file
+        if options.needs_text_map():
+            with profiler.phase("write_map"):
+                err = result.program.write_map(options.map_file)
+            if err:
+                return err
 
-        s.append(
-            "################################################################################"
-        )
-        s.append("# MAP FILE")
-        s.append("# generated file: DO NOT EDIT!")
-        s.append(
-            "################################################################################"
-        )
+        # write indexed source map
+        if options.map_file and options.map_format in ("json", "both"):
+            json_map_file = options.map_file if options.map_format == "json" else options.map_file + ".json"
+            with profiler.phase("write_source_map"):
+                err = SourceMap.from_line_map(result.line_map).write(json_map_file)
+            if err:
+                return err
 
-        for basic_line in self.get_lines():
-            if basic_line.meta or basic_line.is_empty():
-                continue
+        # write program statistics
+        if options.stats_file:
+            with profiler.phase("write_stats"):
+                stats = ProgramStats(options.feature_tsb)
+                stats.collect(result.program.get_lines())
+                stats_file = options.stats_file if options.stats_file != "-" else None
+                err = stats.write(stats_file, options.stats_format)
+            if err:
+                return err
 
-            if source_file != basic_line.module.filename:
-                source_file = basic_line.module.filename
-                s.append("")
-                s.append(f"{source_file}")
-
-            # --------------------------------------------------
-            # Info Structure:
-            # --------------------------------------------------
-            # start_addr : program line absolute start address
-            # end_addr   : program line absolute end address
-            # line       : numeric BASIC line number
-            # idx        : row number in source file
-            # len        : number of source chars
-            # --------------------------------------------------
-
-            start_addr = basic_line.addr
-            end_addr = start_addr + basic_line.get_total_size() - 1
-            line = basic_line.line_number
-            idx = basic_line.index
-            line_len = len(basic_line.source_line)
-            src = basic_line.to_string()
-
-            info = f"{start_addr},{end_addr},{line},{idx},{line_len}"
-
-            s.append(info.ljust(30) + f"# {src}")
-
-        s.append("")
-        content = "\n".join(s)
-
-        if filename:
-            err = CompileHelper.write_textfile(filename, content)
+        # write dependency file
+        if options.dep_file and output:
+            with profiler.phase("write_depfile"):
+                err = self.write_depfile(options.dep_file, output)
             if err:
                 return err
-        else:
-            print(content)
 
         return None
 
-    def write_prg(self, filename: Optional[str]) -> Optional[CompileError]:
-        """Write program to file or console."""
+    def compile_text(
+        self, text: str, filename: str = "main.bas"
+    ) -> (Optional[CompileResult], Optional[CompileError]):
+        """Compile source code text, include files are looked up relative to filename."""
 
-        if not filename:
-            return None
+        sources = SourceCache()
+        sources.add_text(filename, text)
 
-        CompileHelper.makedirs(filename)
+        return self.compile_to_memory([filename], sources)
 
-        try:
-            with open(filename, "wb") as binary_file:
-                # program load address (2 bytes)
-                addr = self.start_addr
-                binary_file.write(bytearray([addr & 0xFF, (addr & 0xFF00) >> 8]))
-
-                # write basic lines
-                for basic_line in self.get_lines():
-                    if basic_line.meta:
-                        continue
+    def compile_to_memory(
+        self, inputs: "list[str]", sources: Optional[SourceCache] = None
+    ) -> (Optional[CompileResult], Optional[CompileError]):
+        """Compile basic sources to PRG data and line map without writing files."""
 
-                    # address of next statement (2 bytes)
-                    next_addr = basic_line.next_addr
-                    binary_file.write(
-                        bytearray([next_addr & 0xFF, (next_addr & 0xFF00) >> 8])
-                    )
+        options = self.options
 
-                    # line number (2 bytes)
-                    line_number = basic_line.line_number
-                    binary_file.write(
-                        bytearray([line_number & 0xFF, (line_number & 0xFF00) >> 8])
-                    )
+        self.reset()
 
-                    # interpreter code
-                    binary_file.write(basic_line.get_bytes())
+        # backup initial options (might be changed by preprocessor)
+        initial_lower_case_settings = options.lower_case
 
-                    # end of line (1 zero-byte)
-                    binary_file.write(b"\x00")  # end of line
+        # read every source file just once for all passes
+        self.sources = sources if sources else SourceCache()
 
-                # end of program (2 zero-bytes)
-                binary_file.write(bytearray([0x0, 0x0]))
+        # verbose line text is only needed for the map file and the dump
+        self.track_verbose = options.needs_text_map() or options.verbosity_level > 0
 
-        except OSError:
-            return (CompileError(filename, "could not write file"), None)
+        # collect input and include files
+        for filename in inputs:
+            self.add_dependency(filename)
 
-        return None
+        # load tokenized lines of previous compile
+        if options.cache_file:
+            with self.profiler.phase("load_line_cache"):
+                self.line_cache = LineCache(options.cache_file)
+                self.line_cache.load()
 
+        payloads, err = self.load_payloads()
+        if err:
+            return None, err
 
-#############################################################################
-# Basic Compiler State
-#############################################################################
-class BasicCompilerState:
-    """Basic compiler state."""
+        if payloads:
+            err = compile_with_payloads(self, inputs, payloads)
+        else:
+            err = self.compile_program(inputs)
 
-    def __init__(self):
-        """Constructor."""
-        self.reset()
+        # restore initial options (might be changed by compilation)
+        options.lower_case = initial_lower_case_settings
 
-    def reset(self):
-        """Reset state."""
-        self.line_step_size = 1
-        self.next_line = -1
+        if err:
+            return None, err
 
+        # write line cache
+        if self.line_cache:
+            with self.profiler.phase("save_line_cache"):
+                err = self.line_cache.save()
+            if err:
+                return None, err
 
-#############################################################################
-# Basic Compiler
-#############################################################################
+        with self.profiler.phase("encode") as phase:
+            result = CompileResult(self.program)
+            phase.bytes_out = len(result.prg)
 
-class BasicCompiler:
-    """Basic compiler."""
+        return result, None
 
-    def __init__(self, options: CompileOptions):
-        """Constructor."""
+    def load_payloads(self) -> ("list[Payload]", Optional[CompileError]):
+        """Load binary payloads of options."""
 
-        self.options = options
-        self.program = BasicProgram(Constants.BASIC_START_ADDR)
-        self.sorted_token_list = None
-        self.token_map = None
-        self.line_number_map = None
-        self.last_line = 0
-        self.max_line_number = 0
-        self.new_labels = []
-        self.labels = {}
-        self.modules = None
-        self.alias_map = {}
-        self.alias_count = 0
-        self.repeat_pattern = re.compile("(\\d+)\\s(\\w+)")
-        self.state = BasicCompilerState()
+        payloads = []
+        for name, filename, target in self.options.payloads:
+            if not NAME_PATTERN.fullmatch(name) or self.is_token(name):
+                return None, CompileError(filename, f"invalid payload name '{name}'")
+            payload = Payload(name, filename, target)
+            err = payload.load()
+            if err:
+                return None, err
+            self.add_dependency(filename)
+            payloads.append(payload)
 
-        if self.options.feature_tsb:
-            all_tokens = list(Constants.BASIC_TOKENS.keys()) + list(
-                Constants.TSB_TOKENS.keys()
-            )
-            self.sorted_token_list = sorted(all_tokens, key=lambda x: -len(x))
-            self.token_map = {}
-            self.token_map.update(Constants.BASIC_TOKENS)
-            for k, v in Constants.TSB_TOKENS.items():
-                if k in self.token_map:
-                    continue
-                if v & 0xFF00:
-                    v += 0x640000
-                else:
-                    v += 0x6400
-                self.token_map[k] = v
-        else:
-            self.sorted_token_list = sorted(Constants.BASIC_TOKENS.keys(), key=lambda x: -len(x))
-            self.token_map = Constants.BASIC_TOKENS
+        return payloads, None
 
-    def compile(
-        self, inputs: "list[str]", output: Optional[str]
-    ) -> Optional[CompileError]:
-        """Compile basic source and generate encoded output."""
+    def compile_program(self, inputs: "list[str]") -> Optional[CompileError]:
+        """Run all compile passes and resolve program addresses."""
 
         options = self.options
+        profiler = self.profiler
 
-        # backup initial options (might be changed by preprocessor)
         initial_lower_case_settings = options.lower_case
 
         # build alias map before preprocessing so aliased labels can be resolved
-        err = self.prepare_alias_map(inputs)
+        with profiler.phase("aliases"):
+            err = self.prepare_alias_map(inputs)
         if err:
             return err
 
         # run preprocessing steps
-        err = self.preprocessor(inputs)
+        with profiler.phase("preprocess") as phase:
+            err = self.preprocessor(inputs)
+            phase.bytes_in = self.sources.bytes_read
         if err:
             return err
 
@@ -442,11 +285,38 @@ class BasicCompiler:
         options.lower_case = initial_lower_case_settings
         self.state.reset()
 
+        with profiler.phase("tokenize"):
+            err = self.tokenize_modules(need_ending_line)
+        if err:
+            return err
+
+        # optimize crunched program
+        if options.is_optimizing():
+            with profiler.phase("optimize"):
+                self.optimizer = Optimizer(self.program, options)
+                err = self.optimizer.run()
+            if err:
+                return err
+
+        # resolve program addresses
+        with profiler.phase("resolve"):
+            self.program.resolve()
+
+        return None
+
+    def tokenize_modules(self, need_ending_line: bool) -> Optional[CompileError]:
+        """Compile pass, generates code for all lines."""
+
+        # tokenize in worker processes after line numbering
+        if self.options.jobs != 1:
+            self.pending_lines = []
+
         # compile all modules
         for module in self.modules:
             err = self.compile_module(module)
             if err:
-                return err
+                # report earlier tokenization errors first, like the sequential path
+                return self.tokenize_pending_lines() or err
 
         # add REM statement at the end in case there was a label at the end
         if need_ending_line and len(self.modules) > 0:
@@ -456,32 +326,31 @@ class BasicCompiler:
                 ending_line.set_index(-1)
                 self.program.add_line(ending_line)
 
-        # resolve program addresses
-        self.program.resolve()
+        return self.tokenize_pending_lines()
 
-        # dump generated code to stdout
-        if options.verbosity_level > 0:
-            for basic_line in self.program.get_lines():
-                print(basic_line.to_string())
+    def add_dependency(self, filename: str):
+        """Register source file the program depends on."""
+        self.dependencies[os.path.abspath(filename)] = True
 
-        # write PRG file
-        err = self.program.write_prg(output)
-        if err:
-            return err
+    def write_depfile(self, filename: str, target: str) -> Optional[CompileError]:
+        """Write Makefile-style dependency file (e.g. for ninja 'deps = gcc')."""
 
-        # write map file
-        if options.map_file:
-            err = self.program.write_map(options.map_file)
-            if err:
-                return err
+        def escape(path: str) -> str:
+            return path.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
 
-        return None
+        s = escape(target) + ":"
+        for dependency in self.dependencies:
+            s += " \\\n  " + escape(dependency)
+        s += "\n"
+
+        return CompileHelper.write_textfile(filename, s)
 
     def prepare_alias_map(self, inputs: "list[str]") -> Optional[CompileError]:
         """Collect aliases from full source/include set and build replacement map."""
 
         self.alias_map = {}
         self.alias_count = 0
+        self.alias_lexer = AliasLexer()
 
         if not self.options.feature_aliases:
             return None
@@ -494,18 +363,12 @@ class BasicCompiler:
         alias_canonical = {}
 
         for filename in source_files:
-            try:
-                with open(filename, "r", encoding="utf-8") as src_file:
-                    lines = src_file.readlines()
-            except OSError:
-                return CompileError(filename, "could not read file")
+            lines, err = self.sources.read(filename)
+            if err:
+                return err
 
             for line in lines:
-                for token in self.tokenize_alias_tokens(line.rstrip("\n")):
-                    alias = token[1:]
-                    if not alias:
-                        continue
-
+                for alias in self.alias_lexer.get_aliases(line):
                     alias_key = alias.lower()
                     if alias_key in alias_canonical:
                         continue
@@ -516,22 +379,15 @@ class BasicCompiler:
         if len(alias_order_keys) < 1:
             return None
 
-        pool = self.build_root_pool()
-        reserved = set(BASIC_V2_RESERVED_ROOTS)
-        if self.options.feature_tsb:
-            reserved.update(TSB_RESERVED_ROOTS)
+        self.sources.set_line_filter(self.replace_aliases_in_line)
+
+        allocator = AliasRootAllocator(self.options.feature_tsb)
 
         alias_map = {}
         for alias_key in alias_order_keys:
             alias = alias_canonical[alias_key]
 
-            assigned_root = None
-            for root in pool:
-                if root not in reserved:
-                    assigned_root = root
-                    reserved.add(root)
-                    break
-
+            assigned_root = allocator.allocate()
             if assigned_root is None:
                 return CompileError(
                     "",
@@ -565,20 +421,18 @@ class BasicCompiler:
                 continue
 
             visited.add(current)
-            if not os.path.exists(current):
+            if not self.sources.exists(current):
                 continue
 
             ordered_files.append(current)
 
-            try:
-                with open(current, "r", encoding="utf-8") as src_file:
-                    lines = src_file.readlines()
-            except OSError:
+            lines, err = self.sources.read(current)
+            if err:
                 continue
 
             parent_dir = os.path.dirname(current)
             for line in lines:
-                include_path = self.extract_include_path(line)
+                include_path = IncludeGraph.parse_include(line)
                 if not include_path:
                     continue
 
@@ -586,176 +440,21 @@ class BasicCompiler:
                 if not resolved:
                     continue
 
+                self.add_dependency(resolved)
+                self.include_graph.add_include(current, resolved)
+
                 if resolved not in visited:
                     queue.append(resolved)
 
         return ordered_files
 
-    def extract_include_path(self, line: str) -> Optional[str]:
-        """Extract include path from #include lines."""
-
-        trimmed = line.strip()
-        result = re.match(r'^#include\s+["\']([^"\']+)["\']', trimmed, re.IGNORECASE)
-        if not result:
-            return None
-
-        return result.group(1)
-
-    def is_letter(self, c: str) -> bool:
-        return bool(re.match(r"[a-zA-Z]", c))
-
-    def is_alphanumeric(self, c: str) -> bool:
-        return bool(re.match(r"[a-zA-Z0-9]", c))
-
-    def read_alias_token(self, line: str, start: int) -> tuple[str, int]:
-        """Read identifier token with optional @ prefix and type suffix."""
-
-        i = start
-        n = len(line)
-        text = ""
-
-        if i < n and line[i] == "@":
-            text += "@"
-            i += 1
-
-        if i >= n:
-            return text, i
-
-        text += line[i]
-        i += 1
-
-        while i < n and self.is_alphanumeric(line[i]):
-            text += line[i]
-            i += 1
-
-        if i < n and (line[i] == "$" or line[i] == "%"):
-            text += line[i]
-            i += 1
-
-        return text, i
-
-    def tokenize_alias_tokens(self, line: str) -> "list[str]":
-        """Extract @alias tokens outside strings/comments."""
-
-        trimmed = line.strip()
-        if trimmed.startswith("#") or trimmed.startswith(";"):
-            return []
-
-        tokens = []
-        i = 0
-        n = len(line)
-        in_string = False
-
-        while i < n:
-            ch = line[i]
-
-            if ch == '"':
-                in_string = not in_string
-                i += 1
-                continue
-
-            if not in_string:
-                if ch == "'":
-                    break
-
-                if ch == "@" and i + 1 < n and self.is_letter(line[i + 1]):
-                    token, next_i = self.read_alias_token(line, i)
-                    tokens.append(token)
-                    i = next_i
-                    continue
-
-                if self.is_letter(ch):
-                    token, next_i = self.read_alias_token(line, i)
-                    if token.upper() == "REM":
-                        break
-                    i = next_i
-                    continue
-
-            i += 1
-
-        return tokens
-
     def replace_aliases_in_line(self, line: str) -> str:
         """Replace @alias identifiers in a single line."""
 
         if self.alias_count < 1:
             return line
 
-        trimmed = line.strip()
-        if trimmed.startswith("#") or trimmed.startswith(";"):
-            return line
-
-        out = []
-        i = 0
-        n = len(line)
-        in_string = False
-
-        while i < n:
-            ch = line[i]
-
-            if ch == '"':
-                in_string = not in_string
-                out.append(ch)
-                i += 1
-                continue
-
-            if not in_string:
-                if ch == "'":
-                    out.append(line[i:])
-                    break
-
-                if ch == "@" and i + 1 < n and self.is_letter(line[i + 1]):
-                    token, next_i = self.read_alias_token(line, i)
-                    alias_name = token[1:]
-                    alias_key = alias_name.lower()
-                    if alias_key in self.alias_map:
-                        out.append(self.alias_map[alias_key])
-                    else:
-                        out.append(token)
-
-                    i = next_i
-                    continue
-
-                if self.is_letter(ch):
-                    token, next_i = self.read_alias_token(line, i)
-                    if token.upper() == "REM":
-                        out.append(line[i:])
-                        break
-                    out.append(token)
-                    i = next_i
-                    continue
-
-            out.append(ch)
-            i += 1
-
-        return "".join(out)
-
-    def build_root_pool(self) -> "list[str]":
-        """Build available 2-character roots from A0..ZZ."""
-
-        start = int("A0", 36)
-        end = int("ZZ", 36)
-        pool = []
-
-        for number in range(start, end + 1):
-            pool.append(self.to_base36(number))
-
-        return pool
-
-    def to_base36(self, value: int) -> str:
-        """Convert integer to upper-case base36 string."""
-
-        if value == 0:
-            return "0"
-
-        digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-        out = ""
-        n = value
-        while n > 0:
-            n, rem = divmod(n, 36)
-            out = digits[rem] + out
-
-        return out
+        return self.alias_lexer.replace(line, self.alias_map)
 
     def preprocessor(self, inputs: "list[str]") -> Optional[CompileError]:
         """Preprocess files."""
@@ -780,13 +479,12 @@ class BasicCompiler:
     def preprocess_module(self, module: BasicModule) -> Optional[CompileError]:
         """Preprocess file."""
 
-        data, err = module.read()
+        data, err = self.sources.read_processed(module.filename)
         if err:
             return err
 
         line_index = -1
-        for raw_line in data:
-            line = self.replace_aliases_in_line(raw_line.rstrip("\n")).strip()
+        for line in data:
             line_index += 1
 
             if len(line) < 1:
@@ -820,11 +518,7 @@ class BasicCompiler:
 
         if directive == "include":
             # handle include statement
-            include_file = line[len(directive) + 1 :].strip()
-            if include_file.startswith("'"):
-                include_file = include_file.strip("'")
-            elif include_file.startswith('"'):
-                include_file = include_file.strip('"')
+            include_file = IncludeGraph.parse_include(line)
 
             # lookup file using include path
             include_file_abs = self.lookup_file(include_file, os.path.dirname(filename))
@@ -833,6 +527,9 @@ class BasicCompiler:
                     filename, f"include file not found '{include_file}'", line_index
                 )
 
+            self.add_dependency(include_file_abs)
+            self.include_graph.add_include(filename, include_file_abs)
+
             included_module = BasicModule(include_file_abs, options)
 
             if preprocess:
@@ -855,6 +552,13 @@ class BasicCompiler:
             # switch compiler text mode to lower/upper case
             options.lower_case = True
 
+        elif directive == "const":
+            # define compile-time constant (e.g., #const VIC = $d000)
+            if preprocess:
+                err = self.define_constant(line, filename, line_index)
+                if err:
+                    return err
+
         elif directive == "linestep":
             # set BASIC line number increment (e.g., #linestep 10)
             parts = line.split()
@@ -888,19 +592,90 @@ class BasicCompiler:
 
         return None
 
+    def define_constant(self, line: str, filename: str, line_index: int) -> Optional[CompileError]:
+        """Evaluate #const directive and add constant."""
+
+        definition = line.strip()[len("#const"):]
+        name, separator, expression_text = definition.partition("=")
+        name = name.strip()
+
+        if not separator or not NAME_PATTERN.fullmatch(name):
+            return CompileError(filename, "invalid #const directive, expected '#const NAME = expression'", line_index)
+
+        if self.is_token(name):
+            return CompileError(filename, f"constant name '{name}' is a BASIC keyword", line_index)
+
+        expression = ConstantExpression(self.constants)
+        end = expression.scan(expression_text)
+        if expression_text[end:].strip():
+            return CompileError(filename, f"invalid constant expression '{expression_text.strip()}'", line_index)
+
+        value, err = expression.evaluate()
+        if err:
+            return CompileError(filename, err, line_index)
+
+        key = name.lower()
+        if key in self.constants and self.constants[key] != value:
+            return CompileError(filename, f"constant '{name}' redefined", line_index)
+
+        self.constants[key] = value
+
+        return None
+
+    def read_constant(self, line: str, ofs: int, in_data: bool, after_token: bool) -> "Optional[tuple[str, int]]":
+        """Get literal of constant or folded constant expression at offset and end offset."""
+
+        if ofs > 0 and not after_token and (line[ofs-1].isalnum() or line[ofs-1] in "_.$%"):
+            # inside of name or number
+            return None
+
+        match = NAME_PATTERN.match(line, ofs)
+        if match:
+            name = match[0].lower()
+            if name not in self.constants or (match.end() < len(line) and line[match.end()] in "$%("):
+                return None
+
+        prev_char = line[:ofs].rstrip()[-1:]
+        if not in_data and prev_char not in "+-*/^":
+            # fold expression if it is not part of an operation with higher precedence
+            expression = ConstantExpression(self.constants)
+            end = expression.scan(line, ofs)
+            if expression.names and len(expression.tokens) > 1:
+                value, err = expression.evaluate()
+                if not err:
+                    for name in expression.names:
+                        self.add_constant_dependency(name)
+                    return format_value(value), end
+
+        if not match:
+            return None
+
+        value = self.constants[name]
+        self.add_constant_dependency(name)
+
+        text = format_value(value)
+        if value < 0 and not in_data:
+            text = f"({text})"
+
+        return text, match.end()
+
+    def add_constant_dependency(self, name: str):
+        """Record constant a tokenized line depends on."""
+        if self.line_dependencies is not None:
+            self.line_dependencies.append(("const", name, self.constants[name]))
+
     def compile_module(self, module: BasicModule) -> Optional[CompileError]:
         """Compile basic file."""
         data = None
 
         program = self.program
 
-        data, err = module.read()
+        data, err = self.sources.read_processed(module.filename)
         if err:
             return err
 
         line_index = -1
-        for raw_line in data:
-            line = self.replace_aliases_in_line(raw_line.rstrip("\n")).strip()
+        for line in data:
             line_index += 1
 
             if len(line) < 1:
@@ -927,11 +702,8 @@ class BasicCompiler:
     def compile_line(self, module: BasicModule, line: str, line_index: int):
         """Compile a single basic line of source code."""
 
-        crunch = self.options.crunch
-        verbosity_level = self.options.verbosity_level
-
         # parse line number or label from line
-        (line_number, label, ofs, err) = self.fetch_line_info(module, line, False, line_index)
+        (line_number, _label, ofs, err) = self.fetch_line_info(module, line, False, line_index)
         if err:
             return (None, err)
 
@@ -939,7 +711,52 @@ class BasicCompiler:
             # just label line, no BASIC code
             return (None, None)
 
-        basic_line = BasicLine(module, line_number)
+        basic_line = BasicLine(module, line_number, self.track_verbose)
+
+        if self.pending_lines is not None:
+            # parallel mode, line is tokenized after all lines are numbered
+            self.pending_lines.append((basic_line, line, line_index, ofs, self.options.lower_case))
+            return (basic_line, None)
+
+        err = self.tokenize_line(basic_line, line, line_index, ofs)
+        if err:
+            return (None, err)
+
+        return (basic_line, None)
+
+    def get_line_cache_key(self, line: str, lower_case: bool) -> str:
+        """Get line cache key for current options."""
+
+        verbose_mode = (2 if self.options.verbosity_level >= 2 else 1) if self.track_verbose else 0
+        key = LineCache.make_key(
+            line, lower_case, self.options.crunch, self.options.feature_tsb, verbose_mode
+        )
+
+        if self.constants:
+            # newly defined constant names change tokenization of unchanged lines
+            key = ",".join(sorted(self.constants)) + "|" + key
+
+        return key
+
+    def tokenize_line(
+        self, basic_line: BasicLine, line: str, line_index: int, ofs: int
+    ) -> Optional[CompileError]:
+        """Tokenize BASIC code of line starting at offset."""
+
+        module = basic_line.module
+        crunch = self.options.crunch
+        verbosity_level = self.options.verbosity_level
+
+        line_cache = self.line_cache
+        if line_cache:
+            # reuse tokenized line if text, options and referenced labels are unchanged
+            cache_key = self.get_line_cache_key(line, self.options.lower_case)
+            cached = line_cache.lookup(cache_key, self.resolve_line_dependency)
+            if cached:
+                code, verbose = cached
+                basic_line.store_bytes(code, verbose)
+                return None
+            self.line_dependencies = []
 
         last_was_jump = 0x0
 
@@ -947,6 +764,9 @@ class BasicCompiler:
 
         command_token = None
 
+        # end offset of last token, names may follow directly
+        token_end = -1
+
         while ofs < len(line):
             c = line[ofs]
             current_char = c
@@ -1037,13 +857,15 @@ class BasicCompiler:
                                 basic_line.store_byte(control_char, f"{{{control_char}}}")
 
                     else:
-                        # store string characters
-                        c = line[ofs]
-                        if raw_mode:
-                            basic_line.store_char_raw(c, line[ofs])
-                        else:
-                            basic_line.store_char(c, line[ofs])
-                        ofs += 1
+                        # store string characters up to next control mnemonic or quote
+                        end = line.find(quote_char, ofs)
+                        if end < 0:
+                            end = len(line)
+                        control_start = line.find("{", ofs, end)
+                        if control_start >= 0:
+                            end = control_start
+                        basic_line.store_text(line[ofs:end], raw_mode)
+                        ofs = end
 
                 if ofs < len(line) and line[ofs] == quote_char:
                     basic_line.store_char('"', line[ofs])
@@ -1134,7 +956,7 @@ class BasicCompiler:
                             basic_line.store_string(label)
                         else:
                             # get line number from label
-                            label_line_number = self.labels.get(label.lower())
+                            label_line_number = self.lookup_label(label)
 
                             if label_line_number:
                                 basic_line.store_string(str(label_line_number))
@@ -1144,13 +966,10 @@ class BasicCompiler:
                                 last_was_jump = 0x0
                                 ofs = ofs_before_label
                             else:
-                                return (
-                                    None,
-                                    CompileError(
-                                        module.filename,
-                                        f"undefined label '{label}'",
-                                        line_index,
-                                    ),
+                                return CompileError(
+                                    module.filename,
+                                    f"undefined label '{label}'",
+                                    line_index,
                                 )
 
             elif last_was_jump != 0x0 and self.is_numeric_char(c):
@@ -1167,21 +986,37 @@ class BasicCompiler:
 
                 basic_line.store_string(str(mapped_line_number))
 
-            else:  # scan BASIC token
-                token, token_id, token_len = self.peek_token(line, ofs)
-                if not token:
-                    # no token
-                    if c != "," and not self.is_numeric_char(c):
-                        last_was_jump = 0x0
+            elif c in "$%" and command_token != 0x83 and self.is_number_literal(basic_line, line, ofs):
+                # convert $hex and %binary literals at compile time, DATA items may be read as strings
+                value, literal_len = self.read_number_literal(line, ofs)
+                basic_line.store_string(str(value))
+                ofs += literal_len
 
-                    # make sure code and variable names are using the right case
-                    if self.options.lower_case and c >= "A" and c <= "Z":
-                        c = c.lower()
-                    elif (not self.options.lower_case) and c >= "a" and c <= "z":
-                        c = c.upper()
+            else:
+                constant = None
+                if self.constants and (self.is_label_char(c) or self.is_numeric_char(c) or c == "("):
+                    # substitute constants and fold constant expressions
+                    constant = self.read_constant(line, ofs, command_token == 0x83, ofs == token_end)
 
-                    basic_line.store_char(c)
-                    ofs += 1
+                if constant:
+                    text, ofs = constant
+                    basic_line.store_string(text)
+
+                else:  # scan BASIC token
+                    token, token_id, token_len = self.peek_token(line, ofs)
+                    if not token:
+                        # no token
+                        if c != "," and not self.is_numeric_char(c):
+                            last_was_jump = 0x0
+
+                        # make sure code and variable names are using the right case
+                        if self.options.lower_case and c >= "A" and c <= "Z":
+                            c = c.lower()
+                        elif (not self.options.lower_case) and c >= "a" and c <= "z":
+                            c = c.upper()
+
+                        basic_line.store_char(c)
+                        ofs += 1
 
             if token:
 
@@ -1217,7 +1052,8 @@ class BasicCompiler:
                 last_was_jump = token_id if token_id in [0x89, 0x8D, 0xCB, 0xA7] else 0x0
 
                 ofs += token_len
-                if not token_skipped:
+                token_end = ofs
+                if not token_skipped and basic_line.has_verbose():
                     if verbosity_level >= 2:
                         basic_line.add_verbose(f"{{${token_id:x}:{token}}}")
                     else:
@@ -1226,12 +1062,9 @@ class BasicCompiler:
                 # REM ?
                 if token_id == 0x8F:
                     # after REM, consume all characters until eol
-                    while ofs < len(line):
-                        if not crunch:
-                            c = line[ofs]
-                            if c != "\t":
-                                basic_line.store_char(line[ofs])
-                        ofs += 1
+                    if not crunch:
+                        basic_line.store_rem_tail(line[ofs:])
+                    ofs = len(line)
 
 
 
@@ -1244,10 +1077,102 @@ class BasicCompiler:
             basic_line.drop_last_char()
 
         if crunch and basic_line.is_empty():
-            # to be done: re-number in case crunching eliminated referenced lines
+            # placeholder for referenced lines, removed by the deadcode optimization
             basic_line.store_byte(0x8F, "REM")
 
-        return (basic_line, None)
+        if line_cache:
+            line_cache.store(cache_key, bytes(basic_line.get_bytes()), basic_line.verbose, self.line_dependencies)
+            self.line_dependencies = None
+
+        return None
+
+    def tokenize_jobs(self, jobs: list) -> list:
+        """Tokenize list of (filename, line number, line, index, offset, lower case) jobs."""
+
+        options = self.options
+        results = []
+
+        for filename, line_number, line, line_index, ofs, lower_case in jobs:
+            options.lower_case = lower_case
+            basic_line = BasicLine(BasicModule(filename, options), line_number, self.track_verbose)
+
+            if self.collect_line_dependencies:
+                self.line_dependencies = []
+
+            err = self.tokenize_line(basic_line, line, line_index, ofs)
+            if err:
+                results.append((None, None, None, err))
+                break
+
+            results.append((bytes(basic_line.get_bytes()), basic_line.verbose, self.line_dependencies, None))
+            self.line_dependencies = None
+
+        return results
+
+    def tokenize_pending_lines(self) -> Optional[CompileError]:
+        """Tokenize lines deferred by parallel mode, results are merged in line order."""
+
+        pending_lines = self.pending_lines
+        if not pending_lines:
+            return None
+
+        self.pending_lines = None
+
+        line_cache = self.line_cache
+
+        jobs = []
+        targets = []
+
+        for basic_line, line, line_index, ofs, lower_case in pending_lines:
+            cache_key = None
+            if line_cache:
+                cache_key = self.get_line_cache_key(line, lower_case)
+                cached = line_cache.lookup(cache_key, self.resolve_line_dependency)
+                if cached:
+                    code, verbose = cached
+                    basic_line.store_bytes(code, verbose)
+                    continue
+
+            jobs.append((basic_line.module.filename, basic_line.line_number, line, line_index, ofs, lower_case))
+            targets.append((basic_line, cache_key))
+
+        if not jobs:
+            return None
+
+        chunk_results = tokenize_parallel(self, jobs)
+
+        target_index = 0
+        for results in chunk_results:
+            for code, verbose, dependencies, err in results:
+                if err:
+                    return err
+
+                basic_line, cache_key = targets[target_index]
+                target_index += 1
+
+                basic_line.store_bytes(code, verbose)
+                if line_cache:
+                    line_cache.store(cache_key, code, verbose, dependencies)
+
+        return None
+
+    def tokenize_local(self, jobs: list) -> list:
+        """Tokenize jobs in this process without touching the line cache."""
+
+        line_cache = self.line_cache
+        lower_case = self.options.lower_case
+
+        self.line_cache = None
+        self.collect_line_dependencies = line_cache is not None
+
+        try:
+            results = self.tokenize_jobs(jobs)
+        finally:
+            self.line_cache = line_cache
+            self.collect_line_dependencies = False
+            self.options.lower_case = lower_case
+
+        return results
 
     def fetch_line_info(self, module: BasicModule, line: str, preprocess: bool, line_index: int):
         """Fetch line number from basic line"""
@@ -1328,35 +1253,42 @@ class BasicCompiler:
 
         mapped_number = self.line_number_map.get(number)
         if mapped_number is None:
-            return number
+            mapped_number = number
+
+        if self.line_dependencies is not None:
+            self.line_dependencies.append(("line", number, mapped_number))
 
         return mapped_number
 
-    def lookup_file(self, filename: str, parent_path: str) -> str:
-        """Lookup filename in path."""
+    def lookup_label(self, label: str) -> Optional[int]:
+        """Get line number of label."""
+
+        label_line_number = self.labels.get(label.lower())
+
+        if self.line_dependencies is not None:
+            self.line_dependencies.append(("label", label.lower(), label_line_number))
 
-        if os.path.isabs(filename) and os.path.exists(filename):
-            return os.path.normpath(filename)
+        return label_line_number
 
-        f = os.path.abspath(filename)
-        if os.path.exists(f):
-            return f
+    def resolve_line_dependency(self, kind: str, name) -> Optional[int]:
+        """Resolve label, line number or constant a cached line depends on."""
 
-        f = os.path.abspath(os.path.join(parent_path, filename))
-        if os.path.exists(f):
-            return f
+        if kind == "label":
+            return self.labels.get(name)
 
-        f = os.path.abspath(os.path.join(os.getcwd(), filename))
-        if os.path.exists(f):
-            return f
+        if kind == "line":
+            mapped_number = self.line_number_map.get(name) if self.options.crunch else None
+            return mapped_number if mapped_number is not None else name
 
-        for path_entry in self.options.include_path:
-            f = os.path.abspath(os.path.join(path_entry, filename))
-            if os.path.exists(f):
-                return f
+        if kind == "const":
+            return self.constants.get(name)
 
         return None
 
+    def lookup_file(self, filename: str, parent_path: str) -> Optional[str]:
+        """Lookup filename in path."""
+        return self.include_graph.resolve(filename, parent_path, self.options.include_path)
+
     def is_token(self, text):
         """Check if text is a token."""
         token, _, _ = self.match_token(text)
@@ -1364,47 +1296,11 @@ class BasicCompiler:
 
     def match_token(self, text):
         """Get token info for text."""
-
-        if text == "?":
-            return ("?", 0x99, 1)
-
-        uppercase_text = text.upper()
-
-        for k in self.sorted_token_list:
-            if len(k) >= 2:
-                abbrev = ""
-                if k in ["gosub", "left", "step", "str", "restore", "return", "close"]:
-                    abbrev = k[0].lower() + k[1].lower + k[2].upper()
-                else:
-                    abbrev = k[0].lower() + k[1].upper()
-                if text == abbrev:
-                    return (k, Constants.BASIC_TOKENS[k], len(abbrev))
-            if uppercase_text == k:
-                return (k, self.token_map[k], len(k))
-
-        return None, None, 0
+        return self.token_table.match(text)
 
     def peek_token(self, text, ofs):
         """Look at the next token."""
-
-        uppercase_text = text.upper()
-
-        if text[ofs] == "?":
-            return ("?", 0x99, 1)
-
-        for k in self.sorted_token_list:
-            if len(k) >= 2:
-                abbrev = ""
-                if k in ["gosub", "left", "step", "str", "restore", "return", "close"]:
-                    abbrev = k[0].lower() + k[1].lower + k[2].upper()
-                else:
-                    abbrev = k[0].lower() + k[1].upper()
-                if text.startswith(abbrev, ofs):
-                    return (k, Constants.BASIC_TOKENS[k], len(abbrev))
-            if uppercase_text.startswith(k, ofs):
-                return (k, self.token_map[k], len(k))
-
-        return None, None, 0
+        return self.token_table.peek(text, ofs)
 
     def is_label_char(self, c: str):
         """Check if char is a label char."""
@@ -1413,3 +1309,32 @@ class BasicCompiler:
     def is_numeric_char(self, c: str):
         """Check if char is numeric."""
         return c >= "0" and c <= "9"
+
+    def is_number_literal(self, basic_line: BasicLine, line: str, ofs: int) -> bool:
+        """Check for $hex or %binary literal (native in TSB, '$' and '%' after names are type suffixes)."""
+
+        if self.options.feature_tsb or ofs + 1 >= len(line):
+            return False
+
+        last_char = basic_line.peek_last_char()
+        if last_char.isascii() and last_char.isalnum():
+            return False
+
+        digits = HEX_DIGITS if line[ofs] == "$" else BINARY_DIGITS
+
+        return line[ofs+1] in digits
+
+    def read_number_literal(self, line: str, ofs: int) -> (int, int):
+        """Read $hex or %binary literal, returns value and length."""
+
+        is_hex = line[ofs] == "$"
+        digits = HEX_DIGITS if is_hex else BINARY_DIGITS
+
+        end = ofs + 1
+        while end < len(line) and line[end] in digits:
+            if is_hex and end > ofs + 1 and self.peek_token(line, end)[0]:
+                # keyword after hex digits, e.g. '$ffand3'
+                break
+            end += 1
+
+        return int(line[ofs+1:end], 16 if is_hex else 2), end - ofs
@@ -1,12 +1,89 @@
 """Decompiler."""
 
 import os
+import re
 
 from typing import Optional
 
 from .constants import Constants
 from .common import CompileError, CompileOptions, CompileHelper
 
+#############################################################################
+# Lookup Tables
+#############################################################################
+
+def _build_token_list(tokens: dict, base: int) -> "list[str]":
+    """Get lower case token texts indexed by token value - base, gaps are empty."""
+
+    token_list = []
+    for k, v in tokens.items():
+        idx = v - base
+        while len(token_list) < idx:
+            token_list.append("")
+        token_list.append(k.lower())
+
+    return token_list
+
+def _from_petscii_code(c: int) -> int:
+    """Get character code of PETSCII byte in lower case listing."""
+    if 65 <= c <= 90:
+        return c + 32
+    if 97 <= c <= 122:
+        return c - 32
+    if 193 <= c <= 218:
+        return c - 128
+    return c
+
+# token texts, BASIC tokens start at 0x80, TSB tokens at 1
+TOKENS = _build_token_list(Constants.BASIC_TOKENS, 0x80)
+TSB_TOKENS = _build_token_list(Constants.TSB_TOKENS, 1)
+
+# PETSCII bytes to listing characters (decoded as latin-1)
+PETSCII_TRANSLATION = bytes.maketrans(bytes(range(256)), bytes(_from_petscii_code(c) for c in range(256)))
+
+# code bytes (decoded as latin-1) to listing text, tokens are expanded
+CODE_TRANSLATION = [TOKENS[c-0x80] if c >= 0x80 else chr(_from_petscii_code(c)) for c in range(256)]
+
+# bytes which end a code segment: end of line, quote, REM and TSB token prefix
+SEGMENT_END_PATTERN = re.compile(rb"[\x00\x22\x64\x8f]")
+
+# operator tokens + - * / ^ > = < and brackets, no separating space in pretty mode
+OPERATOR_BYTES = b"()\xaa\xab\xac\xad\xae\xb1\xb2\xb3"
+
+# pretty mode: spaces are collapsed, colons get a leading space and statements a separating space
+SPACES_PATTERN = re.compile(rb"  +")
+COLON_PATTERN = re.compile(rb"(?<! ):")
+STATEMENT_PATTERN = re.compile(rb":(?=[^ :=+\-" + re.escape(OPERATOR_BYTES) + rb"])")
+
+TOKEN_REM = 0x8F
+TOKEN_TSB = 100
+TSB_TOKEN_AT = 40
+
+CHAR_QUOTE = 34
+CHAR_COLON = 58
+CHAR_SPACE = 32
+
+CHAR_TYPE_NONE = -1
+CHAR_TYPE_SPACE = 0
+CHAR_TYPE_SPECIAL = 1
+CHAR_TYPE_CODE = 2
+CHAR_TYPE_OPERATOR = 3
+
+def from_petscii_bytes(data: bytes, start: int, end: int) -> str:
+    """Convert PETSCII bytes to text."""
+    return data[start:end].translate(PETSCII_TRANSLATION).decode("latin-1")
+
+def get_char_type(b: int) -> int:
+    """Get pretty mode type of last code byte."""
+
+    if b == CHAR_SPACE:
+        return CHAR_TYPE_SPACE
+    if b == CHAR_COLON:
+        return CHAR_TYPE_NONE
+    if b in OPERATOR_BYTES:
+        return CHAR_TYPE_OPERATOR
+    return CHAR_TYPE_CODE
+
 #############################################################################
 # Basic De-Compiler
 #############################################################################
@@ -25,15 +102,15 @@ class BasicDecompiler:
     ) -> Optional[CompileError]:
         """Unpacking program files."""
 
-        output_buffer = ""
+        output_parts = []
 
         for filename in inputs:
             abs_filename = os.path.abspath(filename)
             err, data = self.unpack_file(abs_filename)
             if err: return err
-            if data: output_buffer += data
+            if data: output_parts.append(data)
 
-        err = CompileHelper.write_textfile(output, output_buffer)
+        err = CompileHelper.write_textfile(output, "".join(output_parts))
         if err: return err
 
         return None
@@ -41,178 +118,131 @@ class BasicDecompiler:
     def unpack_file(self, filename: str) -> (Optional[CompileError], str):
         """Unpacking program file."""
 
-        lower_case = True
-
-        pretty = self.options.pretty
-
-        tokens = []
-
-        for k, v in Constants.BASIC_TOKENS.items():
-            idx = (v - 0x80)
-            while len(tokens) < idx:
-                tokens.append("")
-            tokens.append(k)
-
-        tcb_tokens = []
-
-        for k, v in Constants.TSB_TOKENS.items():
-            idx = (v - 1)
-            while len(tcb_tokens) < idx:
-                tcb_tokens.append("")
-            tcb_tokens.append(k)
-
-        output_buffer = ""
-
-        data = None
-
         try:
             with open(filename, "rb") as in_file:
                 data = in_file.read()
         except OSError:
             return (CompileError(filename, "could not read file"), None)
 
-        data_size = len(data)
-        if data_size < 2: return (CompileError(filename, "invalid file"), None)
-
-        ofs = 0
-        count = data_size
-        #prg_address = data[ofs] + (data[ofs+1]<<8)
-        ofs += 2
-        count -= 2
-
-        space_char = ' '
-
-        char_type_none = -1
-        char_type_space = 0
-        char_type_special = 1
-        char_type_code = 2
-        char_type_operator = 3
-
-        while count > 0:
-
-            if count < 2: break
-            #next_line_addr = data[ofs] + (data[ofs+1]<<8)
-            ofs += 2
-            count -= 2
-
-            if count < 2: break
-            line_number = data[ofs] + (data[ofs+1]<<8)
-            output_buffer += f"{line_number}"
-            if not pretty: output_buffer += space_char
-            ofs += 2
-            count -= 2
-
-            last_char_type = char_type_none
-
-            while count > 0:
-                b = data[ofs]&0xff
-                ofs += 1
-                count -= 1
-
-                if b == 0: # end of line
-                    output_buffer += "\n"
-                    break
-
-                elif b >= 0x80 or b in (100, 34, 58, 40, 41):
-
-                    next_char_type = char_type_special
-
-                    if b >= 0x80:
-                        # BASIC tokens
-
-                        token = tokens[b-0x80]
-
-                        if b in (170, 171, 172, 173, 174, 177, 178, 179):
-                            # operators +-*/()...
-                            output_buffer += token
-                            next_char_type = char_type_operator
+        if len(data) < 2: return (CompileError(filename, "invalid file"), None)
 
-                        else:
-                            # command token
-                            if pretty and last_char_type == char_type_none:
-                                output_buffer += space_char
+        return (None, self.unpack_data(data))
 
-                            output_buffer += token.lower() if lower_case else token
-                            if b == 0x8F: # REM
-                                while count and (data[ofs]&0xff) != 0:
-                                    output_buffer += self.from_petscii(data[ofs], lower_case)
-                                    ofs += 1
-                                    count -= 1
+    def unpack_data(self, data: bytes) -> str:
+        """Convert PRG data to listing text."""
 
-                    elif b == 100:
-                        # TSB tokens
-
-                        if count < 1: break
-                        b2 = data[ofs]&0xff
-                        ofs += 1
-                        count -= 1
-
-                        # map BASIC extension tokens (3c<-b3, 3d<-b2, 3e<-b1)
-                        if b2 >= 0xb1 and b2 <= 0xb3: b2 ^= 0x8f
-                        token = tcb_tokens[b2-1]
-
-                        if pretty and last_char_type == char_type_none:
-                            output_buffer += space_char
+        pretty = self.options.pretty
 
-                        output_buffer += token.lower() if lower_case else token
+        out = []
+        append = out.append
 
-                        # append '(' to 'AT' token
-                        if b2 == 40:
-                            output_buffer += "("
-                            next_char_type = char_type_operator
+        end = len(data)
 
-                    elif b == 34: # '"'
+        # skip program address (2 bytes)
+        ofs = 2
 
-                        if pretty and last_char_type != char_type_space and last_char_type != char_type_operator:
-                            output_buffer += space_char
+        while ofs < end:
 
-                        output_buffer += chr(b)
-                        while count > 0 and (data[ofs]&0xff) != 34 and (data[ofs]&0xff) != 0:
-                            output_buffer += self.from_petscii(data[ofs], lower_case)
-                            ofs += 1
-                            count -= 1
-                        if count > 0 and (data[ofs]&0xff) == 34:
-                            output_buffer += chr(data[ofs])
-                            ofs += 1
-                            count -= 1
+            if end - ofs < 2: break
+            next_line_addr = data[ofs] + (data[ofs+1]<<8)
+            ofs += 2
 
-                    elif b == 40 or b == 41: # '('
-                        output_buffer += chr(b)
-                        next_char_type = char_type_operator
+            # end of program, data behind is not BASIC code
+            if next_line_addr == 0: break
 
-                    elif b == 58: # ':'
-                        if pretty and last_char_type != char_type_space:
-                            output_buffer += space_char
+            if end - ofs < 2: break
+            line_number = data[ofs] + (data[ofs+1]<<8)
+            append(str(line_number) if pretty else f"{line_number} ")
+            ofs += 2
 
-                        output_buffer += chr(b)
-                        next_char_type = char_type_none
+            last_char_type = CHAR_TYPE_NONE
 
-                    last_char_type = next_char_type
+            while ofs < end:
 
-                elif b == 32: # space
-                    if not pretty or last_char_type != char_type_space:
-                        output_buffer += space_char
-                        last_char_type = char_type_space
+                match = SEGMENT_END_PATTERN.search(data, ofs)
+                pos = match.start() if match else end
 
-                elif b in (61, 43, 45):
-                    output_buffer += chr(b)
-                    last_char_type = char_type_code
+                if pos > ofs:
+                    # code without strings and comments
+                    segment = data[ofs:pos]
+                    if pretty:
+                        segment = self.format_code(segment, last_char_type)
+                        last_char_type = get_char_type(data[pos-1])
+                    append(segment.decode("latin-1").translate(CODE_TRANSLATION))
 
-                else:
-                    if pretty and last_char_type == char_type_none:
-                        output_buffer += space_char
+                if not match:
+                    ofs = end
+                    break
 
-                    output_buffer += self.from_petscii(b, lower_case)
-                    last_char_type = char_type_code
+                b = data[pos]
+                ofs = pos + 1
 
-        return (None, output_buffer)
+                if b == 0: # end of line
+                    append("\n")
+                    break
 
-    def from_petscii(self, c, lower_case):
-        """Convert PETSCII to text."""
-        if c >= 65 and c <= 90 and lower_case:
-            c += 32
-        elif c >= 97 and c <= 122 and lower_case:
-            c -= 32
-        elif c >= 193 and c <= 218:
-            c -= 128
-        return chr(c)
+                if b == TOKEN_REM:
+                    if pretty and last_char_type == CHAR_TYPE_NONE:
+                        append(" ")
+                    rem_end = data.find(0, ofs)
+                    if rem_end < 0: rem_end = end
+                    append(TOKENS[TOKEN_REM-0x80] + from_petscii_bytes(data, ofs, rem_end))
+                    ofs = rem_end
+                    last_char_type = CHAR_TYPE_SPECIAL
+
+                elif b == TOKEN_TSB:
+                    # TSB tokens
+                    if ofs >= end: break
+                    b2 = data[ofs]
+                    ofs += 1
+
+                    # map BASIC extension tokens (3c<-b3, 3d<-b2, 3e<-b1)
+                    if 0xb1 <= b2 <= 0xb3: b2 ^= 0x8f
+                    token = TSB_TOKENS[b2-1]
+
+                    if pretty and last_char_type == CHAR_TYPE_NONE:
+                        append(" ")
+
+                    append(token)
+
+                    # append '(' to 'AT' token
+                    if b2 == TSB_TOKEN_AT:
+                        append("(")
+                        last_char_type = CHAR_TYPE_OPERATOR
+                    else:
+                        last_char_type = CHAR_TYPE_SPECIAL
+
+                else: # '"'
+                    if pretty and last_char_type != CHAR_TYPE_SPACE and last_char_type != CHAR_TYPE_OPERATOR:
+                        append(" ")
+
+                    # string ends at closing quote or end of line
+                    line_end = data.find(0, ofs)
+                    if line_end < 0: line_end = end
+                    string_end = data.find(CHAR_QUOTE, ofs, line_end)
+                    if string_end < 0:
+                        append('"' + from_petscii_bytes(data, ofs, line_end))
+                        ofs = line_end
+                    else:
+                        append('"' + from_petscii_bytes(data, ofs, string_end) + '"')
+                        ofs = string_end + 1
+
+                    last_char_type = CHAR_TYPE_SPECIAL
+
+        return "".join(out)
+
+    def format_code(self, segment: bytes, last_char_type: int) -> bytes:
+        """Apply pretty mode spacing to code segment."""
+
+        if b"  " in segment:
+            segment = SPACES_PATTERN.sub(b" ", segment)
+
+        if b":" in segment:
+            segment = COLON_PATTERN.sub(b" :", segment)
+            segment = STATEMENT_PATTERN.sub(b": ", segment)
+
+        if last_char_type == CHAR_TYPE_NONE and segment[0] not in b" :=+-" + OPERATOR_BYTES:
+            # statement start
+            segment = b" " + segment
+
+        return segment
@@ -0,0 +1,206 @@
+"""Compile-time constant expressions."""
+
+import re
+
+from typing import Optional
+
+NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+NUMBER_PATTERN = re.compile(r"\$[0-9A-Fa-f]+|%[01]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+
+OPERATORS = "+-*/^"
+
+def parse_number(text: str):
+    """Get value of decimal, $hex or %binary number."""
+
+    if text.startswith("$"):
+        return int(text[1:], 16)
+    if text.startswith("%"):
+        return int(text[1:], 2)
+
+    value = float(text)
+    if value.is_integer() and "e" not in text.lower():
+        return int(value)
+
+    return value
+
+def format_value(value) -> str:
+    """Format constant value as BASIC number."""
+
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return repr(value).upper()
+
+    return str(value)
+
+#############################################################################
+# Constant Expression
+#############################################################################
+
+class ConstantExpression:
+    """Expression of numbers, constant names, + - * / ^ and parentheses."""
+
+    def __init__(self, constants: dict):
+        self.constants = constants
+        self.tokens = []
+        self.names = []
+        self.pos = 0
+
+    def scan(self, text: str, ofs: int = 0) -> int:
+        """Read expression tokens from offset, returns offset after the last token."""
+
+        tokens = []
+        names = []
+        depth = 0
+        end = ofs
+        n = len(text)
+        i = ofs
+
+        while i < n:
+            c = text[i]
+
+            if c in " \t":
+                i += 1
+                continue
+
+            if c in OPERATORS:
+                tokens.append(c)
+                i += 1
+
+            elif c == "(":
+                depth += 1
+                tokens.append(c)
+                i += 1
+
+            elif c == ")":
+                if depth < 1:
+                    # closes bracket outside of expression
+                    break
+                depth -= 1
+                tokens.append(c)
+                i += 1
+
+            else:
+                match = NUMBER_PATTERN.match(text, i)
+                if match:
+                    tokens.append(parse_number(match[0]))
+                    i = match.end()
+                else:
+                    match = NAME_PATTERN.match(text, i)
+                    if not match:
+                        break
+                    name = match[0].lower()
+                    if name not in self.constants or (match.end() < n and text[match.end()] in "$%("):
+                        # variable, array or keyword
+                        break
+                    tokens.append(self.constants[name])
+                    names.append(name)
+                    i = match.end()
+
+            end = i
+
+        self.tokens = tokens
+        self.names = names
+
+        return end
+
+    def evaluate(self) -> (Optional[object], Optional[str]):
+        """Evaluate scanned expression."""
+
+        self.pos = 0
+
+        try:
+            value = self.parse_sum()
+            if self.pos < len(self.tokens):
+                raise ValueError("invalid constant expression")
+        except ValueError as err:
+            return None, str(err)
+        except ZeroDivisionError:
+            return None, "division by zero in constant expression"
+        except OverflowError:
+            return None, "overflow in constant expression"
+
+        return value, None
+
+    def peek(self):
+        """Get current token."""
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        """Get current token and advance."""
+        token = self.peek()
+        if token is None:
+            raise ValueError("incomplete constant expression")
+        self.pos += 1
+        return token
+
+    def parse_sum(self):
+        """Parse '+' and '-' terms."""
+
+        value = self.parse_product()
+        while self.peek() in ("+", "-"):
+            if self.next() == "+":
+                value = value + self.parse_product()
+            else:
+                value = value - self.parse_product()
+
+        return value
+
+    def parse_product(self):
+        """Parse '*' and '/' factors."""
+
+        value = self.parse_unary()
+        while self.peek() in ("*", "/"):
+            if self.next() == "*":
+                value = value * self.parse_unary()
+            else:
+                divisor = self.parse_unary()
+                if isinstance(value, int) and isinstance(divisor, int) and value % divisor == 0:
+                    # keep exact integers
+                    value = value // divisor
+                else:
+                    value = value / divisor
+
+        return value
+
+    def parse_unary(self):
+        """Parse sign, binds weaker than '^' like in BASIC."""
+
+        if self.peek() == "-":
+            self.next()
+            return -self.parse_unary()
+
+        if self.peek() == "+":
+            self.next()
+            return self.parse_unary()
+
+        return self.parse_power()
+
+    def parse_power(self):
+        """Parse '^', left associative like in BASIC."""
+
+        value = self.parse_primary()
+        while self.peek() == "^":
+            self.next()
+            exponent = self.parse_primary() if self.peek() != "-" else self.parse_unary()
+            value = value ** exponent
+            if isinstance(value, complex):
+                raise ValueError("illegal quantity in constant expression")
+
+        return value
+
+    def parse_primary(self):
+        """Parse number or bracket expression."""
+
+        token = self.next()
+
+        if token == "(":
+            value = self.parse_sum()
+            if self.next() != ")":
+                raise ValueError("missing ')' in constant expression")
+            return value
+
+        if isinstance(token, str):
+            raise ValueError("invalid constant expression")
+
+        return token
@@ -0,0 +1,142 @@
+"""Include files."""
+
+import os
+
+from typing import Optional
+
+from .common import CompileHelper
+
+#############################################################################
+# Include Graph
+#############################################################################
+
+class IncludeGraph:
+    """Include file resolution with memoized stat results, reusable across compiles."""
+
+    def __init__(self):
+        self.exists_cache = {}
+        self.dir_mtimes = {}
+        self.resolved = {}
+        self.includes = {}
+        self.stat_count = 0
+
+    @staticmethod
+    def parse_include(line: str) -> Optional[str]:
+        """Get file name of #include directive, None for other lines."""
+
+        line = line.strip()
+        if not line.startswith("#") and not line.startswith(";"):
+            return None
+
+        directive = CompileHelper.get_next_word(line, 1).lower()
+        if directive != "include":
+            return None
+
+        include_file = line[len(directive) + 1 :].strip()
+        if include_file.startswith("'"):
+            include_file = include_file.strip("'")
+        elif include_file.startswith('"'):
+            include_file = include_file.strip('"')
+
+        return include_file
+
+    def validate(self):
+        """Prepare for next compile, drops results for directories changed since the last one."""
+
+        changed = set()
+        for dirname, mtime in self.dir_mtimes.items():
+            if self.get_mtime(dirname) != mtime:
+                changed.add(dirname)
+
+        if changed:
+            for dirname in changed:
+                del self.dir_mtimes[dirname]
+            self.exists_cache = {
+                path: exists for path, exists in self.exists_cache.items()
+                if os.path.dirname(path) not in changed
+            }
+            self.resolved = {}
+
+        self.includes = {}
+
+    def get_mtime(self, path: str) -> Optional[int]:
+        """Get modification time, None if path does not exist."""
+
+        self.stat_count += 1
+
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def exists(self, path: str) -> bool:
+        """Check if file exists, results are cached until its directory changes."""
+
+        path = os.path.normpath(path)
+
+        exists = self.exists_cache.get(path)
+        if exists is None:
+            # directory time stamp taken first, so later changes are detected
+            dirname = os.path.dirname(path)
+            if dirname not in self.dir_mtimes:
+                self.dir_mtimes[dirname] = self.get_mtime(dirname)
+
+            self.stat_count += 1
+            exists = os.path.exists(path)
+            self.exists_cache[path] = exists
+
+        return exists
+
+    def resolve(self, filename: str, parent_path: str, include_path: "list[str]") -> Optional[str]:
+        """Lookup filename relative to parent, working directory and include path."""
+
+        cwd = os.getcwd()
+        key = (filename, parent_path, cwd, tuple(include_path))
+
+        if key in self.resolved:
+            return self.resolved[key]
+
+        resolved = self.lookup(filename, parent_path, cwd, include_path)
+        self.resolved[key] = resolved
+
+        return resolved
+
+    def lookup(self, filename: str, parent_path: str, cwd: str, include_path: "list[str]") -> Optional[str]:
+        """Lookup filename in path."""
+
+        if os.path.isabs(filename) and self.exists(filename):
+            return os.path.normpath(filename)
+
+        f = os.path.abspath(filename)
+        if self.exists(f):
+            return f
+
+        f = os.path.abspath(os.path.join(parent_path, filename))
+        if self.exists(f):
+            return f
+
+        f = os.path.abspath(os.path.join(cwd, filename))
+        if self.exists(f):
+            return f
+
+        for path_entry in include_path:
+            f = os.path.abspath(os.path.join(path_entry, filename))
+            if self.exists(f):
+                return f
+
+        return None
+
+    def add_include(self, filename: str, include_file: str):
+        """Record include edge of current compile."""
+
+        include_files = self.includes.get(filename)
+        if include_files is None:
+            include_files = []
+            self.includes[filename] = include_files
+
+        if include_file not in include_files:
+            include_files.append(include_file)
+
+    def get_includes(self, filename: str) -> "list[str]":
+        """Get files directly included by filename."""
+        return self.includes.get(filename, [])
@@ -0,0 +1,1047 @@
+"""Program optimizer."""
+
+import os
+import re
+import json
+
+from typing import Optional
+
+from .constants import Constants
+from .common import CompileError, CompileBuffer
+
+TOKEN_END = 0x80
+TOKEN_FOR = 0x81
+TOKEN_NEXT = 0x82
+TOKEN_DATA = 0x83
+TOKEN_DIM = 0x86
+TOKEN_GOTO = 0x89
+TOKEN_RUN = 0x8A
+TOKEN_IF = 0x8B
+TOKEN_GOSUB = 0x8D
+TOKEN_RETURN = 0x8E
+TOKEN_REM = 0x8F
+TOKEN_LIST = 0x9B
+TOKEN_TO = 0xA4
+TOKEN_PLUS = 0xAA
+TOKEN_MINUS = 0xAB
+TOKEN_FN = 0xA5
+TOKEN_THEN = 0xA7
+TOKEN_GO = 0xCB
+
+CHAR_QUOTE = 0x22
+CHAR_COLON = 0x3A
+CHAR_COMMA = 0x2C
+CHAR_SPACE = 0x20
+CHAR_MINUS = 0x2D
+CHAR_DOT = 0x2E
+CHAR_PLUS = 0x2B
+CHAR_DOLLAR = 0x24
+CHAR_PERCENT = 0x25
+CHAR_PAREN = 0x28
+CHAR_E = 0x45
+
+# logical screen line of the interpreter input (two rows of 40 chars)
+MAX_LINE_CHARS = 80
+
+OPTIMIZATIONS = ("inline", "deadcode", "varorder", "literals", "merge", "layout")
+
+# system variables which are not stored in the variable table
+SYSTEM_VARIABLES = ("ST", "TI", "TI$")
+
+# weight factor of variable references per FOR loop nesting level
+LOOP_WEIGHT = 10
+MAX_LOOP_DEPTH = 3
+
+# listing text of tokens (including '#' and '(' that are part of some tokens)
+TOKEN_NAMES = { v: k for k, v in Constants.BASIC_TOKENS.items() }
+TOKEN_CHARS = { k: len(v) for k, v in TOKEN_NAMES.items() }
+
+# numbers with more digits are not exact in the 32 bit float mantissa
+MAX_EXACT_DIGITS = 9
+
+# exponent signs are stored as operator tokens in code
+EXPONENT_SIGNS = (TOKEN_PLUS, TOKEN_MINUS, CHAR_PLUS, CHAR_MINUS)
+LITERAL_TEXT = bytes.maketrans(bytes([TOKEN_PLUS, TOKEN_MINUS]), b"+-")
+LITERAL_CODE = bytes.maketrans(b"+-", bytes([TOKEN_PLUS, TOKEN_MINUS]))
+
+# line number references in verbose text (plain and debug token notation)
+VERBOSE_REF_PATTERN = re.compile(
+    r"(GOTO|GOSUB|THEN|RUN|LIST|GO\}?\s*(?:\{\$a4:)?TO)(\}?\s*)(\d+(?:\s*[,-]\s*\d+)*)",
+    re.IGNORECASE
+)
+
+def is_digit(b: int) -> bool:
+    """Check if PETSCII byte is a decimal digit."""
+    return 0x30 <= b <= 0x39
+
+def is_letter(b: int) -> bool:
+    """Check if PETSCII byte is a letter in tokenized code."""
+    return 0x41 <= b <= 0x5A
+
+def get_shortest_literal(text: str) -> str:
+    """Get shortest form of numeric literal with the same digits and value."""
+
+    mantissa, _, exponent = text.partition("E")
+    integer, _, fraction = mantissa.partition(".")
+    if "." in fraction:
+        return text
+
+    digits = (integer + fraction).lstrip("0")
+    if len(digits) > MAX_EXACT_DIGITS:
+        return text
+
+    exponent = int(exponent or "0") - len(fraction)
+    while digits.endswith("0"):
+        digits = digits[:-1]
+        exponent += 1
+
+    if not digits:
+        # zero, the interpreter parses '.' faster than '0'
+        return "."
+
+    if exponent >= 0:
+        plain = digits + "0" * exponent
+    elif len(digits) + exponent > 0:
+        plain = digits[:exponent] + "." + digits[exponent:]
+    else:
+        plain = "." + "0" * -(len(digits) + exponent) + digits
+
+    if exponent == 0 or len(plain) <= len(digits) + 1 + len(str(exponent)):
+        return plain
+
+    return f"{digits}E{exponent}"
+
+#############################################################################
+# Code Info
+#############################################################################
+
+class CodeInfo:
+    """Statement and line reference information of a tokenized line."""
+
+    __slots__ = (
+        "code", "refs", "computed_jump", "has_if", "has_rem", "has_data",
+        "open_quote", "last_statement"
+    )
+
+    def __init__(self, code: bytes):
+        self.code = code
+        # (start offset, end offset, line number) of line number references
+        self.refs = []
+        self.computed_jump = False
+        self.has_if = False
+        self.has_rem = False
+        self.has_data = False
+        self.open_quote = False
+        # offset of the last statement of the line
+        self.last_statement = 0
+        self.scan()
+
+    def scan(self):
+        """Scan tokenized code."""
+
+        code = self.code
+        n = len(code)
+        i = 0
+        prev = 0
+
+        while i < n:
+            b = code[i]
+
+            if b == CHAR_QUOTE:
+                end = code.find(b'"', i + 1)
+                if end < 0:
+                    self.open_quote = True
+                    break
+                i = end + 1
+                prev = CHAR_QUOTE
+                continue
+
+            if b == TOKEN_REM:
+                # rest of line is comment
+                self.has_rem = True
+                break
+
+            if b == CHAR_COLON:
+                self.last_statement = i + 1
+
+            elif b == TOKEN_DATA:
+                # data items are raw text up to the end of the statement
+                self.has_data = True
+                i = self.skip_data(i + 1)
+                prev = TOKEN_DATA
+                continue
+
+            elif b == TOKEN_IF:
+                self.has_if = True
+
+            elif b in (TOKEN_GOTO, TOKEN_GOSUB) or (b == TOKEN_TO and prev == TOKEN_GO):
+                i = self.scan_line_numbers(i + 1, True, True)
+                prev = b
+                continue
+
+            elif b == TOKEN_THEN:
+                i = self.scan_line_numbers(i + 1, False, False)
+                prev = b
+                continue
+
+            elif b in (TOKEN_RUN, TOKEN_LIST):
+                i = self.scan_line_numbers(i + 1, False, b == TOKEN_LIST)
+                prev = b
+                continue
+
+            if b != CHAR_SPACE:
+                prev = b
+
+            i += 1
+
+    def skip_data(self, i: int) -> int:
+        """Get offset of statement end after DATA."""
+
+        code = self.code
+        n = len(code)
+        in_quote = False
+
+        while i < n:
+            b = code[i]
+            if b == CHAR_QUOTE:
+                in_quote = not in_quote
+            elif b == CHAR_COLON and not in_quote:
+                break
+            i += 1
+
+        if in_quote:
+            self.open_quote = True
+
+        return i
+
+    def scan_line_numbers(self, i: int, required: bool, as_list: bool) -> int:
+        """Record line number references, returns offset after them."""
+
+        code = self.code
+        n = len(code)
+
+        while True:
+            while i < n and code[i] == CHAR_SPACE:
+                i += 1
+
+            start = i
+            number = 0
+            while i < n and is_digit(code[i]):
+                number = number * 10 + code[i] - 0x30
+                i += 1
+
+            if i > start:
+                self.refs.append((start, i, number))
+            elif required:
+                # jump to expression or missing line number
+                self.computed_jump = True
+                return i
+
+            while i < n and code[i] == CHAR_SPACE:
+                i += 1
+
+            if not as_list or i >= n or code[i] not in (CHAR_COMMA, CHAR_MINUS, TOKEN_MINUS):
+                return i
+
+            # ON ... GOTO/GOSUB list or LIST range
+            i += 1
+            required = False
+
+    def ends_flow(self) -> bool:
+        """Check if execution never continues with the next line."""
+
+        # statements after IF are conditional
+        if self.has_if or self.has_rem or self.open_quote:
+            return False
+
+        code = self.code
+        n = len(code)
+
+        i = self.last_statement
+        while i < n and code[i] == CHAR_SPACE:
+            i += 1
+
+        if i >= n:
+            return False
+
+        b = code[i]
+        if b in (TOKEN_END, TOKEN_GOTO, TOKEN_RETURN, TOKEN_RUN):
+            return True
+
+        if b == TOKEN_GO:
+            i += 1
+            while i < n and code[i] == CHAR_SPACE:
+                i += 1
+            return i < n and code[i] == TOKEN_TO
+
+        return False
+
+    def get_subroutine_body(self) -> Optional[bytes]:
+        """Get code before the final RETURN if the line is a subroutine without jumps, IF and loops."""
+
+        if self.refs or self.computed_jump or self.has_if or self.has_rem or self.has_data or self.open_quote:
+            return None
+
+        code = self.code
+        if code[self.last_statement:].strip(b" ") != bytes([TOKEN_RETURN]):
+            return None
+
+        body = code[:max(0, self.last_statement - 1)].rstrip(b" ")
+
+        # RETURN would leave the caller, RETURN also drops open FOR loops
+        in_quote = False
+        for b in body:
+            if b == CHAR_QUOTE:
+                in_quote = not in_quote
+            elif not in_quote and b in (TOKEN_RETURN, TOKEN_FOR, TOKEN_NEXT):
+                return None
+
+        return body
+
+    def get_gosub_statements(self) -> list:
+        """Get (start, end, line number, after THEN) of plain GOSUB statements."""
+
+        code = self.code
+        n = len(code)
+        statements = []
+
+        for start, end, number in self.refs:
+            i = start - 1
+            while i >= 0 and code[i] == CHAR_SPACE:
+                i -= 1
+            if i < 0 or code[i] != TOKEN_GOSUB:
+                continue
+
+            gosub = i
+            i -= 1
+            while i >= 0 and code[i] == CHAR_SPACE:
+                i -= 1
+            if i >= 0 and code[i] not in (CHAR_COLON, TOKEN_THEN):
+                # ON ... GOSUB
+                continue
+
+            j = end
+            while j < n and code[j] == CHAR_SPACE:
+                j += 1
+            if j < n and code[j] != CHAR_COLON:
+                continue
+
+            statements.append((gosub, j, number, i >= 0 and code[i] == TOKEN_THEN))
+
+        return statements
+
+    def is_placeholder(self) -> bool:
+        """Check if line is the REM placeholder of a crunched line."""
+        return self.code == bytes([TOKEN_REM])
+
+    def get_variables(self) -> list:
+        """Get simple variables, FOR and NEXT (with number of loops) in order of appearance."""
+
+        code = self.code
+        n = len(code)
+        items = []
+        in_dim = False
+        i = 0
+
+        while i < n:
+            b = code[i]
+
+            if b == CHAR_QUOTE:
+                end = code.find(b'"', i + 1)
+                if end < 0:
+                    break
+                i = end + 1
+                continue
+
+            if b == TOKEN_REM:
+                break
+
+            if b == TOKEN_DATA:
+                i = self.skip_data(i + 1)
+                continue
+
+            if b == CHAR_COLON:
+                in_dim = False
+
+            elif b == TOKEN_DIM:
+                in_dim = True
+
+            elif b == TOKEN_FOR:
+                items.append((TOKEN_FOR, 1))
+
+            elif b == TOKEN_NEXT:
+                # NEXT I,J closes two loops
+                end = i + 1
+                while end < n and code[end] != CHAR_COLON:
+                    end += 1
+                items.append((TOKEN_NEXT, code.count(b",", i + 1, end) + 1))
+
+            elif b == TOKEN_FN:
+                # function names are no variables
+                i += 1
+                while i < n and (code[i] == CHAR_SPACE or is_letter(code[i]) or is_digit(code[i])):
+                    i += 1
+                continue
+
+            elif is_digit(b) or b == CHAR_DOT:
+                # numeric literal, including exponent
+                while i < n and (is_digit(code[i]) or code[i] == CHAR_DOT):
+                    i += 1
+                if i < n and code[i] == CHAR_E:
+                    i += 1
+                    if i < n and code[i] in EXPONENT_SIGNS:
+                        i += 1
+                    while i < n and is_digit(code[i]):
+                        i += 1
+                continue
+
+            elif is_letter(b):
+                start = i
+                while i < n and (is_letter(code[i]) or is_digit(code[i])):
+                    i += 1
+                name = code[start:min(i, start + 2)].decode("latin-1")
+                if i < n and code[i] in (CHAR_DOLLAR, CHAR_PERCENT):
+                    name += chr(code[i])
+                    i += 1
+                j = i
+                while j < n and code[j] == CHAR_SPACE:
+                    j += 1
+                if j >= n or code[j] != CHAR_PAREN:
+                    # arrays are stored in a separate table
+                    items.append((TOKEN_DIM, name) if in_dim else name)
+                continue
+
+            i += 1
+
+        return items
+
+    def get_numbers(self) -> list:
+        """Get (start, end) offsets of numeric literals, line number references excluded."""
+
+        code = self.code
+        n = len(code)
+        ref_ends = { start: end for start, end, _ in self.refs }
+        numbers = []
+        i = 0
+
+        while i < n:
+            b = code[i]
+
+            if b == CHAR_QUOTE:
+                end = code.find(b'"', i + 1)
+                if end < 0:
+                    break
+                i = end + 1
+
+            elif b == TOKEN_REM:
+                break
+
+            elif b == TOKEN_DATA:
+                i = self.skip_data(i + 1)
+
+            elif i in ref_ends:
+                i = ref_ends[i]
+
+            elif is_letter(b):
+                # variable name, may contain digits
+                while i < n and (is_letter(code[i]) or is_digit(code[i])):
+                    i += 1
+
+            elif is_digit(b) or b == CHAR_DOT:
+                start = i
+                while i < n and (is_digit(code[i]) or code[i] == CHAR_DOT):
+                    i += 1
+                if i < n and code[i] == CHAR_E:
+                    j = i + 1
+                    if j < n and code[j] in EXPONENT_SIGNS:
+                        j += 1
+                    if j < n and is_digit(code[j]):
+                        i = j
+                        while i < n and is_digit(code[i]):
+                            i += 1
+                numbers.append((start, i))
+
+            else:
+                i += 1
+
+        return numbers
+
+    def get_text(self) -> str:
+        """Get listing text of code."""
+
+        text = []
+        in_quote = False
+        raw = False
+
+        for b in self.code:
+            if b == CHAR_QUOTE:
+                in_quote = not in_quote
+                text.append('"')
+            elif b < 0x20 or b > 0x7E and (in_quote or raw or b not in TOKEN_NAMES):
+                text.append(f"{{{b}}}")
+            elif in_quote or raw or b < 0x80:
+                text.append(chr(b))
+                if raw and b == CHAR_COLON and text[-2] != TOKEN_NAMES[TOKEN_REM]:
+                    raw = False
+            else:
+                text.append(TOKEN_NAMES[b])
+                if b in (TOKEN_REM, TOKEN_DATA):
+                    raw = True
+
+        return "".join(text)
+
+    def get_listing_length(self) -> int:
+        """Get number of chars of code when listed."""
+
+        code = self.code
+        n = len(code)
+        i = 0
+        count = 0
+        in_quote = False
+        raw = False
+
+        while i < n:
+            b = code[i]
+            if b == CHAR_QUOTE:
+                in_quote = not in_quote
+                count += 1
+            elif in_quote or raw or b < 0x80:
+                count += 1
+            else:
+                count += TOKEN_CHARS.get(b, 1)
+                if b in (TOKEN_REM, TOKEN_DATA):
+                    # no tokens in comments and data
+                    raw = True
+            if raw and b == CHAR_COLON and not in_quote and code[i-1] != TOKEN_REM:
+                raw = False
+            i += 1
+
+        return count
+
+#############################################################################
+# Line Profile
+#############################################################################
+
+class LineProfile:
+    """Line execution counts, keyed by source file and row (as in the map file)."""
+
+    VERSION = 1
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.counts = {}
+
+    def load(self) -> Optional[CompileError]:
+        """Load profile file."""
+
+        self.counts = {}
+
+        try:
+            with open(self.filename, "r", encoding="utf-8") as in_file:
+                data = json.load(in_file)
+        except (OSError, ValueError):
+            return CompileError(self.filename, "could not read line profile")
+
+        if not isinstance(data, dict) or data.get("version") != LineProfile.VERSION:
+            return CompileError(self.filename, "unsupported line profile version")
+
+        try:
+            for entry in data.get("lines", []):
+                key = (os.path.abspath(entry["file"]), int(entry["index"]))
+                self.counts[key] = self.counts.get(key, 0) + int(entry["count"])
+        except (TypeError, KeyError, ValueError):
+            return CompileError(self.filename, "invalid line profile entry")
+
+        return None
+
+    def get_count(self, filename: str, index: Optional[int]) -> int:
+        """Get execution count of source line."""
+        if index is None:
+            return 0
+        return self.counts.get((os.path.abspath(filename), index), 0)
+
+#############################################################################
+# Optimizer
+#############################################################################
+
+class Optimizer:
+    """Optimization passes on the tokenized program of crunch builds."""
+
+    def __init__(self, program, options):
+        self.program = program
+        self.options = options
+        self.stats = {}
+        # (name, weight) of variables created at program start
+        self.variable_order = []
+
+    def is_enabled(self, name: str) -> bool:
+        """Check if optimization is enabled."""
+        return name in self.options.optimizations
+
+    def run(self) -> Optional[CompileError]:
+        """Run enabled optimization passes."""
+
+        profile = None
+        if self.options.line_profile:
+            profile = LineProfile(self.options.line_profile)
+            err = profile.load()
+            if err:
+                return err
+
+        if self.is_enabled("inline"):
+            self.inline_subroutines(profile)
+
+        if self.is_enabled("deadcode"):
+            self.remove_dead_lines()
+
+        if self.is_enabled("varorder"):
+            self.order_variables(profile)
+
+        if self.is_enabled("literals"):
+            self.rewrite_literals()
+
+        if self.is_enabled("merge"):
+            self.merge_lines()
+
+        if self.is_enabled("layout") and profile:
+            self.layout_lines(profile)
+
+        return None
+
+    def get_report(self) -> "list[str]":
+        """Get summary of optimization decisions."""
+
+        report = []
+
+        if self.variable_order:
+            variable_order = ", ".join(f"{name} ({weight})" for name, weight in self.variable_order)
+            report.append(f"variable order: {variable_order}")
+
+        calls = self.stats.get("inlined_calls", 0)
+        if calls > 0:
+            summary = (
+                f"inlined subroutines: {self.stats['inlined_subroutines']}, "
+                f"{calls} GOSUB/RETURN removed, {self.stats['inline_bytes']:+d} bytes"
+            )
+            if "inlined_call_executions" in self.stats:
+                summary += f", {self.stats['inlined_call_executions']} profiled calls saved"
+            report.append(summary)
+
+        return report
+
+    def get_code_lines(self) -> list:
+        """Get program lines with code."""
+        return [basic_line for basic_line in self.program.get_lines() if not basic_line.meta]
+
+    def get_jump_targets(self) -> (set, bool):
+        """Get referenced line numbers and if there are computed jumps."""
+
+        targets = set()
+        computed_jump = False
+
+        for basic_line in self.get_code_lines():
+            info = CodeInfo(basic_line.get_bytes())
+            for _start, _end, number in info.refs:
+                targets.add(number)
+            if info.computed_jump:
+                computed_jump = True
+
+        return targets, computed_jump
+
+    def get_line_numbers(self) -> set:
+        """Get line numbers of program lines with code."""
+        return set(basic_line.line_number for basic_line in self.get_code_lines())
+
+    def can_renumber(self) -> bool:
+        """Check if all line references are known and can be rewritten."""
+
+        line_numbers = self.get_line_numbers()
+        targets, computed_jump = self.get_jump_targets()
+
+        return not computed_jump and targets.issubset(line_numbers)
+
+    def renumber(self, aliases: Optional[dict] = None):
+        """Number lines sequentially in program order and rewrite references."""
+
+        number_map = {}
+        for basic_line in self.get_code_lines():
+            number_map[basic_line.line_number] = len(number_map) + 1
+
+        if aliases:
+            # references to removed lines continue at the given line
+            for number, target in aliases.items():
+                number_map[number] = number_map[target]
+
+        def map_verbose_ref(match):
+            numbers = re.sub(r"\d+", lambda m: str(number_map.get(int(m[0]), m[0])), match[3])
+            return match[1] + match[2] + numbers
+
+        for basic_line in self.get_code_lines():
+            basic_line.line_number = number_map[basic_line.line_number]
+
+            info = CodeInfo(bytes(basic_line.get_bytes()))
+            if not info.refs:
+                continue
+
+            code = info.code
+            parts = []
+            ofs = 0
+            for start, end, number in info.refs:
+                parts.append(code[ofs:start])
+                parts.append(str(number_map[number]).encode())
+                ofs = end
+            parts.append(code[ofs:])
+
+            verbose = basic_line.verbose
+            if verbose:
+                verbose = VERBOSE_REF_PATTERN.sub(map_verbose_ref, verbose)
+
+            Optimizer.set_code(basic_line, b"".join(parts), verbose)
+
+    @staticmethod
+    def set_code(basic_line, code: bytes, verbose: Optional[str]):
+        """Replace code of line."""
+
+        basic_line.buffer = CompileBuffer()
+        basic_line.buffer.store_bytes(code)
+
+        if basic_line.has_verbose():
+            basic_line.verbose_parts = [verbose] if verbose else []
+
+    def add_stat(self, name: str, value: int):
+        """Add to optimizer statistics."""
+        self.stats[name] = self.stats.get(name, 0) + value
+
+    def merge_lines(self):
+        """Append lines that are never jumped to to their predecessor."""
+
+        targets, computed_jump = self.get_jump_targets()
+        if computed_jump:
+            # any line could be a jump target
+            return
+
+        lines = []
+        merged = 0
+
+        current = None
+        current_info = None
+
+        for basic_line in self.program.get_lines():
+            if basic_line.meta:
+                lines.append(basic_line)
+                continue
+
+            code = bytes(basic_line.get_bytes())
+
+            if current is not None and basic_line.line_number not in targets:
+
+                if code == bytes([TOKEN_REM]):
+                    # placeholder of crunched line, nothing to execute
+                    merged += 1
+                    continue
+
+                # statements after IF are conditional, after REM they are comment
+                if not current_info.has_if and not current_info.has_rem and not current_info.open_quote:
+                    merged_code = current_info.code + b":" + code
+                    merged_info = CodeInfo(merged_code)
+                    length = len(str(current.line_number)) + 1 + merged_info.get_listing_length()
+                    if length <= MAX_LINE_CHARS:
+                        verbose = None
+                        if current.has_verbose():
+                            verbose = (current.verbose or "") + ":" + (basic_line.verbose or "")
+                        Optimizer.set_code(current, merged_code, verbose)
+                        current_info = merged_info
+                        merged += 1
+                        continue
+
+            current = basic_line
+            current_info = CodeInfo(code)
+            lines.append(basic_line)
+
+        self.program.lines = lines
+        self.add_stat("merged_lines", merged)
+
+    def layout_lines(self, profile: LineProfile):
+        """Move hot blocks to the program start, after the entry block."""
+
+        if not self.can_renumber():
+            return
+
+        # split program into blocks which are only entered by jumps
+        blocks = []
+        block = []
+        for basic_line in self.program.get_lines():
+            block.append(basic_line)
+            if not basic_line.meta and CodeInfo(bytes(basic_line.get_bytes())).ends_flow():
+                blocks.append(block)
+                block = []
+
+        # the last block without terminating line falls through to the program end
+        tail = block
+
+        hot_blocks = []
+        for block_index, block in enumerate(blocks):
+            if block_index == 0:
+                # entry block is started by RUN
+                continue
+            code_lines = [basic_line for basic_line in block if not basic_line.meta]
+            if any(CodeInfo(bytes(basic_line.get_bytes())).has_data for basic_line in code_lines):
+                # keep order of DATA statements for READ
+                continue
+            entry_line = code_lines[0]
+            count = profile.get_count(entry_line.module.filename, entry_line.index)
+            if count > 0:
+                hot_blocks.append((count, block_index))
+
+        if not hot_blocks:
+            return
+
+        hot_blocks.sort(key=lambda hot_block: -hot_block[0])
+        hot_indices = set(block_index for _, block_index in hot_blocks)
+
+        order = blocks[:1] + [blocks[block_index] for _, block_index in hot_blocks]
+        order += [block for block_index, block in enumerate(blocks) if block_index > 0 and block_index not in hot_indices]
+        order.append(tail)
+
+        self.program.lines = [basic_line for block in order for basic_line in block]
+        self.renumber()
+        self.add_stat("moved_blocks", len(hot_blocks))
+
+    def count_variables(self, profile: Optional[LineProfile]) -> Optional[dict]:
+        """Get weighted reference counts of simple variables, in order of first use."""
+
+        weights = {}
+        loop_depth = 0
+
+        for basic_line in self.get_code_lines():
+            line_weight = None
+            if profile:
+                line_weight = profile.get_count(basic_line.module.filename, basic_line.index)
+
+            for item in CodeInfo(bytes(basic_line.get_bytes())).get_variables():
+                if isinstance(item, str):
+                    if item in SYSTEM_VARIABLES:
+                        continue
+                    if line_weight is None:
+                        # static estimate: references in loops are executed more often
+                        weight = LOOP_WEIGHT ** min(loop_depth, MAX_LOOP_DEPTH)
+                    else:
+                        weight = line_weight
+                    weights[item] = weights.get(item, 0) + weight
+                elif item[0] == TOKEN_FOR:
+                    loop_depth += 1
+                elif item[0] == TOKEN_NEXT:
+                    loop_depth = max(0, loop_depth - item[1])
+                else:
+                    # program declares simple variables with DIM itself
+                    return None
+
+        return weights
+
+    def order_variables(self, profile: Optional[LineProfile]):
+        """Create most used variables first with a DIM statement at program start."""
+
+        code_lines = self.get_code_lines()
+        if len(code_lines) < 1 or code_lines[0].line_number < 1:
+            return
+
+        weights = self.count_variables(profile)
+        if not weights:
+            return
+
+        first_use = list(weights)
+        order = sorted(first_use, key=lambda name: -weights[name])
+
+        # as many variables as fit into one line
+        line_number = 0
+        names = []
+        length = len(str(line_number)) + 1 + TOKEN_CHARS[TOKEN_DIM]
+        for name in order:
+            if weights[name] < 1:
+                break
+            length += len(name) + (1 if names else 0)
+            if length > MAX_LINE_CHARS:
+                break
+            names.append(name)
+
+        if names == first_use[:len(names)]:
+            # variables are already created in order of use
+            return
+
+        first_line = code_lines[0]
+        basic_line = self.program.insert_line(
+            self.program.get_lines().index(first_line), first_line.module, line_number, first_line.has_verbose()
+        )
+        basic_line.set_source_line(first_line.source_line)
+        basic_line.set_index(first_line.index)
+
+        Optimizer.set_code(
+            basic_line,
+            bytes([TOKEN_DIM]) + ",".join(names).encode("latin-1"),
+            "DIM" + ",".join(names)
+        )
+
+        self.variable_order = [(name, weights[name]) for name in names]
+        self.add_stat("ordered_variables", len(names))
+
+    def rewrite_literals(self):
+        """Replace numeric literals by their shortest form."""
+
+        saved = 0
+
+        for basic_line in self.get_code_lines():
+            info = CodeInfo(bytes(basic_line.get_bytes()))
+
+            code = info.code
+            parts = []
+            ofs = 0
+            for start, end in info.get_numbers():
+                text = code[start:end].translate(LITERAL_TEXT).decode("latin-1")
+                literal = get_shortest_literal(text).encode("latin-1").translate(LITERAL_CODE)
+                if len(literal) < end - start or literal == b".":
+                    parts.append(code[ofs:start])
+                    parts.append(literal)
+                    saved += end - start - len(literal)
+                    ofs = end
+
+            if ofs == 0:
+                continue
+
+            parts.append(code[ofs:])
+            code = b"".join(parts)
+            Optimizer.set_code(basic_line, code, CodeInfo(code).get_text())
+
+        self.add_stat("literal_bytes_saved", saved)
+
+    def remove_dead_lines(self):
+        """Remove lines which are not reachable from the program start and placeholder lines."""
+
+        if not self.can_renumber():
+            # computed jumps could reach any line
+            return
+
+        code_lines = self.get_code_lines()
+        if len(code_lines) < 1:
+            return
+
+        infos = [CodeInfo(bytes(basic_line.get_bytes())) for basic_line in code_lines]
+        line_indices = { basic_line.line_number: index for index, basic_line in enumerate(code_lines) }
+        num_lines = len(code_lines)
+
+        # placeholder lines continue with the next line
+        forward = list(range(num_lines))
+        for index in range(num_lines - 2, -1, -1):
+            if infos[index].is_placeholder():
+                forward[index] = forward[index + 1]
+
+        # lines with DATA are used by READ wherever they are
+        pending = [forward[0]] + [index for index, info in enumerate(infos) if info.has_data]
+        reachable = [False] * num_lines
+
+        while pending:
+            index = pending.pop()
+            if reachable[index]:
+                continue
+            reachable[index] = True
+
+            info = infos[index]
+            for _start, _end, number in info.refs:
+                pending.append(forward[line_indices[number]])
+            if index + 1 < num_lines and not info.ends_flow():
+                pending.append(forward[index + 1])
+
+        aliases = {}
+        removed = set()
+        placeholders = 0
+        for index, basic_line in enumerate(code_lines):
+            if reachable[index]:
+                continue
+            removed.add(id(basic_line))
+            if forward[index] != index:
+                # only placeholders in front of used lines can be referenced
+                if reachable[forward[index]]:
+                    aliases[basic_line.line_number] = code_lines[forward[index]].line_number
+                placeholders += 1
+
+        self.program.lines = [basic_line for basic_line in self.program.get_lines() if id(basic_line) not in removed]
+        self.renumber(aliases)
+
+        self.add_stat("removed_lines", len(removed) - placeholders)
+        self.add_stat("removed_placeholders", placeholders)
+
+    def inline_subroutines(self, profile: Optional[LineProfile]):
+        """Replace GOSUB statements by the code of small single line subroutines."""
+
+        code_lines = self.get_code_lines()
+
+        subroutines = {}
+        for basic_line in code_lines:
+            body = CodeInfo(bytes(basic_line.get_bytes())).get_subroutine_body()
+            if body is not None and len(body) <= self.options.inline_size:
+                subroutines[basic_line.line_number] = body
+
+        if not subroutines:
+            return
+
+        calls = 0
+        executions = 0
+        size_delta = 0
+        inlined = set()
+
+        for basic_line in code_lines:
+            count = 0
+            if profile:
+                # with a profile, only calls which are executed are inlined
+                count = profile.get_count(basic_line.module.filename, basic_line.index)
+                if count < 1:
+                    continue
+
+            info = CodeInfo(bytes(basic_line.get_bytes()))
+            statements = [
+                statement for statement in info.get_gosub_statements()
+                if statement[2] in subroutines and statement[2] != basic_line.line_number
+            ]
+            if not statements:
+                continue
+
+            code = info.code
+            changed = False
+
+            # replace from right to left to keep offsets valid
+            for start, end, number, after_then in reversed(statements):
+                body = subroutines[number]
+                if body:
+                    new_code = code[:start] + body + code[end:]
+                else:
+                    if after_then:
+                        continue
+                    # drop statement and separator
+                    head = code[:start].rstrip(b" ")
+                    tail = code[end:]
+                    if head.endswith(b":"):
+                        head = head[:-1]
+                    elif tail.startswith(b":"):
+                        tail = tail[1:]
+                    new_code = head + tail
+                    if not new_code:
+                        new_code = bytes([TOKEN_REM])
+
+                length = len(str(basic_line.line_number)) + 1 + CodeInfo(new_code).get_listing_length()
+                if length > MAX_LINE_CHARS:
+                    continue
+
+                size_delta += len(new_code) - len(code)
+                code = new_code
+                calls += 1
+                executions += count
+                inlined.add(number)
+                changed = True
+
+            if changed:
+                Optimizer.set_code(basic_line, code, CodeInfo(code).get_text())
+
+        self.add_stat("inlined_calls", calls)
+        self.add_stat("inlined_subroutines", len(inlined))
+        self.add_stat("inline_bytes", size_delta)
+        if profile:
+            self.add_stat("inlined_call_executions", executions)
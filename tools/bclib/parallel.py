@@ -0,0 +1,61 @@
+"""Parallel tokenization."""
+
+import os
+import concurrent.futures
+
+# parallel tokenization is only worth the process start-up for larger programs
+PARALLEL_MIN_LINES = 2000
+PARALLEL_MIN_CHUNK_SIZE = 250
+
+#############################################################################
+# Parallel Tokenization
+#############################################################################
+
+def tokenize_parallel(compiler, jobs: list) -> list:
+    """Tokenize jobs of compiler in worker processes, get list of results per chunk."""
+
+    options = compiler.options
+
+    workers = options.jobs if options.jobs > 0 else (os.cpu_count() or 1)
+
+    if workers < 2 or len(jobs) < PARALLEL_MIN_LINES:
+        return [compiler.tokenize_local(jobs)]
+
+    chunk_size = max(PARALLEL_MIN_CHUNK_SIZE, -(-len(jobs) // (workers * 4)))
+    chunks = [jobs[i:i+chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        initializer=_init_tokenize_worker,
+        initargs=(
+            type(compiler), options, compiler.labels, compiler.constants, compiler.line_number_map,
+            compiler.track_verbose, compiler.line_cache is not None
+        )
+    ) as executor:
+        return list(executor.map(_tokenize_chunk, chunks))
+
+#############################################################################
+# Tokenize Worker
+#############################################################################
+
+_worker_compiler = None
+
+def _init_tokenize_worker(
+    compiler_class, options, labels, constants, line_number_map, track_verbose, collect_line_dependencies
+):
+    """Set up compiler of worker process with the results of the numbering pass."""
+
+    global _worker_compiler # pylint: disable=global-statement
+
+    compiler = compiler_class(options)
+    compiler.labels = labels
+    compiler.constants = constants
+    compiler.line_number_map = line_number_map
+    compiler.track_verbose = track_verbose
+    compiler.collect_line_dependencies = collect_line_dependencies
+
+    _worker_compiler = compiler
+
+def _tokenize_chunk(jobs: list) -> list:
+    """Tokenize chunk of lines in worker process."""
+    return _worker_compiler.tokenize_jobs(jobs)
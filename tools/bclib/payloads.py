@@ -0,0 +1,169 @@
+"""Binary payloads appended to the program."""
+
+from typing import Optional
+
+from .common import CompileError
+
+# end of memory available for BASIC program and variables
+BASIC_END_ADDR = 0xA000
+
+# zero page pointers used by the relocation stub
+STUB_SOURCE_PTR = 0xFB
+STUB_TARGET_PTR = 0xFD
+
+# name of the relocation stub address constant
+RELOCATE_CONSTANT = "relocate_payloads"
+
+# payload addresses are constants, so the program is compiled until its size is stable
+MAX_PAYLOAD_PASSES = 8
+
+#############################################################################
+# Payload
+#############################################################################
+
+class Payload:
+    """Binary file stored behind the end of the BASIC program."""
+
+    __slots__ = ("name", "filename", "target", "data", "addr")
+
+    def __init__(self, name: str, filename: str, target: Optional[int] = None):
+        self.name = name
+        self.filename = filename
+        # address the stub copies the data to
+        self.target = target
+        self.data = b""
+        # load address behind the program
+        self.addr = 0
+
+    def load(self) -> Optional[CompileError]:
+        """Read payload data."""
+
+        try:
+            with open(self.filename, "rb") as in_file:
+                self.data = in_file.read()
+        except OSError:
+            return CompileError(self.filename, "could not read payload file")
+
+        return None
+
+    def get_constants(self) -> dict:
+        """Get address and size constants."""
+
+        return {
+            f"{self.name.lower()}_addr": self.target if self.target is not None else self.addr,
+            f"{self.name.lower()}_size": len(self.data)
+        }
+
+    def get_copy_code(self) -> bytes:
+        """Get 6502 code which copies the payload to its target address."""
+
+        pages, rest = divmod(len(self.data), 256)
+
+        code = bytearray([
+            0xA9, self.addr & 0xFF, 0x85, STUB_SOURCE_PTR,          # lda #<addr : sta src
+            0xA9, self.addr >> 8, 0x85, STUB_SOURCE_PTR + 1,        # lda #>addr : sta src+1
+            0xA9, self.target & 0xFF, 0x85, STUB_TARGET_PTR,        # lda #<target : sta dst
+            0xA9, self.target >> 8, 0x85, STUB_TARGET_PTR + 1,      # lda #>target : sta dst+1
+            0xA0, 0x00                                              # ldy #0
+        ])
+
+        if pages > 0:
+            code += bytes([
+                0xA2, pages,                                        # ldx #pages
+                0xB1, STUB_SOURCE_PTR, 0x91, STUB_TARGET_PTR,       # loop: lda (src),y : sta (dst),y
+                0xC8, 0xD0, 0xF9,                                   # iny : bne loop
+                0xE6, STUB_SOURCE_PTR + 1, 0xE6, STUB_TARGET_PTR + 1, # inc src+1 : inc dst+1
+                0xCA, 0xD0, 0xF2                                    # dex : bne loop
+            ])
+
+        if rest > 0:
+            code += bytes([
+                0xB1, STUB_SOURCE_PTR, 0x91, STUB_TARGET_PTR,       # rest: lda (src),y : sta (dst),y
+                0xC8, 0xC0, rest, 0xD0, 0xF7                        # iny : cpy #rest : bne rest
+            ])
+
+        return bytes(code)
+
+#############################################################################
+# Payload Layout
+#############################################################################
+
+def layout_payloads(payloads: "list[Payload]", start_addr: int, addr: int) -> (bytes, dict, Optional[str]):
+    """Place payloads and relocation stub behind program, get data, constants and error."""
+
+    data = bytearray()
+    constants = {}
+    err = None
+
+    for payload in payloads:
+        payload.addr = addr + len(data)
+        data += payload.data
+        constants.update(payload.get_constants())
+
+    relocated = [payload for payload in payloads if payload.target is not None]
+    if relocated:
+        stub = bytearray()
+        for payload in relocated:
+            stub += payload.get_copy_code()
+        stub.append(0x60) # rts
+
+        constants[RELOCATE_CONSTANT] = addr + len(data)
+        data += stub
+
+        end_addr = addr + len(data)
+        for payload in relocated:
+            if payload.target + len(payload.data) > 0x10000:
+                err = f"payload '{payload.name}' does not fit at its target address"
+            elif payload.target < end_addr and payload.target + len(payload.data) > start_addr:
+                # copying would overwrite program, payloads or the stub
+                err = f"payload '{payload.name}' target overlaps the program"
+
+    if addr + len(data) > BASIC_END_ADDR:
+        err = "program and payloads exceed BASIC memory"
+
+    # the error is reported when the layout is final
+    return bytes(data), constants, err
+
+#############################################################################
+# Payload Passes
+#############################################################################
+
+def compile_with_payloads(compiler, inputs: "list[str]", payloads: "list[Payload]") -> Optional[CompileError]:
+    """Compile program until the addresses of the payloads behind it are stable."""
+
+    options = compiler.options
+    lower_case = options.lower_case
+
+    payload_addr = None
+    payload_err = None
+
+    for _ in range(MAX_PAYLOAD_PASSES):
+        # place payloads behind the program of the previous pass
+        compiler.reset_passes()
+        program = compiler.program
+        payload_addr = program.start_addr + 2 if payload_addr is None else payload_addr
+        payload_data, payload_constants, payload_err = layout_payloads(payloads, program.start_addr, payload_addr)
+        compiler.constants.update(payload_constants)
+        program.set_payload(payload_data)
+
+        err = compiler.compile_program(inputs)
+
+        # restore initial options (might be changed by compilation)
+        options.lower_case = lower_case
+
+        if err:
+            return err
+
+        if program.get_end_addr() == payload_addr:
+            break
+
+        payload_addr = program.get_end_addr()
+
+    else:
+        return CompileError(payloads[0].filename, "could not resolve payload addresses")
+
+    if payload_err:
+        # the error is reported when the layout is final
+        return CompileError(payloads[0].filename, payload_err)
+
+    return None
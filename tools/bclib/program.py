@@ -0,0 +1,382 @@
+"""Basic program."""
+
+from typing import Optional
+
+from .common import CompileError, CompileOptions, CompileBuffer, CompileHelper
+
+#############################################################################
+# Basic Module
+#############################################################################
+
+class BasicModule:
+    """Basic module."""
+
+    def __init__(self, filename: str, options: CompileOptions):
+        self.filename = filename
+        self.options = options
+
+
+#############################################################################
+# Basic Line
+#############################################################################
+
+class BasicLine:
+    """Basic line."""
+
+    __slots__ = (
+        "buffer", "module", "line_number", "addr", "next_addr",
+        "meta", "verbose_parts", "source_line", "index"
+    )
+
+    def __init__(self, module: BasicModule, line_number: Optional[int] = None, track_verbose: bool = True):
+        self.buffer = CompileBuffer()
+        self.module = module
+        self.line_number = line_number
+        self.addr = 0x0
+        self.next_addr = 0x0
+        self.meta = False
+        # verbose text fragments, joined on demand (None if not tracked)
+        self.verbose_parts = [] if track_verbose else None
+        self.source_line = None
+        self.index = None
+
+    @property
+    def verbose(self) -> Optional[str]:
+        """Get verbose text."""
+        if not self.verbose_parts:
+            return None
+        if len(self.verbose_parts) > 1:
+            self.verbose_parts = ["".join(self.verbose_parts)]
+        return self.verbose_parts[0]
+
+    def has_verbose(self) -> bool:
+        """Check if verbose text is tracked."""
+        return self.verbose_parts is not None
+
+    def get_bytes(self) -> CompileBuffer:
+        """Get buffer object."""
+        return self.buffer.get_buffer()
+
+    def set_source_line(self, source_line: str):
+        """Set raw text."""
+        self.source_line = source_line
+
+    def set_index(self, index: int):
+        """Set line index."""
+        self.index = index
+
+    def set_meta(self):
+        """Mark line as nop/meta information."""
+        self.meta = True
+
+    def set_addr(self, addr: int):
+        """Set BASIC line memory address."""
+        self.addr = addr
+
+    def set_next_addr(self, next_addr: int):
+        """Set next BASIC line memory address."""
+        self.next_addr = next_addr
+
+    def get_code_size(self) -> int:
+        """Get code size in bytes."""
+        return self.buffer.length()
+
+    def get_total_size(self) -> int:
+        """Get line header and code size in bytes."""
+        return (
+            self.get_code_size() + 5
+        )  # 2 (next addr) + 2 (line number) + CODE + 1 (null byte for end)
+
+    def add_verbose(self, s):
+        """Add verbose info."""
+        if self.verbose_parts is not None and s:
+            self.verbose_parts.append(s)
+
+    def is_empty(self) -> bool:
+        """Check if buffer is empty."""
+        return self.buffer.length() < 1
+
+    def set_line_number(self, line_number: int):
+        """Set line number."""
+        self.line_number = line_number
+
+    def store_byte(self, value, verbose: Optional[str] = None):
+        """Store byte to buffer."""
+        self.buffer.store_byte(value)
+        if verbose:
+            self.add_verbose(verbose)
+
+    def peek_last_char(self):
+        """Get last char from buffer."""
+        return self.buffer.peek_last_char()
+
+    def drop_last_char(self):
+        """Drop last char from buffer."""
+        self.buffer.drop_last_char()
+        parts = self.verbose_parts
+        if parts and parts[-1][-1] == ":":
+            if len(parts[-1]) > 1:
+                parts[-1] = parts[-1][:-1]
+            else:
+                parts.pop()
+
+    def store_bytes(self, data: bytes, verbose: Optional[str] = None):
+        """Store bytes to buffer."""
+        self.buffer.store_bytes(data)
+        if verbose:
+            self.add_verbose(verbose)
+
+    def store_char(self, c, verbose: Optional[str] = None):
+        """Store char to buffer."""
+        self.buffer.store_char(c, self.module.options.lower_case)
+        self.add_verbose(verbose if verbose else c)
+
+    def store_char_raw(self, c, verbose: Optional[str] = None):
+        """Store char to buffer."""
+        self.buffer.store_char_raw(c)
+        self.add_verbose(verbose if verbose else c)
+
+    def store_string(self, s: str, verbose: Optional[str] = None):
+        """Store string bytes to buffer."""
+        self.buffer.store_string(s, self.module.options.lower_case)
+        self.add_verbose(verbose if verbose else s)
+
+    def store_text(self, s: str, raw_string: bool = False):
+        """Store run of text characters to buffer."""
+        if not s:
+            return
+        self.buffer.store_text(s, self.module.options.lower_case, raw_string)
+        self.add_verbose(s)
+
+    def store_rem_tail(self, s: str):
+        """Store comment text after REM, tabs are dropped."""
+        text = s.replace("\t", "")
+        if not text:
+            return
+        self.buffer.store_text(text, self.module.options.lower_case)
+        self.add_verbose(text)
+
+    def store_word_be(self, value, verbose: Optional[str] = None):
+        """Store word to buffer."""
+        self.buffer.store_word_be(value)
+        if verbose:
+            self.add_verbose(verbose)
+
+    def to_string(self) -> str:
+        """Generate string representation."""
+
+        verbose = self.verbose
+
+        if self.meta:
+            return verbose
+
+        if not verbose:
+            return f"{self.line_number}"
+
+        return f"{self.line_number} {verbose}"
+
+
+#############################################################################
+# Basic Program
+#############################################################################
+
+class BasicProgram:
+    """Basic program."""
+
+    def __init__(self, start_addr):
+        self.start_addr = start_addr
+        self.lines: list[BasicLine] = []
+        self.payload = b""
+
+    def get_lines(self) -> "list[BasicLine]":
+        """Get BASIC lines."""
+        return self.lines
+
+    def add_line(self, line: BasicLine):
+        """Add BASIC line."""
+        self.lines.append(line)
+
+    def insert_line(self, index: int, module: BasicModule, line_number: int, track_verbose: bool = True) -> BasicLine:
+        """Create BASIC line and insert it at list position."""
+        line = BasicLine(module, line_number, track_verbose)
+        self.lines.insert(index, line)
+        return line
+
+    def set_payload(self, payload: bytes):
+        """Set binary data stored behind the end of program marker."""
+        self.payload = payload
+
+    def get_end_addr(self) -> int:
+        """Get address behind the end of program marker."""
+
+        addr = self.start_addr
+        for basic_line in self.get_lines():
+            if not basic_line.meta and not basic_line.is_empty():
+                addr = basic_line.next_addr
+
+        return addr + 2
+
+    def add_meta(self, module: BasicModule, s: str):
+        """Add meta information."""
+        line = BasicLine(module)
+        line.set_meta()
+        line.add_verbose(s)
+        self.add_line(line)
+
+    def resolve(self):
+        """Resolve all addresses."""
+
+        addr = self.start_addr
+
+        for basic_line in self.get_lines():
+            if basic_line.meta:
+                continue
+            if basic_line.is_empty():
+                print(f"skip empty line {basic_line.line_number}")
+                continue
+
+            next_addr = addr + basic_line.get_total_size()
+            basic_line.set_addr(addr)
+            basic_line.set_next_addr(next_addr)
+            addr = next_addr
+
+    def get_line_map(self) -> "list[dict]":
+        """Get address to source line mapping."""
+
+        # --------------------------------------------------
+        # Info Structure:
+        # --------------------------------------------------
+        # file   : source file name
+        # start  : program line absolute start address
+        # end    : program line absolute end address
+        # line   : numeric BASIC line number
+        # index  : row number in source file
+        # length : number of source chars
+        # text   : rendered line (None if not tracked)
+        # --------------------------------------------------
+
+        line_map = []
+
+        for basic_line in self.get_lines():
+            if basic_line.meta or basic_line.is_empty():
+                continue
+
+            start_addr = basic_line.addr
+
+            line_map.append({
+                "file": basic_line.module.filename,
+                "start": start_addr,
+                "end": start_addr + basic_line.get_total_size() - 1,
+                "line": basic_line.line_number,
+                "index": basic_line.index,
+                "length": len(basic_line.source_line),
+                "text": basic_line.to_string() if basic_line.has_verbose() else None
+            })
+
+        return line_map
+
+    def write_map(self, filename: Optional[str]) -> Optional[CompileError]:
+        """Write map file."""
+
+        s = []
+
+        source_file = ""
+
+        s.append(
+            "################################################################################"
+        )
+        s.append("# MAP FILE")
+        s.append("# generated file: DO NOT EDIT!")
+        s.append(
+            "################################################################################"
+        )
+
+        for entry in self.get_line_map():
+            if source_file != entry["file"]:
+                source_file = entry["file"]
+                s.append("")
+                s.append(f"{source_file}")
+
+            src = entry["text"] if entry["text"] is not None else str(entry["line"])
+
+            info = f"{entry['start']},{entry['end']},{entry['line']},{entry['index']},{entry['length']}"
+
+            s.append(info.ljust(30) + f"# {src}")
+
+        s.append("")
+        content = "\n".join(s)
+
+        if filename:
+            err = CompileHelper.write_textfile(filename, content)
+            if err:
+                return err
+        else:
+            print(content)
+
+        return None
+
+    def to_bytes(self) -> bytearray:
+        """Encode program to PRG data."""
+
+        lines = [basic_line for basic_line in self.get_lines() if not basic_line.meta]
+
+        # load address (2 bytes) + lines + end of program (2 zero-bytes) + payload
+        size = 2 + sum(basic_line.get_total_size() for basic_line in lines) + 2 + len(self.payload)
+
+        # zero-initialized, end of line and end of program markers are implicit
+        data = bytearray(size)
+
+        # program load address (2 bytes)
+        addr = self.start_addr
+        data[0] = addr & 0xFF
+        data[1] = (addr & 0xFF00) >> 8
+
+        ofs = 2
+        for basic_line in lines:
+            # address of next statement (2 bytes)
+            next_addr = basic_line.next_addr
+            data[ofs] = next_addr & 0xFF
+            data[ofs+1] = (next_addr & 0xFF00) >> 8
+
+            # line number (2 bytes)
+            line_number = basic_line.line_number
+            data[ofs+2] = line_number & 0xFF
+            data[ofs+3] = (line_number & 0xFF00) >> 8
+
+            # interpreter code
+            code = basic_line.get_bytes()
+            end = ofs + 4 + len(code)
+            data[ofs+4:end] = code
+
+            # end of line (1 zero-byte)
+            ofs = end + 1
+
+        if self.payload:
+            data[ofs+2:] = self.payload
+
+        return data
+
+    def write_prg(self, filename: Optional[str]) -> Optional[CompileError]:
+        """Write program to file or console."""
+
+        if not filename:
+            return None
+
+        return CompileHelper.write_binaryfile(filename, self.to_bytes())
+
+
+#############################################################################
+# Compile Result
+#############################################################################
+
+class CompileResult:
+    """In-memory compile result."""
+
+    def __init__(self, program: BasicProgram):
+        self.program = program
+        self.prg = program.to_bytes()
+        self.line_map = program.get_line_map()
+
+    def write_prg(self, filename: str) -> Optional[CompileError]:
+        """Write PRG data with a single write."""
+        return CompileHelper.write_binaryfile(filename, self.prg)
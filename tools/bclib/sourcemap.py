@@ -0,0 +1,95 @@
+"""Indexed source map."""
+
+import os
+import json
+import bisect
+
+from typing import Optional
+
+from .common import CompileError, CompileHelper
+
+#############################################################################
+# Source Map
+#############################################################################
+
+class SourceMap:
+    """Indexed debug information, sorted by address for binary search lookups."""
+
+    VERSION = 1
+
+    def __init__(self):
+        self.files = []
+        self.file_indices = {}
+        self.ranges = []
+        self.starts = []
+
+    @staticmethod
+    def from_line_map(line_map: "list[dict]") -> "SourceMap":
+        """Build source map from compiler line map."""
+
+        source_map = SourceMap()
+
+        for entry in line_map:
+            file_index = source_map.add_file(entry["file"])
+            source_map.add(entry["start"], entry["end"], file_index, entry["index"], entry["line"], entry["length"])
+
+        source_map.build()
+
+        return source_map
+
+    def add_file(self, filename) -> int:
+        """Add file to source map and get its index."""
+
+        filename = os.path.normpath(filename)
+        file_index = self.file_indices.get(filename)
+        if file_index is None:
+            file_index = len(self.files)
+            self.files.append(filename)
+            self.file_indices[filename] = file_index
+
+        return file_index
+
+    def add(self, start_addr, end_addr, file_index, idx, line, line_len):
+        """Add entry to source map."""
+        self.ranges.append((start_addr, end_addr, file_index, idx, line, line_len))
+
+    def build(self):
+        """Sort entries by address and build lookup index."""
+        self.ranges.sort(key=lambda r: r[0])
+        self.starts = [r[0] for r in self.ranges]
+
+    def lookup(self, addr: int) -> Optional[tuple]:
+        """Get (filename, idx, line) for program address."""
+
+        pos = bisect.bisect_right(self.starts, addr) - 1
+        if pos < 0:
+            return None
+
+        start_addr, end_addr, file_index, idx, line, _line_len = self.ranges[pos]
+        if addr < start_addr or addr > end_addr:
+            return None
+
+        return self.files[file_index], idx, line
+
+    def get_string(self) -> str:
+        """Encode source map to JSON."""
+
+        # --------------------------------------------------
+        # Range Structure:
+        # --------------------------------------------------
+        # start_addr, end_addr, file_index, idx, line, len
+        # --------------------------------------------------
+
+        data = {
+            "version": SourceMap.VERSION,
+            "start": self.starts[0] if self.starts else 0,
+            "end": self.ranges[-1][1] if self.ranges else 0,
+            "files": self.files,
+            "ranges": [list(r) for r in self.ranges]
+        }
+
+        return json.dumps(data, separators=(",", ":"))
+
+    def write(self, filename: str) -> Optional[CompileError]:
+        """Write JSON source map file."""
+        return CompileHelper.write_textfile(filename, self.get_string())
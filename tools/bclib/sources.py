@@ -0,0 +1,83 @@
+"""Source files."""
+
+import os
+
+from typing import Optional
+
+from .common import CompileError
+
+#############################################################################
+# Source Cache
+#############################################################################
+
+class SourceCache:
+    """Per-compile cache of source file lines."""
+
+    def __init__(self):
+        self.lines = {}
+        self.processed_lines = {}
+        self.line_filter = None
+        self.bytes_read = 0
+
+    def add_text(self, filename: str, text: str):
+        """Provide source code for a file name without reading from disk."""
+        lines = text.split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        self.lines[os.path.abspath(filename)] = [line.rstrip("\r") for line in lines]
+
+    def exists(self, filename: str) -> bool:
+        """Check if source file is available."""
+        key = os.path.abspath(filename)
+        return key in self.lines or os.path.exists(key)
+
+    def set_line_filter(self, line_filter):
+        """Set function applied to lines returned by read_processed()."""
+        self.line_filter = line_filter
+        self.processed_lines = {}
+
+    def read(self, filename: str) -> ("Optional[list[str]]", Optional[CompileError]):
+        """Read source lines (without line endings), each file is read only once."""
+
+        key = os.path.abspath(filename)
+        lines = self.lines.get(key)
+        if lines is not None:
+            return lines, None
+
+        try:
+            with open(key, "r", encoding="utf-8") as in_file:
+                text = in_file.read()
+        except OSError:
+            return None, CompileError(filename, "could not read file")
+
+        self.bytes_read += len(text)
+        lines = text.split("\n")
+
+        if lines[-1] == "":
+            lines.pop()
+
+        self.lines[key] = lines
+
+        return lines, None
+
+    def read_processed(self, filename: str) -> ("Optional[list[str]]", Optional[CompileError]):
+        """Read filtered and stripped source lines."""
+
+        key = os.path.abspath(filename)
+        lines = self.processed_lines.get(key)
+        if lines is not None:
+            return lines, None
+
+        raw_lines, err = self.read(key)
+        if err:
+            return None, err
+
+        line_filter = self.line_filter
+        if line_filter:
+            lines = [line_filter(line).strip() for line in raw_lines]
+        else:
+            lines = [line.strip() for line in raw_lines]
+
+        self.processed_lines[key] = lines
+
+        return lines, None
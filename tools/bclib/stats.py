@@ -0,0 +1,224 @@
+"""Static cost report of compiled programs."""
+
+import json
+
+from typing import Optional
+
+from .constants import Constants
+from .common import CompileHelper, CompileError
+from .optimizer import (
+    CodeInfo, TOKEN_NAMES, TOKEN_REM, TOKEN_DATA, TOKEN_RUN, TOKEN_LIST,
+    CHAR_QUOTE, CHAR_COLON, CHAR_SPACE, CHAR_COMMA, CHAR_MINUS, TOKEN_MINUS, is_digit
+)
+
+STATS_VERSION = 1
+
+# prefix byte of TSB tokens
+TOKEN_TSB = 0x64
+
+TSB_TOKEN_NAMES = { v: k for k, v in Constants.TSB_TOKENS.items() }
+
+# number of entries in the text report tables
+TOP_COUNT = 10
+
+def get_ref_token(code: bytes, start: int) -> int:
+    """Get token which precedes a line number reference (list items included)."""
+
+    i = start - 1
+    while i >= 0 and (code[i] in (CHAR_SPACE, CHAR_COMMA, CHAR_MINUS, TOKEN_MINUS) or is_digit(code[i])):
+        i -= 1
+
+    return code[i] if i >= 0 else 0
+
+#############################################################################
+# Program Statistics
+#############################################################################
+
+class ProgramStats:
+    """Sizes, token usage and jump costs of a resolved program."""
+
+    def __init__(self, feature_tsb: bool = False):
+        self.feature_tsb = feature_tsb
+        self.lines = []
+        self.files = {}
+        self.tokens = {}
+        self.jumps = []
+        self.targets = {}
+
+    def collect(self, basic_lines: list):
+        """Collect statistics of resolved BASIC lines."""
+
+        lines = [basic_line for basic_line in basic_lines if not basic_line.meta and not basic_line.is_empty()]
+
+        positions = {}
+        for position, basic_line in enumerate(lines):
+            positions.setdefault(basic_line.line_number, position)
+
+        for position, basic_line in enumerate(lines):
+            code = bytes(basic_line.get_bytes())
+            size = basic_line.get_total_size()
+            filename = basic_line.module.filename
+
+            self.lines.append({
+                "line": basic_line.line_number,
+                "file": filename,
+                "index": basic_line.index,
+                "bytes": size
+            })
+
+            file_stats = self.files.setdefault(filename, { "lines": 0, "bytes": 0 })
+            file_stats["lines"] += 1
+            file_stats["bytes"] += size
+
+            self.count_tokens(code)
+
+            for start, _end, number in CodeInfo(code).refs:
+                if get_ref_token(code, start) in (TOKEN_RUN, TOKEN_LIST):
+                    continue
+
+                self.targets[number] = self.targets.get(number, 0) + 1
+
+                target = positions.get(number)
+                if target is None:
+                    continue
+
+                # the interpreter searches forward from the next line or from the program start
+                searched = target - position if number > basic_line.line_number else target + 1
+
+                self.jumps.append({
+                    "line": basic_line.line_number,
+                    "target": number,
+                    "distance": target - position,
+                    "searched": searched
+                })
+
+    def count_tokens(self, code: bytes):
+        """Add keyword tokens of code to histogram."""
+
+        n = len(code)
+        i = 0
+        in_quote = False
+        in_data = False
+
+        while i < n:
+            b = code[i]
+            i += 1
+
+            if b == CHAR_QUOTE:
+                in_quote = not in_quote
+                continue
+
+            if in_quote:
+                continue
+
+            if in_data:
+                in_data = b != CHAR_COLON
+                continue
+
+            name = None
+            if b == TOKEN_TSB and self.feature_tsb and i < n:
+                b2 = code[i]
+                i += 1
+                if 0xB1 <= b2 <= 0xB3:
+                    # BASIC extension tokens
+                    b2 ^= 0x8F
+                name = TSB_TOKEN_NAMES.get(b2)
+            elif b >= 0x80:
+                name = TOKEN_NAMES.get(b)
+
+            if name:
+                self.tokens[name] = self.tokens.get(name, 0) + 1
+
+            if b == TOKEN_REM:
+                break
+
+            if b == TOKEN_DATA:
+                in_data = True
+
+    def get_data(self) -> dict:
+        """Get report data."""
+
+        forward = [jump for jump in self.jumps if jump["distance"] > 0]
+        backward = [jump for jump in self.jumps if jump["distance"] <= 0]
+
+        return {
+            "version": STATS_VERSION,
+            "lines": len(self.lines),
+            "bytes": sum(line["bytes"] for line in self.lines),
+            "files": [
+                { "file": filename, "lines": file_stats["lines"], "bytes": file_stats["bytes"] }
+                for filename, file_stats in self.files.items()
+            ],
+            "tokens": dict(sorted(self.tokens.items(), key=lambda item: (-item[1], item[0]))),
+            "jumps": {
+                "count": len(self.jumps),
+                "searched": sum(jump["searched"] for jump in self.jumps),
+                "longest_forward": max(forward, key=lambda jump: jump["distance"], default=None),
+                "longest_backward": min(backward, key=lambda jump: jump["distance"], default=None),
+                "list": self.jumps
+            },
+            "targets": [
+                { "line": number, "refs": count }
+                for number, count in sorted(self.targets.items(), key=lambda item: (-item[1], item[0]))
+            ],
+            "line_sizes": self.lines
+        }
+
+    def get_text(self) -> str:
+        """Get report as text."""
+
+        data = self.get_data()
+        jumps = data["jumps"]
+
+        s = []
+
+        s.append(f"program: {data['lines']} lines, {data['bytes']} bytes")
+
+        s.append("")
+        s.append("files:")
+        for entry in data["files"]:
+            s.append(f"  {entry['file']}: {entry['lines']} lines, {entry['bytes']} bytes")
+
+        s.append("")
+        s.append("largest lines:")
+        for entry in sorted(data["line_sizes"], key=lambda entry: -entry["bytes"])[:TOP_COUNT]:
+            location = entry["file"]
+            if entry["index"] is not None and entry["index"] >= 0:
+                location += f":{entry['index'] + 1}"
+            s.append(f"  {entry['line']:>5}: {entry['bytes']} bytes ({location})")
+
+        s.append("")
+        s.append("tokens:")
+        for name, count in list(data["tokens"].items())[:TOP_COUNT]:
+            s.append(f"  {name:<8}{count:>6}")
+
+        s.append("")
+        average = jumps["searched"] / jumps["count"] if jumps["count"] > 0 else 0.0
+        s.append(f"jumps: {jumps['count']}, lines searched: {jumps['searched']} (average {average:.1f})")
+        for title, jump in (("longest forward", jumps["longest_forward"]), ("longest backward", jumps["longest_backward"])):
+            if jump:
+                s.append(f"  {title}: {jump['line']} -> {jump['target']} ({abs(jump['distance'])} lines)")
+
+        s.append("")
+        s.append("hottest targets (static references):")
+        for entry in data["targets"][:TOP_COUNT]:
+            s.append(f"  {entry['line']:>5}: {entry['refs']}")
+
+        s.append("")
+
+        return "\n".join(s)
+
+    def write(self, filename: Optional[str], stats_format: str = "text") -> Optional[CompileError]:
+        """Write report to file or console."""
+
+        if stats_format == "json":
+            content = json.dumps(self.get_data(), indent=2)
+        else:
+            content = self.get_text()
+
+        if filename:
+            return CompileHelper.write_textfile(filename, content)
+
+        print(content)
+
+        return None
@@ -0,0 +1,123 @@
+"""Token tables."""
+
+from typing import Optional
+
+from .constants import Constants
+
+#############################################################################
+# Token Table
+#############################################################################
+
+class TokenTable:
+    """Precompiled token matcher for BASIC (and TSB) keywords."""
+
+    _instances = {}
+
+    def __init__(self, feature_tsb: bool):
+        """Constructor."""
+
+        if feature_tsb:
+            all_tokens = list(Constants.BASIC_TOKENS.keys()) + list(
+                Constants.TSB_TOKENS.keys()
+            )
+            token_map = {}
+            token_map.update(Constants.BASIC_TOKENS)
+            for k, v in Constants.TSB_TOKENS.items():
+                if k in token_map:
+                    continue
+                if v & 0xFF00:
+                    v += 0x640000
+                else:
+                    v += 0x6400
+                token_map[k] = v
+        else:
+            all_tokens = list(Constants.BASIC_TOKENS.keys())
+            token_map = Constants.BASIC_TOKENS
+
+        # longest tokens first, equal lengths keep table order
+        self.sorted_token_list = sorted(all_tokens, key=lambda x: -len(x))
+        self.token_map = token_map
+        self.max_length = max(len(k) for k in all_tokens)
+
+        # entries are (rank, token, token_id, length), lower rank wins
+        self.trie = {}
+        self.exact = {}
+        self.abbreviations = {}
+
+        for rank, k in enumerate(self.sorted_token_list):
+            if k in self.exact:
+                continue
+
+            entry = (rank, k, token_map[k], len(k))
+            self.exact[k] = entry
+
+            node = self.trie
+            for c in k:
+                child = node.get(c)
+                if child is None:
+                    child = {}
+                    # match upper and lower case input by the same node
+                    node[c] = child
+                    node[c.lower()] = child
+                node = child
+            node[""] = entry
+
+            if len(k) >= 2 and k in Constants.BASIC_TOKENS:
+                # abbreviated form, e.g. 'pO' for 'POKE'
+                abbrev = k[0].lower() + k[1].upper()
+                if abbrev not in self.abbreviations:
+                    self.abbreviations[abbrev] = (rank, k, Constants.BASIC_TOKENS[k], 2)
+
+    @classmethod
+    def get(cls, feature_tsb: bool) -> "TokenTable":
+        """Get shared token table for the given feature set."""
+
+        key = bool(feature_tsb)
+        table = cls._instances.get(key)
+        if table is None:
+            table = TokenTable(key)
+            cls._instances[key] = table
+        return table
+
+    def match(self, text: str):
+        """Get token info for text."""
+
+        if text == "?":
+            return ("?", 0x99, 1)
+
+        entry = self.exact.get(text.upper())
+        abbrev = self.abbreviations.get(text) if len(text) == 2 else None
+
+        return self._select(entry, abbrev)
+
+    def peek(self, text: str, ofs: int):
+        """Look at the token at the given offset."""
+
+        if text[ofs] == "?":
+            return ("?", 0x99, 1)
+
+        # longest full token match
+        entry = None
+        node = self.trie
+        for c in text[ofs:ofs+self.max_length]:
+            node = node.get(c)
+            if node is None:
+                break
+            terminal = node.get("")
+            if terminal is not None:
+                entry = terminal
+
+        abbrev = self.abbreviations.get(text[ofs:ofs+2])
+
+        return self._select(entry, abbrev)
+
+    def _select(self, entry: Optional[tuple], abbrev: Optional[tuple]):
+        """Pick full or abbreviated match, first in token order wins."""
+
+        if abbrev is not None and (entry is None or abbrev[0] <= entry[0]):
+            entry = abbrev
+
+        if entry is None:
+            return None, None, 0
+
+        return entry[1:]
@@ -0,0 +1,91 @@
+"""VS64 Compile Server."""
+
+import sys
+import os
+import getopt
+import functools
+
+SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(SCRIPT_DIR)
+
+from cslib import CompileClient, CompileServer, CompileServerOptions
+
+import bc
+import rc
+
+# preload compiler libraries, tool entries import them on demand
+import bclib
+import rclib
+
+#############################################################################
+# Main Entry
+#############################################################################
+
+def usage():
+    """Print tool usage information."""
+
+    print("Usage: cs [options]")
+    print("")
+    print("Keeps the BASIC and resource compilers loaded and runs bc.py/rc.py")
+    print("requests forwarded by clients that have VS64_COMPILE_SERVER set")
+    print("to the server socket path.")
+    print("")
+    print("options:")
+    print("  -h, --help         : Show this help")
+    print("  -s, --socket       : Unix domain socket path, default: $VS64_COMPILE_SERVER")
+    print("  --stdio            : Serve JSON-RPC requests on stdin/stdout")
+    print("  -v, --verbose      : Verbose output")
+
+def warm_up():
+    """Build shared compiler tables once before serving requests."""
+
+    for tsb in (False, True):
+        options = bclib.CompileOptions()
+        if tsb:
+            options.set_enable_tsb()
+        bclib.BasicCompiler(options)
+
+    rclib.ResourceCompiler()
+
+def main():
+    """Main entry."""
+
+    try:
+        opts, _args = getopt.getopt(sys.argv[1:], "hvs:", ["help", "verbose", "stdio", "socket="])
+    except getopt.GetoptError as err:
+        print(err.msg)
+        usage()
+        sys.exit(2)
+
+    options = CompileServerOptions()
+    options.set_socket_path(CompileClient.get_socket_path())
+
+    for option, arg in opts:
+        if option in ("-h", "--help"):
+            usage()
+            sys.exit()
+        elif option in ("-s", "--socket"):
+            options.set_socket_path(arg)
+        elif option == "--stdio":
+            options.set_stdio()
+        elif option in ("-v", "--verbose"):
+            options.set_verbosity_level(1)
+
+    warm_up()
+
+    # include lookups are kept for following BASIC compiles of this server
+    include_graph = bclib.IncludeGraph()
+
+    tools = {
+        "bc": functools.partial(bc.run, include_graph),
+        "rc": rc.run
+    }
+
+    compile_server = CompileServer(options, tools)
+    err = compile_server.run()
+    if err:
+        print(err.to_string())
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
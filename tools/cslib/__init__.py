@@ -0,0 +1,4 @@
+"""VS64 Compile Server."""
+
+from .client import CompileClient
+from .server import CompileServer, CompileServerOptions
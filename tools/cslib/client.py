@@ -0,0 +1,77 @@
+"""Compile client."""
+
+import os
+import sys
+import json
+import socket
+
+from typing import Optional
+
+SERVER_ENV = "VS64_COMPILE_SERVER"
+
+#############################################################################
+# Compile Client
+#############################################################################
+
+class CompileClient:
+    """Forwards tool invocations to a running compile server."""
+
+    @staticmethod
+    def get_socket_path() -> Optional[str]:
+        """Get server socket path from environment."""
+        return os.environ.get(SERVER_ENV) or None
+
+    @staticmethod
+    def forward(tool: str, args: "list[str]") -> Optional[int]:
+        """Run tool on the compile server, returns None if no server is available."""
+
+        socket_path = CompileClient.get_socket_path()
+        if not socket_path or not hasattr(socket, "AF_UNIX"):
+            return None
+
+        request = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "run",
+            "params": {
+                "tool": tool,
+                "args": args,
+                "cwd": os.getcwd()
+            }
+        }
+
+        data = b""
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+                sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                sock.shutdown(socket.SHUT_WR)
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    data += chunk
+        except OSError:
+            return None
+
+        try:
+            response = json.loads(data.decode("utf-8"))
+        except ValueError:
+            return None
+
+        result = response.get("result") if isinstance(response, dict) else None
+        if not isinstance(result, dict):
+            return None
+
+        output = result.get("output")
+        if output:
+            sys.stdout.write(output)
+            sys.stdout.flush()
+
+        errors = result.get("errors")
+        if errors:
+            sys.stderr.write(errors)
+            sys.stderr.flush()
+
+        return result.get("exit_code", 1)
@@ -0,0 +1,239 @@
+"""Compile server."""
+
+import os
+import io
+import sys
+import json
+import signal
+import socket
+import socketserver
+import contextlib
+import traceback
+
+from typing import Optional
+
+#############################################################################
+# Compile Server Error
+#############################################################################
+
+class CompileServerError:
+    """Compile server errors."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+    def to_string(self):
+        """Get string representation for error."""
+        return f"error: {self.error}"
+
+#############################################################################
+# Compile Server Options
+#############################################################################
+
+class CompileServerOptions:
+    """Compile server options."""
+
+    def __init__(self):
+        self.socket_path = None
+        self.stdio = False
+        self.verbosity_level = 0
+
+    def set_socket_path(self, socket_path):
+        """Set unix domain socket path."""
+        self.socket_path = socket_path
+
+    def set_stdio(self):
+        """Serve JSON-RPC requests on stdin/stdout."""
+        self.stdio = True
+
+    def set_verbosity_level(self, level):
+        """Set verbosity level."""
+        self.verbosity_level = level
+
+#############################################################################
+# Compile Server
+#############################################################################
+
+class CompileServer:
+    """Keeps compiler tools loaded and runs them on request."""
+
+    def __init__(self, options: CompileServerOptions, tools: dict):
+        """Constructor."""
+        self.options = options
+        self.tools = tools
+
+    def run(self) -> Optional[CompileServerError]:
+        """Run compile server."""
+        if self.options.stdio:
+            return self.run_stdio()
+        return self.run_socket()
+
+    def run_stdio(self) -> Optional[CompileServerError]:
+        """Serve newline delimited JSON-RPC requests from stdin."""
+
+        out_stream = sys.stdout
+
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            response = self.handle_message(line)
+            out_stream.write(response + "\n")
+            out_stream.flush()
+
+        return None
+
+    def run_socket(self) -> Optional[CompileServerError]:
+        """Serve JSON-RPC requests on a unix domain socket."""
+
+        socket_path = self.options.socket_path
+        if not socket_path:
+            return CompileServerError("missing socket path")
+
+        if _ForkingUnixServer is None:
+            return CompileServerError("unix domain sockets are not supported on this platform")
+
+        if os.path.exists(socket_path):
+            if CompileServer.is_alive(socket_path):
+                return CompileServerError(f"server already running on '{socket_path}'")
+            os.unlink(socket_path)
+
+        try:
+            server = _ForkingUnixServer(socket_path, _RequestHandler)
+        except OSError:
+            return CompileServerError(f"could not create socket '{socket_path}'")
+
+        server.compile_server = self
+
+        # terminate gracefully so the socket file gets removed
+        signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+
+        if self.options.verbosity_level > 0:
+            self.log(f"listening on {socket_path}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+        return None
+
+    @staticmethod
+    def is_alive(socket_path: str) -> bool:
+        """Check if a server is listening on socket."""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+        except OSError:
+            return False
+        return True
+
+    def log(self, s: str):
+        """Print log message to stderr."""
+        print(f"cs: {s}", file=sys.stderr)
+
+    def handle_message(self, message: str) -> str:
+        """Handle single JSON-RPC request and return encoded response."""
+
+        request_id = None
+
+        try:
+            request = json.loads(message)
+        except ValueError:
+            return self.error_response(request_id, -32700, "parse error")
+
+        if not isinstance(request, dict):
+            return self.error_response(request_id, -32600, "invalid request")
+
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params")
+
+        if method != "run" or not isinstance(params, dict):
+            return self.error_response(request_id, -32601, f"unknown method '{method}'")
+
+        result = self.execute(params)
+        if result is None:
+            return self.error_response(request_id, -32602, f"unknown tool '{params.get('tool')}'")
+
+        return json.dumps({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def error_response(self, request_id, code: int, message: str) -> str:
+        """Encode JSON-RPC error response."""
+        return json.dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": { "code": code, "message": message }
+        })
+
+    def execute(self, params: dict) -> Optional[dict]:
+        """Run tool entry point with given arguments and working directory."""
+
+        tool = params.get("tool")
+        entry = self.tools.get(tool)
+        if entry is None:
+            return None
+
+        args = [str(arg) for arg in params.get("args") or []]
+        cwd = params.get("cwd")
+
+        if self.options.verbosity_level > 0:
+            self.log(f"{tool} {' '.join(args)}")
+
+        output = io.StringIO()
+        errors = io.StringIO()
+        exit_code = 0
+
+        saved_argv = sys.argv
+        saved_cwd = os.getcwd()
+
+        try:
+            if cwd:
+                os.chdir(cwd)
+            sys.argv = [tool] + args
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+                try:
+                    entry()
+                except SystemExit as e:
+                    if e.code is None:
+                        exit_code = 0
+                    elif isinstance(e.code, int):
+                        exit_code = e.code
+                    else:
+                        print(e.code)
+                        exit_code = 1
+        except Exception: # pylint: disable=broad-exception-caught
+            errors.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            sys.argv = saved_argv
+            os.chdir(saved_cwd)
+
+        return {
+            "exit_code": exit_code,
+            "output": output.getvalue(),
+            "errors": errors.getvalue()
+        }
+
+#############################################################################
+# Socket Server
+#############################################################################
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one request per connection."""
+
+    def handle(self):
+        # forked child, termination must not be reported as tool exit
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        message = self.rfile.readline().decode("utf-8")
+        response = self.server.compile_server.handle_message(message)
+        self.wfile.write(response.encode("utf-8") + b"\n")
+
+if hasattr(socketserver, "ForkingMixIn") and hasattr(socket, "AF_UNIX"):
+    class _ForkingUnixServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        """Unix domain socket server running each request in a forked child."""
+else:
+    _ForkingUnixServer = None
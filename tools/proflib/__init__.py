@@ -0,0 +1,9 @@
+"""VS64 Tool Profiling."""
+
+from .null import NullProfiler
+
+try:
+    from .profiler import Profiler, ProfilerOptions
+except ImportError:
+    # cProfile is missing in some Python builds, libraries use NullProfiler then
+    pass
@@ -0,0 +1,15 @@
+"""No-op profiler."""
+
+import types
+import contextlib
+
+#############################################################################
+# Null Profiler
+#############################################################################
+
+class NullProfiler:
+    """Used instead of the profiler if it is not available, nothing is recorded."""
+
+    def phase(self, _name: str, _category: str = "phase"):
+        """Get context manager of untimed phase."""
+        return contextlib.nullcontext(types.SimpleNamespace(bytes_in=0, bytes_out=0))
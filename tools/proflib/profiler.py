@@ -0,0 +1,198 @@
+"""Profiler."""
+
+import os
+import json
+import time
+import cProfile
+
+from typing import Optional
+
+#############################################################################
+# Profiler Options
+#############################################################################
+
+class ProfilerOptions:
+    """Profiler options."""
+
+    def __init__(self):
+        self.profile_file = None
+        self.profile_format = "json"
+        self.cprofile_file = None
+
+    def set_profile_file(self, profile_file):
+        """Set profile output filename."""
+        self.profile_file = profile_file
+
+    def set_profile_format(self, profile_format):
+        """Set profile output format (json or trace)."""
+        self.profile_format = profile_format
+
+    def set_cprofile_file(self, cprofile_file):
+        """Set cProfile statistics filename."""
+        self.cprofile_file = cprofile_file
+
+    def is_enabled(self) -> bool:
+        """Check if any profiling output is requested."""
+        return bool(self.profile_file or self.cprofile_file)
+
+#############################################################################
+# Profiler Phase
+#############################################################################
+
+class ProfilerPhase:
+    """Timed section, used as context manager."""
+
+    def __init__(self, profiler: Optional["Profiler"], name: str, category: str):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.start_wall = 0.0
+        self.start_cpu = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def __enter__(self):
+        if self.profiler:
+            self.start_wall = time.perf_counter()
+            self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _traceback):
+        if self.profiler:
+            self.wall = time.perf_counter() - self.start_wall
+            self.cpu = time.process_time() - self.start_cpu
+            self.profiler.phases.append(self)
+        return False
+
+#############################################################################
+# Profiler
+#############################################################################
+
+class Profiler:
+    """Records per-phase wall and CPU time and data sizes."""
+
+    def __init__(self, tool: str = "", options: Optional[ProfilerOptions] = None):
+        self.tool = tool
+        self.options = options
+        self.enabled = bool(options and options.is_enabled())
+        self.phases = []
+        self.cprofile = None
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.start_time = time.time()
+
+    def phase(self, name: str, category: str = "phase") -> ProfilerPhase:
+        """Get context manager timing a phase."""
+        return ProfilerPhase(self if self.enabled else None, name, category)
+
+    def start(self):
+        """Start profiling, runs cProfile if requested."""
+
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.start_time = time.time()
+
+        if self.enabled and self.options.cprofile_file:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def stop(self) -> Optional[str]:
+        """Stop profiling and write results, returns error message on failure."""
+
+        if not self.enabled:
+            return None
+
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+
+        options = self.options
+
+        try:
+            if self.cprofile:
+                self.cprofile.disable()
+                Profiler.makedirs(options.cprofile_file)
+                self.cprofile.dump_stats(options.cprofile_file)
+                self.cprofile = None
+
+            if options.profile_file:
+                if options.profile_format == "trace":
+                    data = self.to_trace(wall, cpu)
+                else:
+                    data = self.to_json(wall, cpu)
+
+                Profiler.makedirs(options.profile_file)
+                with open(options.profile_file, "w", encoding="utf-8") as out_file:
+                    json.dump(data, out_file, indent=1)
+
+        except OSError:
+            return "could not write profile"
+
+        return None
+
+    @staticmethod
+    def makedirs(filename: str):
+        """Ensure output folder exists."""
+        dirname = os.path.dirname(filename)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+    def get_offset(self, phase: ProfilerPhase) -> float:
+        """Get phase start relative to profiler start in seconds."""
+        return phase.start_wall - self.start_wall
+
+    def to_json(self, wall: float, cpu: float) -> dict:
+        """Get profile summary."""
+
+        return {
+            "tool": self.tool,
+            "start_time": self.start_time,
+            "wall": round(wall, 6),
+            "cpu": round(cpu, 6),
+            "phases": [
+                {
+                    "name": phase.name,
+                    "category": phase.category,
+                    "start": round(self.get_offset(phase), 6),
+                    "wall": round(phase.wall, 6),
+                    "cpu": round(phase.cpu, 6),
+                    "bytes_in": phase.bytes_in,
+                    "bytes_out": phase.bytes_out
+                }
+                for phase in self.phases
+            ]
+        }
+
+    def to_trace(self, wall: float, cpu: float) -> dict:
+        """Get profile in Chrome trace event format."""
+
+        # absolute time stamps in microseconds, so traces of several tool
+        # runs (and converted ninja logs) line up on one timeline
+        base_ts = self.start_time * 1000000.0
+        pid = os.getpid()
+
+        events = [
+            {
+                "name": self.tool, "cat": "tool", "ph": "X", "pid": pid, "tid": 0,
+                "ts": round(base_ts), "dur": round(wall * 1000000.0),
+                "args": { "cpu_ms": round(cpu * 1000.0, 3) }
+            }
+        ]
+
+        for phase in self.phases:
+            events.append({
+                "name": phase.name, "cat": phase.category, "ph": "X", "pid": pid, "tid": 0,
+                "ts": round(base_ts + self.get_offset(phase) * 1000000.0),
+                "dur": round(phase.wall * 1000000.0),
+                "args": {
+                    "cpu_ms": round(phase.cpu * 1000.0, 3),
+                    "bytes_in": phase.bytes_in,
+                    "bytes_out": phase.bytes_out
+                }
+            })
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms"
+        }
@@ -9,7 +9,7 @@ from typing import Optional
 SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
 sys.path.append(SCRIPT_DIR)
 
-from rclib import ResourceCompiler, ResourceFactory
+from cslib import CompileClient
 
 #############################################################################
 # Main Entry
@@ -18,22 +18,40 @@ from rclib import ResourceCompiler, ResourceFactory
 def usage():
     """Print tool usage information."""
 
-    print("Usage: rc [--format cpp|cc|acme|kick|raw] [--config config] -o output input...")
+    print("Usage: rc [--format cpp|cc|acme|kick|basic|basic-compact|raw] [--config config] -o output input...")
     print("")
     print("--format          : Specify output data format")
     print("                    cpp  - Generate C++ data")
     print("                    cc   - Generate C data")
     print("                    acme - Generate ACME assembler data")
     print("                    kick - Generate KickAssembler data")
+    print("                    basic - Generate BASIC DATA lines")
+    print("                    basic-compact - Generate BASIC DATA strings and loader")
     print("--config          : path to JSON configuration file")
+    print("--profile         : Write per-resource timings to file")
+    print("--profile-format  : Profile format: json (default) or trace (Chrome trace events)")
+    print("--cprofile        : Write cProfile statistics to file")
     print("-o                : Name of file to be generated")
     print("input             : Resource files")
 
 def main():
-    """Main entry."""
+    """Main entry, forwards to a running compile server if available."""
+
+    exit_code = CompileClient.forward("rc", sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    run()
+
+def run():
+    """Run resource compiler in-process."""
+
+    # libraries are imported on demand to keep forwarding to the server fast
+    from rclib import ResourceCompiler, ResourceFactory # pylint: disable=import-outside-toplevel
+    from proflib import Profiler, ProfilerOptions # pylint: disable=import-outside-toplevel
 
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "ho:", ["format=", "config=", "help", "output="])
+        opts, args = getopt.getopt(sys.argv[1:], "ho:", ["format=", "config=", "help", "output=", "profile=", "profile-format=", "cprofile="])
     except getopt.GetoptError as err:
         print(err.msg)
         usage()
@@ -46,6 +64,7 @@ def main():
     format_str: Optional[str] = None
     config_file: Optional[str] = None
     output: Optional[str] = None
+    profiler_options = ProfilerOptions()
 
     for option, arg in opts:
         if option in ("-h", "--help"):
@@ -57,11 +76,29 @@ def main():
             config_file = arg
         elif option in ("-o", "--output"):
             output = arg
+        elif option == "--profile":
+            profiler_options.set_profile_file(arg)
+        elif option == "--profile-format":
+            if arg not in ("json", "trace"):
+                print(f"invalid profile format: {arg}")
+                usage()
+                sys.exit(2)
+            profiler_options.set_profile_format(arg)
+        elif option == "--cprofile":
+            profiler_options.set_cprofile_file(arg)
 
-    resource_compiler = ResourceCompiler()
+    profiler = Profiler("rc", profiler_options)
+    profiler.start()
+
+    resource_compiler = ResourceCompiler(profiler)
     resource_factory = ResourceFactory()
 
     err = resource_compiler.compile(args, output, resource_factory, format_str, config_file)
+
+    profiler_err = profiler.stop()
+    if profiler_err:
+        print(f"error: {profiler_err}")
+
     if err:
         print(err.to_string())
         sys.exit(1)
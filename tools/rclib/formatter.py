@@ -24,6 +24,10 @@ class OutputFormatVariant(Enum):
     NONE = 0
     ACME = 1
     KICK = 2
+    COMPACT = 3
+
+# characters of the compact BASIC data strings, nibble value is PETSCII code - 48
+COMPACT_CHARS = "0123456789:;<=>?"
 
 #############################################################################
 # Output Formatters
@@ -147,6 +151,10 @@ class BaseFormatter:
         s = self.bytearray_size.format(name, sz)
         return s
 
+    def loader(self):
+        """Return code to load generated data (if needed by the format)."""
+        return ""
+
     def constant(self, name: str, data: int, format_code: str):
         """Output constant declaration."""
 
@@ -306,6 +314,54 @@ class BasicFormatter(BaseFormatter):
         """Format integer value as hex string."""
         return str(value)
 
+    def binary(self, data, ofs: Optional[int]=None, sz: Optional[int]=None,
+               bitmask: Optional[int]=None, bitscale: Optional[int]=None, elements_per_line: Optional[int]=None,
+               continued: Optional[bool]=False):
+        """Format byte array as DATA lines, compact variant packs two characters per byte into strings."""
+
+        if self.format_variant != OutputFormatVariant.COMPACT:
+            return super().binary(data, ofs, sz, bitmask, bitscale, elements_per_line, continued)
+
+        if not ofs: ofs = 0
+        if not sz: sz = len(data) - ofs
+        end = ofs + sz
+
+        # DATA "..." fits into the line length
+        bytes_per_line = (self.max_line_length - len(self.bytearray_linebegin) - 2) // 2
+
+        s = ""
+        for pos in range(ofs, end, bytes_per_line):
+            chars = "".join(
+                COMPACT_CHARS[value >> 4] + COMPACT_CHARS[value & 0xF]
+                for value in data[pos:min(pos + bytes_per_line, end)]
+            )
+            s += self.bytearray_linebegin + '"' + chars + '"\n'
+
+        return s
+
+    def loader(self):
+        """Return subroutine which pokes nb bytes of compact DATA strings to address ad."""
+
+        if self.format_variant != OutputFormatVariant.COMPACT:
+            return ""
+
+        lines = [
+            self.comment_line(),
+            self.comment("compact data loader: ad=address:nb=size:gosub rc_load_data"),
+            self.comment("uses variables d$, l and i"),
+            self.comment_line(),
+            "goto rc_load_data_end",
+            "rc_load_data:",
+            "if nb<1 then return",
+            "read d$:l=len(d$):if l>2*nb then l=2*nb",
+            "for i=1 to l step 2:poke ad,asc(mid$(d$,i,1))*16+asc(mid$(d$,i+1,1))-816:ad=ad+1:next",
+            "nb=nb-l/2:goto rc_load_data",
+            "rc_load_data_end:",
+            ""
+        ]
+
+        return "\n" + "\n".join(lines)
+
 
 class FormatterFactory:
     """Formatter factory."""
@@ -321,6 +377,8 @@ class FormatterFactory:
             formatter = CFormatter(OutputFormatVariant.NONE)
         elif format_str == "basic":
             formatter = BasicFormatter(OutputFormatVariant.NONE)
+        elif format_str == "basic-compact":
+            formatter = BasicFormatter(OutputFormatVariant.COMPACT)
         elif format_str == "acme":
             formatter = AsmFormatter(OutputFormatVariant.ACME)
         elif format_str == "kick":
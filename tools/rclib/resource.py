@@ -9,6 +9,11 @@ import json
 from .constants import Constants
 from .formatter import FormatterFactory, BaseFormatter
 
+try:
+    from proflib import Profiler
+except ImportError:
+    from proflib.null import NullProfiler as Profiler
+
 class CompileError:
     """Compile errors."""
 
@@ -255,11 +260,18 @@ class Resource:
 
     def compile(self) -> Optional[CompileError]:
         """Compile resource."""
-        err = self.read()
+
+        profiler = self.package.profiler if self.package else Profiler()
+        name = os.path.basename(self.filename) if self.filename else ""
+
+        with profiler.phase(name, "read") as phase:
+            err = self.read()
+            phase.bytes_in = self.input_size
         if err:
             return err
 
-        err = self.parse()
+        with profiler.phase(name, "parse"):
+            err = self.parse()
         if err:
             return err
 
@@ -317,6 +329,7 @@ class ResourcePackage:
         self.resources: list[Resource] = []
         self.ids: set[str] = set()
         self.config = None
+        self.profiler = Profiler()
 
     def read_config(self, config_file: Optional[str]) -> Optional[CompileError]:
         """Read configuration."""
@@ -419,10 +432,15 @@ class ResourcePackage:
         i = 0
         for resource in resources:
             if i > 0: s += "\n"
-            s += resource.to_string(formatter)
-            s += resource.meta_to_string(formatter)
+            with self.profiler.phase(os.path.basename(resource.filename), "format") as phase:
+                resource_str = resource.to_string(formatter)
+                resource_str += resource.meta_to_string(formatter)
+                phase.bytes_out = len(resource_str)
+            s += resource_str
             i += 1
 
+        s += formatter.loader()
+
         lines = []
         lines.append("")
 
@@ -446,8 +464,10 @@ class ResourcePackage:
 class ResourceCompiler:
     """Resource compiler."""
 
-    def __init__(self):
+    def __init__(self, profiler: Optional[Profiler] = None):
         self.resources = ResourcePackage()
+        self.profiler = profiler if profiler else Profiler()
+        self.resources.profiler = self.profiler
 
     def compile(self, inputs: 'list[str]',
                 output: Optional[str],
@@ -464,7 +484,8 @@ class ResourceCompiler:
         resources = self.resources
         resources.set_name(output)
 
-        err = resources.read_config(config_file)
+        with self.profiler.phase("read_config"):
+            err = resources.read_config(config_file)
         if err:
             return err
 
@@ -473,13 +494,17 @@ class ResourceCompiler:
             if resource:
                 resources.add(resource)
 
-        err = resources.compile()
+        with self.profiler.phase("compile"):
+            err = resources.compile()
         if err:
             return err
 
-        s = resources.to_string(formatter)
+        with self.profiler.phase("format") as phase:
+            s = resources.to_string(formatter)
+            phase.bytes_out = len(s)
 
-        self.write(output, s)
+        with self.profiler.phase("write"):
+            self.write(output, s)
 
         return None
 